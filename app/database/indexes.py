@@ -0,0 +1,99 @@
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+from pymongo import ASCENDING, DESCENDING, GEOSPHERE, IndexModel
+
+
+# =====================================
+# Declarative index spec (partners)
+# هر ایندکس مطابق یک شکل واقعی از کوئری list_partners:
+#   equality روی فیلترها + sort روی (meta.created_at, _id)
+# =====================================
+
+# فقط رکوردهای حذف‌نشده در ایندکس‌های لیست نگه داشته می‌شوند
+NOT_DELETED = {"meta.is_deleted": False}
+
+# همان sort ثابت PartnerRepository.list
+LIST_SORT_KEYS: List[Tuple[str, int]] = [
+    ("meta.created_at", DESCENDING),
+    ("_id", DESCENDING),
+]
+
+# فیلترهای تکی list_partners (query param → فیلد)
+LIST_FILTER_FIELDS: List[str] = [
+    "analysis.funnel_stage",
+    "identity.business_type",
+    "analysis.financial_level",
+    "analysis.purchase_readiness",
+    "analysis.potential_level",
+    "acquisition.source",
+    "identity.province",
+    "identity.city",
+    "identity.map_link",
+    "analysis.tags",
+]
+
+# ترکیب‌های پرتکرار فیلترها (equality ها پیش از sort)
+LIST_FILTER_COMBOS: List[Tuple[str, ...]] = [
+    ("analysis.funnel_stage", "identity.business_type"),
+    ("identity.province", "identity.city"),
+]
+
+
+@dataclass(frozen=True)
+class IndexSpec:
+    keys: List[Tuple[str, int]]
+    name: Optional[str] = None
+    partial_filter: Optional[dict] = None
+    options: dict = field(default_factory=dict)
+
+    def to_model(self) -> IndexModel:
+        kwargs = dict(self.options)
+        if self.name:
+            kwargs["name"] = self.name
+        if self.partial_filter:
+            kwargs["partialFilterExpression"] = self.partial_filter
+        return IndexModel(self.keys, **kwargs)
+
+
+def _list_index(*fields: str) -> IndexSpec:
+    """
+    (فیلدها, created_at, _id) فقط روی رکوردهای حذف‌نشده
+    """
+    name = "list_" + "__".join(f.replace(".", "_") for f in fields)
+
+    return IndexSpec(
+        keys=[(f, ASCENDING) for f in fields] + LIST_SORT_KEYS,
+        name=name,
+        partial_filter=NOT_DELETED,
+    )
+
+
+PARTNER_INDEXES: List[IndexSpec] = [
+    # لیست بدون فیلتر + keyset pagination
+    # (بدون partial تا با ایندکس قبلی همین کلیدها تداخل نداشته باشد)
+    IndexSpec(keys=LIST_SORT_KEYS),
+
+    *[_list_index(f) for f in LIST_FILTER_FIELDS],
+    *[_list_index(*combo) for combo in LIST_FILTER_COMBOS],
+
+    # جستجوی q: regex با ^ روی توکن‌ها / بخش‌های شماره (app.repositories.derived)
+    IndexSpec(keys=[("search.terms", ASCENDING)], name="search_terms", partial_filter=NOT_DELETED),
+    IndexSpec(keys=[("search.phones", ASCENDING)], name="search_phones", partial_filter=NOT_DELETED),
+
+    # تشخیص تکراری در quick-entry (app.repositories.dedup)
+    IndexSpec(keys=[("dedup.phones", ASCENDING)], name="dedup_phones", partial_filter=NOT_DELETED),
+    IndexSpec(keys=[("dedup.bands", ASCENDING)], name="dedup_bands", partial_filter=NOT_DELETED),
+
+    # GET /partners/nearby ($geoNear)؛ 2dsphere خودش sparse است (geo=None ایندکس نمی‌شود)
+    IndexSpec(keys=[("geo", GEOSPHERE)], name="geo_2dsphere"),
+
+    # feed زنده بدون change stream: poll روی تغییرات اخیر با keyset (updated_at, _id) (app.events.feed)
+    # و نسخه ETag لیست (آخرین تغییر، PartnerRepository.get_version)
+    # بدون partial: soft delete ها هم باید دیده شوند
+    IndexSpec(keys=[("meta.updated_at", ASCENDING), ("_id", ASCENDING)], name="updated_at_id"),
+]
+
+
+def partner_index_models() -> List[IndexModel]:
+    return [spec.to_model() for spec in PARTNER_INDEXES]
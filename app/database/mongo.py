@@ -1,9 +1,20 @@
-from pymongo import MongoClient, ASCENDING
+import asyncio
+from typing import Dict, List
+
+from pymongo import IndexModel, MongoClient
 from pymongo.collection import Collection
 from pymongo.database import Database
+from motor.motor_asyncio import (
+    AsyncIOMotorClient,
+    AsyncIOMotorCollection,
+    AsyncIOMotorDatabase,
+)
 import os
 import logging
 
+from app.database.indexes import partner_index_models
+from app.events.outbox import OUTBOX_COLLECTION, outbox_index_models
+
 
 # =====================================
 # MongoDB Configuration
@@ -12,6 +23,60 @@ import logging
 MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
 MONGO_DB_NAME = os.getenv("MONGO_DB_NAME", "crm_db")
 
+# ---- Connection pool (برای هر client؛ هر worker یک client sync و یک async دارد) ----
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "100"))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "0"))
+MONGO_MAX_IDLE_TIME_MS = os.getenv("MONGO_MAX_IDLE_TIME_MS")
+MONGO_MAX_CONNECTING = int(os.getenv("MONGO_MAX_CONNECTING", "2"))
+
+# ---- Timeouts (ms؛ خالی = پیش‌فرض driver) ----
+# wait queue: حداکثر انتظار برای connection آزاد وقتی pool پر است
+MONGO_WAIT_QUEUE_TIMEOUT_MS = os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS")
+MONGO_CONNECT_TIMEOUT_MS = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "10000"))
+MONGO_SOCKET_TIMEOUT_MS = os.getenv("MONGO_SOCKET_TIMEOUT_MS")
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "30000"))
+
+# primary | primaryPreferred | secondary | secondaryPreferred | nearest
+MONGO_READ_PREFERENCE = os.getenv("MONGO_READ_PREFERENCE", "primary")
+
+# مثلاً "zstd,snappy,zlib" (zstd / snappy به پکیج جدا نیاز دارند)
+MONGO_COMPRESSORS = os.getenv("MONGO_COMPRESSORS", "")
+
+# ---- Startup ----
+# false وقتی ایندکس‌ها یک بار بیرون از worker ها ساخته شده‌اند
+# (python -m app.serve یا python -m app.tools.manage_indexes در deploy)
+MONGO_ENSURE_INDEXES_ON_STARTUP = os.getenv("MONGO_ENSURE_INDEXES_ON_STARTUP", "true").lower() in ("1", "true", "yes")
+# تعداد connection که هر worker پیش از اولین درخواست باز می‌کند (0 = هیچ)
+MONGO_WARM_CONNECTIONS = int(os.getenv("MONGO_WARM_CONNECTIONS", "4"))
+
+
+def mongo_client_options() -> dict:
+    """
+    تنظیمات مشترک MongoClient و AsyncIOMotorClient
+    گزینه‌هایی که در URI هم آمده‌اند، از اینجا override می‌شوند
+    """
+    options = {
+        "maxPoolSize": MONGO_MAX_POOL_SIZE,
+        "minPoolSize": MONGO_MIN_POOL_SIZE,
+        "maxConnecting": MONGO_MAX_CONNECTING,
+        "connectTimeoutMS": MONGO_CONNECT_TIMEOUT_MS,
+        "serverSelectionTimeoutMS": MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "readPreference": MONGO_READ_PREFERENCE,
+    }
+
+    optional_ms = {
+        "maxIdleTimeMS": MONGO_MAX_IDLE_TIME_MS,
+        "waitQueueTimeoutMS": MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        "socketTimeoutMS": MONGO_SOCKET_TIMEOUT_MS,
+    }
+    options.update({key: int(value) for key, value in optional_ms.items() if value})
+
+    compressors = [c.strip() for c in MONGO_COMPRESSORS.split(",") if c.strip()]
+    if compressors:
+        options["compressors"] = ",".join(compressors)
+
+    return options
+
 
 # =====================================
 # Mongo Client (Singleton)
@@ -28,7 +93,7 @@ def get_mongo_client() -> MongoClient:
     global _client
 
     if _client is None:
-        _client = MongoClient(MONGO_URI)
+        _client = MongoClient(MONGO_URI, **mongo_client_options())
         logging.info("MongoDB client initialized")
 
     return _client
@@ -48,6 +113,60 @@ def get_database() -> Database:
     return _db
 
 
+# =====================================
+# Async Mongo Client (Motor, Singleton)
+# =====================================
+
+_async_client: AsyncIOMotorClient | None = None
+_async_db: AsyncIOMotorDatabase | None = None
+
+
+def get_async_mongo_client() -> AsyncIOMotorClient:
+    """
+    گرفتن یا ساخت singleton AsyncIOMotorClient
+    باید داخل event loop (مثلاً در lifespan) ساخته شود
+    """
+    global _async_client
+
+    if _async_client is None:
+        _async_client = AsyncIOMotorClient(MONGO_URI, **mongo_client_options())
+        logging.info("Async MongoDB client initialized")
+
+    return _async_client
+
+
+def get_async_database() -> AsyncIOMotorDatabase:
+    """
+    گرفتن دیتابیس اصلی (async)
+    """
+    global _async_db
+
+    if _async_db is None:
+        client = get_async_mongo_client()
+        _async_db = client[MONGO_DB_NAME]
+
+    return _async_db
+
+
+def close_mongo_clients():
+    """
+    بستن هر دو client (sync و async) هنگام shutdown
+    """
+    global _client, _db, _async_client, _async_db
+
+    if _async_client is not None:
+        _async_client.close()
+        _async_client = None
+        _async_db = None
+
+    if _client is not None:
+        _client.close()
+        _client = None
+        _db = None
+
+    logging.info("MongoDB clients closed")
+
+
 # =====================================
 # Collections
 # =====================================
@@ -60,23 +179,63 @@ def get_partners_collection() -> Collection:
     return db["partners"]
 
 
+def get_async_partners_collection() -> AsyncIOMotorCollection:
+    """
+    نسخه async کالکشن partners (برای route ها)
+    """
+    db = get_async_database()
+    return db["partners"]
+
+
 # =====================================
 # Indexes (Call once on startup)
 # =====================================
 
+def declared_index_models() -> Dict[str, List[IndexModel]]:
+    """
+    کالکشن → ایندکس‌های تعریف‌شده (منبع مشترک ensure_indexes و manage_indexes)
+    """
+    return {
+        "partners": partner_index_models(),
+        OUTBOX_COLLECTION: outbox_index_models(),
+    }
+
+
 def ensure_indexes():
     """
-    ساخت ایندکس‌های ضروری برای performance
+    ساخت ایندکس‌های ضروری برای performance (از روی app.database.indexes)
     این تابع فقط یک‌بار هنگام startup صدا زده شود
     """
-    collection = get_partners_collection()
+    db = get_database()
+
+    for name, models in declared_index_models().items():
+        db[name].create_indexes(models)
+
+    logging.info("MongoDB indexes ensured")
+
+
+async def ensure_indexes_async():
+    """
+    همان ensure_indexes روی Motor؛ lifespan برای آن client sync جدا نمی‌سازد
+    """
+    db = get_async_database()
 
-    collection.create_index([("analysis.funnel_stage", ASCENDING)])
-    collection.create_index([("identity.business_type", ASCENDING)])
-    collection.create_index([("analysis.customer_level", ASCENDING)])
-    collection.create_index([("analysis.potential_level", ASCENDING)])
-    collection.create_index([("acquisition.source", ASCENDING)])
-    collection.create_index([("identity.city", ASCENDING)])
-    collection.create_index([("meta.created_at", ASCENDING)])
+    for name, models in declared_index_models().items():
+        await db[name].create_indexes(models)
 
     logging.info("MongoDB indexes ensured")
+
+
+async def warm_async_pool(connections: int = MONGO_WARM_CONNECTIONS) -> int:
+    """
+    ping های هم‌زمان → هر کدام یک connection جدا از pool (handshake و auth
+    پیش از اولین درخواست، نه روی آن)؛ محدود به maxPoolSize
+    """
+    # maxPoolSize=0 یعنی بدون سقف
+    count = min(connections, MONGO_MAX_POOL_SIZE) if MONGO_MAX_POOL_SIZE else connections
+    if count <= 0:
+        return 0
+
+    db = get_async_database()
+    await asyncio.gather(*(db.command("ping") for _ in range(count)))
+    return count
@@ -0,0 +1,140 @@
+import os
+import logging
+
+from pymongo import monitoring
+
+from app.utils.metrics import get_metrics_registry
+
+
+# =====================================
+# Mongo monitoring (command + connection pool)
+# خروجی روی GET /metrics (Prometheus)
+# - latency هر command (find / aggregate / update / ...)
+# - زمان انتظار checkout از pool (نشانه پر شدن pool)
+# - تعداد connection های در حال استفاده / باز برای هر سرور
+# =====================================
+
+MONGO_MONITORING_ENABLED = os.getenv("MONGO_MONITORING", "true").lower() in ("1", "true", "yes")
+
+_registry = get_metrics_registry()
+
+COMMAND_DURATION = _registry.histogram(
+    "mongodb_command_duration_seconds",
+    "MongoDB command latency",
+    ("command",),
+)
+COMMAND_FAILURES = _registry.counter(
+    "mongodb_command_failures_total",
+    "Failed MongoDB commands",
+    ("command",),
+)
+CHECKOUT_WAIT = _registry.histogram(
+    "mongodb_pool_checkout_wait_seconds",
+    "Time spent waiting to check out a pooled connection",
+    ("address",),
+)
+CHECKOUT_FAILURES = _registry.counter(
+    "mongodb_pool_checkout_failures_total",
+    "Failed connection checkouts (timeout, pool closed, connection error)",
+    ("address", "reason"),
+)
+CONNECTIONS_IN_USE = _registry.gauge(
+    "mongodb_pool_connections_in_use",
+    "Connections currently checked out of the pool",
+    ("address",),
+)
+CONNECTIONS_OPEN = _registry.gauge(
+    "mongodb_pool_connections_open",
+    "Open connections in the pool (idle + in use)",
+    ("address",),
+)
+POOL_CLEARED = _registry.counter(
+    "mongodb_pool_cleared_total",
+    "Times the connection pool was cleared",
+    ("address",),
+)
+
+# heartbeat ها و handshake ها در latency command ها حساب نمی‌شوند
+_IGNORED_COMMANDS = frozenset({"hello", "ismaster", "isMaster", "ping", "saslStart", "saslContinue"})
+
+
+def _address(address) -> str:
+    host, port = address
+    return f"{host}:{port}"
+
+
+class CommandMetricsListener(monitoring.CommandListener):
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        if event.command_name in _IGNORED_COMMANDS:
+            return
+        COMMAND_DURATION.observe(event.duration_micros / 1e6, command=event.command_name)
+
+    def failed(self, event):
+        if event.command_name in _IGNORED_COMMANDS:
+            return
+        COMMAND_DURATION.observe(event.duration_micros / 1e6, command=event.command_name)
+        COMMAND_FAILURES.inc(command=event.command_name)
+
+
+class PoolMetricsListener(monitoring.ConnectionPoolListener):
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        POOL_CLEARED.inc(address=_address(event.address))
+
+    def pool_closed(self, event):
+        address = _address(event.address)
+        CONNECTIONS_IN_USE.set(0, address=address)
+        CONNECTIONS_OPEN.set(0, address=address)
+
+    def connection_created(self, event):
+        CONNECTIONS_OPEN.inc(address=_address(event.address))
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        CONNECTIONS_OPEN.dec(address=_address(event.address))
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        address = _address(event.address)
+        CHECKOUT_WAIT.observe(event.duration, address=address)
+        CHECKOUT_FAILURES.inc(address=address, reason=str(event.reason))
+
+    def connection_checked_out(self, event):
+        address = _address(event.address)
+        CHECKOUT_WAIT.observe(event.duration, address=address)
+        CONNECTIONS_IN_USE.inc(address=address)
+
+    def connection_checked_in(self, event):
+        CONNECTIONS_IN_USE.dec(address=_address(event.address))
+
+
+_registered = False
+
+
+def register_mongo_monitoring():
+    """
+    ثبت سراسری listener ها در pymongo (Motor هم از همان pymongo استفاده می‌کند)
+    فقط روی client هایی اثر دارد که بعد از این صدا ساخته شوند → قبل از get_async_mongo_client
+    """
+    global _registered
+
+    if _registered or not MONGO_MONITORING_ENABLED:
+        return
+
+    monitoring.register(CommandMetricsListener())
+    monitoring.register(PoolMetricsListener())
+    _registered = True
+
+    logging.info("MongoDB command / pool monitoring registered")
@@ -0,0 +1,427 @@
+import asyncio
+import itertools
+import os
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Dict, Literal, Optional, Set
+
+import orjson
+from pymongo import ASCENDING
+from pymongo.errors import PyMongoError
+from motor.motor_asyncio import AsyncIOMotorCollection
+
+from app.events.pipeline import change_streams_available
+from app.repositories.derived import DERIVED_FIELDS
+from app.repositories.partner_repository import LIST_SORT, ListFilters, _build_list_query
+from app.utils.metrics import get_metrics_registry
+from app.utils.mongo_match import matches
+from app.utils.response import orjson_default
+
+
+# =====================================
+# Live partner feed (GET /partners/stream)
+# یک upstream مشترک در هر پردازه، fan-out درون‌پردازه‌ای به همه کلاینت‌ها:
+#   N داشبورد = یک change stream (یا یک poll)، نه N حلقه polling
+# - change stream با fullDocument=updateLookup اگر replica set باشد
+# - وگرنه poll روی (meta.updated_at, _id) (ایندکس updated_at_id) هر FEED_POLL_INTERVAL_MS؛
+#   صفحه‌به‌صفحه با keyset تا batch کوتاه (bulk update هزاران ردیف با یک updated_at دارد)
+# - هر subscriber فیلتر list_partners خودش را دارد (ارزیابی درون‌پردازه‌ای)
+# - remove فقط برای partner هایی که قبلاً برای همین subscriber منطبق بوده‌اند:
+#   ids صفحه اول لیست هنگام اتصال + هر upsert ارسال‌شده (و pre-image change stream اگر روشن باشد)؛
+#   تغییر partner های بی‌ربط به فیلتر به این subscriber نمی‌رسد
+# - صف هر subscriber محدود است؛ کلاینت کند یک reset می‌گیرد (لیست را دوباره بخواند)
+#   و upstream را برای بقیه معطل نمی‌کند
+# - upstream با اولین subscriber شروع و FEED_IDLE_SECONDS بعد از آخرین قطع می‌شود
+# =====================================
+
+FEED_QUEUE_SIZE = int(os.getenv("PARTNER_FEED_QUEUE_SIZE", "256"))
+FEED_MAX_SUBSCRIBERS = int(os.getenv("PARTNER_FEED_MAX_SUBSCRIBERS", "1000"))
+FEED_POLL_INTERVAL_MS = int(os.getenv("PARTNER_FEED_POLL_INTERVAL_MS", "1000"))
+# همپوشانی پنجره poll (write های هم‌زمان / اختلاف ساعت worker ها)؛ تکراری‌ها حذف می‌شوند
+FEED_POLL_OVERLAP_MS = int(os.getenv("PARTNER_FEED_POLL_OVERLAP_MS", "2000"))
+FEED_POLL_BATCH = 500
+FEED_IDLE_SECONDS = float(os.getenv("PARTNER_FEED_IDLE_SECONDS", "30"))
+# comment خالی SSE تا proxy ها اتصال بی‌کار را نبندند
+FEED_HEARTBEAT_SECONDS = float(os.getenv("PARTNER_FEED_HEARTBEAT_SECONDS", "15"))
+FEED_RETRY_MS = 3000
+# ids منطبق اولیه هر subscriber (همان ترتیب لیست؛ چیزی که کلاینت نشان می‌دهد)
+FEED_TRACK_SEED = int(os.getenv("PARTNER_FEED_TRACK_SEED", "1000"))
+# سقف ids دنبال‌شده هر subscriber؛ بیشتر از آن → remove برای هر تغییر نامنطبق (بدون حافظه)
+FEED_TRACK_MAX = int(os.getenv("PARTNER_FEED_TRACK_MAX", "20000"))
+# fullDocumentBeforeChange=whenAvailable (MongoDB 6+ با changeStreamPreAndPostImages روی کالکشن)
+FEED_PRE_IMAGES = os.getenv("PARTNER_FEED_PRE_IMAGES", "false").lower() in ("1", "true", "yes")
+
+# همان ترتیب ایندکس updated_at_id؛ _id تساوی updated_at را می‌شکند
+POLL_SORT = [("meta.updated_at", ASCENDING), ("_id", ASCENDING)]
+
+FeedOp = Literal["upsert", "remove", "reset"]
+# created / updated: upsert | deleted / unmatched (دیگر با فیلتر منطبق نیست): remove
+FeedReason = Literal["created", "updated", "deleted", "unmatched", "lagged"]
+
+_registry = get_metrics_registry()
+
+FEED_SUBSCRIBERS = _registry.gauge(
+    "partner_feed_subscribers",
+    "Open /partners/stream connections",
+)
+FEED_CHANGES = _registry.counter(
+    "partner_feed_changes_total",
+    "Partner changes received from the shared upstream",
+    ("source",),
+)
+FEED_RESETS = _registry.counter(
+    "partner_feed_resets_total",
+    "Subscribers reset because their queue overflowed",
+)
+
+
+def _poll_query(window_start: datetime, after: Optional[tuple]) -> dict:
+    """
+    after: (updated_at, _id) آخرین داکیومنت صفحه قبل (keyset)
+    """
+    if after is None:
+        return {"meta.updated_at": {"$gte": window_start}}
+
+    updated_at, oid = after
+    return {
+        "$or": [
+            {"meta.updated_at": {"$gt": updated_at}},
+            {"meta.updated_at": updated_at, "_id": {"$gt": oid}},
+        ]
+    }
+
+
+@dataclass
+class FeedDelta:
+    seq: int
+    op: FeedOp
+    reason: FeedReason
+    partner_id: Optional[str] = None
+    doc: Optional[dict] = None
+
+    def payload(self) -> dict:
+        data = {"op": self.op, "reason": self.reason, "id": self.partner_id}
+        if self.doc is not None:
+            data["partner"] = self.doc
+        return data
+
+
+def project_doc(doc: dict, projection: Optional[dict]) -> dict:
+    """
+    همان خروجی list_partners: _id → id، بدون derived fields، projection اختیاری
+    """
+    if projection is None:
+        out = {k: v for k, v in doc.items() if k not in DERIVED_FIELDS and k != "_id"}
+    else:
+        out = {}
+        for path in projection:
+            source, target = doc, out
+            *parents, leaf = path.split(".")
+            for part in parents:
+                source = source.get(part) if isinstance(source, dict) else None
+                target = target.setdefault(part, {})
+            if isinstance(source, dict) and leaf in source:
+                target[leaf] = source[leaf]
+
+    out["id"] = str(doc["_id"])
+    return out
+
+
+@dataclass(eq=False)
+class Subscription:
+    query: dict
+    projection: Optional[dict]
+    queue: asyncio.Queue = field(default_factory=lambda: asyncio.Queue(maxsize=FEED_QUEUE_SIZE))
+    # ids که این subscriber منطبق دیده (کلاینت نشانشان می‌دهد)
+    matched: Set[str] = field(default_factory=set)
+    untracked: bool = False
+
+    def track(self, partner_id: str):
+        if self.untracked:
+            return
+        if len(self.matched) >= FEED_TRACK_MAX:
+            self.untracked = True
+            self.matched.clear()
+            return
+        self.matched.add(partner_id)
+
+    def was_matching(self, partner_id: str, before: Optional[dict]) -> bool:
+        """
+        partner الان منطبق نیست؛ آیا کلاینت آن را دارد (remove لازم است)؟
+        """
+        if self.untracked:
+            return True
+        if partner_id in self.matched:
+            self.matched.discard(partner_id)
+            return True
+        return (
+            before is not None
+            and not before.get("meta", {}).get("is_deleted")
+            and matches(self.query, before)
+        )
+
+    def offer(self, delta: FeedDelta):
+        try:
+            self.queue.put_nowait(delta)
+        except asyncio.QueueFull:
+            # تغییرهای در صف بی‌اعتبار می‌شوند؛ کلاینت از نو لیست می‌گیرد
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(FeedDelta(delta.seq, "reset", "lagged"))
+            FEED_RESETS.inc()
+
+
+class PartnerFeed:
+    def __init__(self, collection: AsyncIOMotorCollection):
+        self.collection = collection
+        self.source: Optional[Literal["change_stream", "poll"]] = None
+
+        self._subscribers: Set[Subscription] = set()
+        self._seq = itertools.count(1)
+        self._task: Optional[asyncio.Task] = None
+        self._idle_handle: Optional[asyncio.TimerHandle] = None
+
+    # -------------------------------------------------
+    # Subscribers
+    # -------------------------------------------------
+    def subscribe(self, filters: ListFilters, projection: Optional[dict]) -> Subscription:
+        """
+        filters: همان فیلترهای list_partners؛ ValueError اگر ظرفیت پر باشد
+        """
+        if len(self._subscribers) >= FEED_MAX_SUBSCRIBERS:
+            raise ValueError("Too many live feed subscribers")
+
+        subscription = Subscription(_build_list_query(filters), projection)
+        self._subscribers.add(subscription)
+        FEED_SUBSCRIBERS.set(len(self._subscribers))
+
+        if self._idle_handle is not None:
+            self._idle_handle.cancel()
+            self._idle_handle = None
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="partner-feed-upstream")
+
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        self._subscribers.discard(subscription)
+        FEED_SUBSCRIBERS.set(len(self._subscribers))
+
+        if not self._subscribers and self._task is not None and self._idle_handle is None:
+            loop = asyncio.get_running_loop()
+            self._idle_handle = loop.call_later(FEED_IDLE_SECONDS, self._stop_if_idle)
+
+    def _stop_if_idle(self):
+        self._idle_handle = None
+        if not self._subscribers and self._task is not None:
+            self._task.cancel()
+            self._task = None
+            logging.info("Partner feed upstream stopped (no subscribers)")
+
+    async def close(self):
+        if self._idle_handle is not None:
+            self._idle_handle.cancel()
+            self._idle_handle = None
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def seed(self, subscription: Subscription):
+        """
+        ids اولین FEED_TRACK_SEED ردیف لیست با همین فیلتر → matched
+        """
+        if FEED_TRACK_SEED <= 0:
+            return
+
+        cursor = (
+            self.collection
+            .find(subscription.query, {"_id": 1})
+            .sort(LIST_SORT)
+            .limit(FEED_TRACK_SEED)
+        )
+        try:
+            async for doc in cursor:
+                subscription.track(str(doc["_id"]))
+        except PyMongoError:
+            logging.exception("Partner feed seed failed; removals limited to changes seen from now")
+
+    def stats(self) -> dict:
+        return {
+            "source": self.source,
+            "subscribers": len(self._subscribers),
+            "running": self._task is not None and not self._task.done(),
+        }
+
+    # -------------------------------------------------
+    # Fan-out
+    # -------------------------------------------------
+    def _dispatch(self, doc: dict, reason: FeedReason, before: Optional[dict] = None):
+        """
+        before: pre-image change stream (اگر FEED_PRE_IMAGES و در دسترس)
+        """
+        seq = next(self._seq)
+        partner_id = str(doc["_id"])
+        deleted = bool(doc.get("meta", {}).get("is_deleted"))
+
+        for subscription in list(self._subscribers):
+            if not deleted and matches(subscription.query, doc):
+                subscription.track(partner_id)
+                delta = FeedDelta(seq, "upsert", reason, partner_id, project_doc(doc, subscription.projection))
+            elif reason != "created" and subscription.was_matching(partner_id, before):
+                delta = FeedDelta(seq, "remove", "deleted" if deleted else "unmatched", partner_id)
+            else:
+                # به این فیلتر ربطی نداشته و ندارد
+                continue
+            subscription.offer(delta)
+
+    # -------------------------------------------------
+    # Upstream
+    # -------------------------------------------------
+    async def _run(self):
+        if self.source is None:
+            available = await change_streams_available(self.collection)
+            self.source = "change_stream" if available else "poll"
+
+        logging.info(f"Partner feed upstream started ({self.source})")
+
+        while True:
+            try:
+                if self.source == "change_stream":
+                    await self._tail_change_stream()
+                else:
+                    await self._poll()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logging.exception("Partner feed upstream failed; restarting")
+                await asyncio.sleep(1)
+
+    async def _tail_change_stream(self):
+        # بعد از قطع، از همان لحظه ادامه می‌دهد؛ کلاینت‌ها لیست را خودشان دارند
+        options = {"full_document_before_change": "whenAvailable"} if FEED_PRE_IMAGES else {}
+
+        async with self.collection.watch(
+            [{"$match": {"operationType": {"$in": ["insert", "update", "replace"]}}}],
+            full_document="updateLookup",
+            **options,
+        ) as stream:
+            async for change in stream:
+                doc = change.get("fullDocument")
+                if doc is None:
+                    continue
+                FEED_CHANGES.inc(source="change_stream")
+                self._dispatch(
+                    doc,
+                    "created" if change["operationType"] == "insert" else "updated",
+                    change.get("fullDocumentBeforeChange"),
+                )
+
+    async def _poll(self):
+        since = datetime.utcnow()
+        overlap = timedelta(milliseconds=FEED_POLL_OVERLAP_MS)
+        # id → updated_at آخرین ارسال (برای حذف تکراری‌های پنجره همپوشان)
+        sent: Dict[str, datetime] = {}
+
+        while True:
+            await asyncio.sleep(FEED_POLL_INTERVAL_MS / 1000)
+
+            window_start = since - overlap
+            after: Optional[tuple] = None
+
+            # صفحه‌های پنجره تا اولین batch کوتاه‌تر از FEED_POLL_BATCH
+            while True:
+                try:
+                    docs = await (
+                        self.collection
+                        .find(_poll_query(window_start, after))
+                        .sort(POLL_SORT)
+                        .limit(FEED_POLL_BATCH)
+                        .to_list(length=FEED_POLL_BATCH)
+                    )
+                except PyMongoError:
+                    logging.exception("Partner feed poll failed")
+                    break
+
+                for doc in docs:
+                    meta = doc.get("meta", {})
+                    updated_at = meta.get("updated_at")
+                    key = str(doc["_id"])
+                    if sent.get(key) == updated_at:
+                        continue
+
+                    created_at = meta.get("created_at")
+                    first_seen = key not in sent
+                    sent[key] = updated_at
+
+                    reason = "created" if first_seen and created_at is not None and created_at >= window_start else "updated"
+                    FEED_CHANGES.inc(source="poll")
+                    self._dispatch(doc, reason)
+
+                    if updated_at is not None and updated_at > since:
+                        since = updated_at
+
+                if len(docs) < FEED_POLL_BATCH:
+                    break
+
+                last = docs[-1]
+                after = (last["meta"]["updated_at"], last["_id"])
+
+            # پنجره بعدی از since - overlap شروع می‌شود؛ قدیمی‌ترها لازم نیستند
+            cutoff = since - overlap
+            sent = {k: v for k, v in sent.items() if v is not None and v >= cutoff}
+
+
+# -------------------------------------------------
+# SSE
+# -------------------------------------------------
+def sse_message(event: str, data: dict, event_id: Optional[int] = None) -> bytes:
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    body = orjson.dumps(data, default=orjson_default, option=orjson.OPT_NON_STR_KEYS)
+    return f"{head}event: {event}\n".encode() + b"data: " + body + b"\n\n"
+
+
+async def sse_chunks(feed: PartnerFeed, subscription: Subscription) -> AsyncIterator[bytes]:
+    """
+    ready، سپس upsert / remove / reset؛ با قطع کلاینت generator لغو و subscriber حذف می‌شود
+    """
+    try:
+        yield f"retry: {FEED_RETRY_MS}\n\n".encode()
+        await feed.seed(subscription)
+        yield sse_message("ready", feed.stats())
+
+        while True:
+            try:
+                delta = await asyncio.wait_for(subscription.queue.get(), FEED_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield b": ping\n\n"
+                continue
+
+            yield sse_message(delta.op, delta.payload(), delta.seq)
+    finally:
+        feed.unsubscribe(subscription)
+
+
+# -------------------------------------------------
+# Singleton
+# -------------------------------------------------
+_feed: Optional[PartnerFeed] = None
+
+
+def get_partner_feed(collection: AsyncIOMotorCollection) -> PartnerFeed:
+    global _feed
+
+    if _feed is None:
+        _feed = PartnerFeed(collection)
+
+    return _feed
+
+
+async def close_partner_feed():
+    global _feed
+
+    if _feed is not None:
+        await _feed.close()
+        _feed = None
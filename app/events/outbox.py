@@ -0,0 +1,126 @@
+import os
+import logging
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
+
+from pymongo import ASCENDING, IndexModel
+
+from app.events.partner_events import PartnerEvent, change_events
+
+
+# =====================================
+# Outbox (جایگزین change stream)
+# روی mongod بدون replica set (و mongomock) change stream وجود ندارد؛
+# PartnerRepository بعد از هر write رویدادها را در partner_outbox می‌نویسد
+# و pipeline آن را به ترتیب _id می‌خواند
+#
+# تحویل best-effort است: outbox بعد از commit خود write و خارج از transaction
+# نوشته می‌شود (outbox فقط روی mongod بدون replica set لازم است، یعنی همان جایی
+# که transaction وجود ندارد)؛ crash بین این دو، یا خطای insert، رویداد را از دست می‌دهد
+#
+# هر پردازه (API، worker، ابزارهای CLI مثل dedup / backfill) منبع را خودش از
+# PARTNER_EVENTS_SOURCE می‌فهمد؛ auto با اولین write یک بار probe می‌شود
+# =====================================
+
+OUTBOX_COLLECTION = "partner_outbox"
+
+# رویدادهای قدیمی‌تر با TTL index پاک می‌شوند
+OUTBOX_TTL_SECONDS = int(os.getenv("PARTNER_OUTBOX_TTL_SECONDS", str(7 * 24 * 3600)))
+
+EVENTS_SOURCE = os.getenv("PARTNER_EVENTS_SOURCE", "off")
+
+# None: auto و هنوز probe نشده
+_outbox_enabled: Optional[bool] = None if EVENTS_SOURCE == "auto" else EVENTS_SOURCE == "outbox"
+
+
+def outbox_enabled() -> Optional[bool]:
+    return _outbox_enabled
+
+
+def set_outbox_enabled(enabled: bool):
+    """
+    pipeline (lifespan) بعد از انتخاب منبع صدا می‌زند
+    """
+    global _outbox_enabled
+    _outbox_enabled = enabled
+
+
+async def change_streams_available(collection) -> bool:
+    """
+    standalone mongod (و mongomock) change stream ندارند
+    """
+    try:
+        async with collection.watch(max_await_time_ms=1) as stream:
+            await stream.try_next()
+        return True
+    except Exception as e:
+        logging.info(f"Change streams unavailable ({e}); using outbox")
+        return False
+
+
+def change_streams_available_sync(collection) -> bool:
+    try:
+        with collection.watch(max_await_time_ms=1) as stream:
+            stream.try_next()
+        return True
+    except Exception as e:
+        logging.info(f"Change streams unavailable ({e}); using outbox")
+        return False
+
+
+async def resolve_outbox(collection) -> bool:
+    if _outbox_enabled is None:
+        set_outbox_enabled(not await change_streams_available(collection))
+    return _outbox_enabled
+
+
+def resolve_outbox_sync(collection) -> bool:
+    """
+    پردازه‌های sync (ابزارهای CLI) که lifespan ندارند
+    """
+    if _outbox_enabled is None:
+        set_outbox_enabled(not change_streams_available_sync(collection))
+    return _outbox_enabled
+
+
+def outbox_index_models() -> List[IndexModel]:
+    return [
+        IndexModel(
+            [("occurred_at", ASCENDING)],
+            name="outbox_ttl",
+            expireAfterSeconds=OUTBOX_TTL_SECONDS,
+        ),
+    ]
+
+
+def outbox_docs(changes: Iterable[Tuple[Optional[dict], Optional[dict]]]) -> List[dict]:
+    """
+    (قبل, بعد) های write → داکیومنت‌های outbox (_id را Mongo می‌سازد؛ ترتیب خواندن)
+    """
+    now = datetime.utcnow()
+    docs = []
+
+    for before, after in changes:
+        partner_id = (before or after or {}).get("_id")
+        if partner_id is None:
+            continue
+
+        for event_type, data in change_events(before, after):
+            docs.append({
+                "type": event_type,
+                "partner_id": str(partner_id),
+                "occurred_at": now,
+                "data": data,
+            })
+
+    return docs
+
+
+def event_from_outbox(doc: dict) -> PartnerEvent:
+    return PartnerEvent(
+        id=str(doc["_id"]),
+        type=doc["type"],
+        partner_id=doc["partner_id"],
+        occurred_at=doc["occurred_at"],
+        data=doc.get("data") or {},
+    )
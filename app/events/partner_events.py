@@ -0,0 +1,149 @@
+from datetime import datetime
+from enum import Enum
+from typing import List, Literal, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+
+# =====================================
+# Partner events (برای سرویس‌های پایین‌دستی)
+# رویدادهای فشرده به جای polling روی GET /partners:
+#   created | funnel_stage_changed | soft_deleted
+# منبع: change stream کالکشن partners یا outbox (app.events.outbox)
+# =====================================
+
+PartnerEventType = Literal["created", "funnel_stage_changed", "soft_deleted"]
+
+# فیلدهای identity / analysis که در رویداد created می‌آیند
+CREATED_FIELDS = {
+    "brand_name": "identity.brand_name",
+    "business_type": "identity.business_type",
+    "province": "identity.province",
+    "city": "identity.city",
+    "funnel_stage": "analysis.funnel_stage",
+    "source": "acquisition.source",
+}
+
+FUNNEL_STAGE_PATH = "analysis.funnel_stage"
+
+
+class PartnerEvent(BaseModel):
+    """
+    id: یکتا برای هر رویداد (resume token یا _id داکیومنت outbox)؛
+    تحویل at-least-once است و مصرف‌کننده با id تکراری‌ها را کنار می‌گذارد
+    """
+
+    id: str
+    type: PartnerEventType
+    partner_id: str
+    occurred_at: datetime
+    data: dict = Field(default_factory=dict)
+
+
+def _get_path(doc: Optional[dict], path: str):
+    value = doc
+    for part in path.split("."):
+        value = value.get(part) if isinstance(value, dict) else None
+    if isinstance(value, Enum):
+        value = value.value
+    return value
+
+
+def _is_deleted(doc: Optional[dict]) -> bool:
+    return bool(_get_path(doc, "meta.is_deleted"))
+
+
+def created_data(doc: dict) -> dict:
+    return {name: _get_path(doc, path) for name, path in CREATED_FIELDS.items()}
+
+
+def change_events(before: Optional[dict], after: Optional[dict]) -> List[Tuple[PartnerEventType, dict]]:
+    """
+    (قبل, بعد) یک write (همان changes ی rollup ها) → (نوع, data) رویدادها
+    after=None یعنی soft delete
+    """
+    if before is None:
+        return [] if after is None or _is_deleted(after) else [("created", created_data(after))]
+
+    if _is_deleted(before):
+        return []
+
+    if after is None or _is_deleted(after):
+        return [("soft_deleted", {})]
+
+    old = _get_path(before, FUNNEL_STAGE_PATH)
+    new = _get_path(after, FUNNEL_STAGE_PATH)
+    if old != new:
+        return [("funnel_stage_changed", {"from": old, "to": new})]
+
+    return []
+
+
+# -------------------------------------------------
+# Change stream → event
+# -------------------------------------------------
+def _updated_value(updated: dict, path: str):
+    """
+    مقدار جدید یک مسیر در updateDescription.updatedFields
+    (هم "analysis.funnel_stage" و هم $set کل "analysis")
+    """
+    if path in updated:
+        return True, updated[path]
+
+    parts = path.split(".")
+    for i in range(len(parts) - 1, 0, -1):
+        parent = ".".join(parts[:i])
+        if parent in updated:
+            value = updated[parent]
+            for part in parts[i:]:
+                value = value.get(part) if isinstance(value, dict) else None
+            return True, value
+
+    return False, None
+
+
+def event_from_change(change: dict) -> Optional[PartnerEvent]:
+    """
+    یک رویداد change stream → PartnerEvent یا None (تغییرهای بی‌ربط)
+    بدون pre-image مقدار from در funnel_stage_changed برابر None است
+    """
+    operation = change.get("operationType")
+    key = change.get("documentKey", {}).get("_id")
+    if key is None:
+        return None
+
+    cluster_time = change.get("clusterTime")
+    occurred_at = (
+        datetime.utcfromtimestamp(cluster_time.time) if cluster_time is not None
+        else change.get("wallTime") or datetime.utcnow()
+    )
+
+    events: List[Tuple[PartnerEventType, dict]] = []
+
+    if operation == "insert":
+        events = change_events(None, change.get("fullDocument"))
+
+    elif operation == "update":
+        updated = change.get("updateDescription", {}).get("updatedFields", {})
+        before = change.get("fullDocumentBeforeChange")
+
+        found, deleted = _updated_value(updated, "meta.is_deleted")
+        if found and deleted and not _is_deleted(before):
+            events = [("soft_deleted", {})]
+        else:
+            found, stage = _updated_value(updated, FUNNEL_STAGE_PATH)
+            old = _get_path(before, FUNNEL_STAGE_PATH)
+            if found and (before is None or old != stage):
+                events = [("funnel_stage_changed", {"from": old, "to": stage})]
+
+    if not events:
+        return None
+
+    event_type, data = events[0]
+    return PartnerEvent(
+        id=change["_id"]["_data"],
+        type=event_type,
+        partner_id=str(key),
+        occurred_at=occurred_at,
+        data=data,
+    )
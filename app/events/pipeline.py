@@ -0,0 +1,308 @@
+import asyncio
+import os
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import List, Literal, Optional, Tuple
+
+from bson import ObjectId
+from pymongo import ASCENDING
+from pymongo.errors import OperationFailure, PyMongoError
+from motor.motor_asyncio import AsyncIOMotorCollection
+
+from app.events.outbox import (
+    EVENTS_SOURCE,
+    OUTBOX_COLLECTION,
+    change_streams_available,
+    event_from_outbox,
+    set_outbox_enabled,
+)
+from app.events.partner_events import PartnerEvent, event_from_change
+from app.events.sinks import EventSink, sink_from_env
+from app.utils.metrics import get_metrics_registry
+
+
+# =====================================
+# Partner event pipeline (از lifespan شروع می‌شود)
+#
+#   reader (change stream | outbox) → صف محدود → publisher (batch) → sink
+#
+# - backpressure: صف پر → reader منتظر می‌ماند و از change stream / outbox نمی‌خواند
+# - batching: تا EVENTS_BATCH_SIZE رویداد یا EVENTS_BATCH_INTERVAL_MS
+# - resume: بعد از تحویل موفق هر batch، resume token (یا آخرین _id outbox)
+#   در event_offsets ذخیره می‌شود → بعد از restart از همان‌جا (at-least-once)
+# - sink خطا بدهد: backoff نمایی و تلاش دوباره همان batch
+#
+# PARTNER_EVENTS_SOURCE:
+#   off | change_stream (replica set) | outbox | auto (change stream اگر باشد، وگرنه outbox)
+# PARTNER_EVENTS_CONSUMER=false برای worker هایی که فقط outbox می‌نویسند
+# (با چند worker فقط یک پردازه باید مصرف‌کننده باشد)
+# =====================================
+
+EventsSource = Literal["off", "change_stream", "outbox", "auto"]
+
+EVENTS_CONSUMER = os.getenv("PARTNER_EVENTS_CONSUMER", "true").lower() in ("1", "true", "yes")
+
+EVENTS_BATCH_SIZE = int(os.getenv("PARTNER_EVENTS_BATCH_SIZE", "100"))
+EVENTS_BATCH_INTERVAL_MS = int(os.getenv("PARTNER_EVENTS_BATCH_INTERVAL_MS", "500"))
+EVENTS_QUEUE_SIZE = int(os.getenv("PARTNER_EVENTS_QUEUE_SIZE", "1000"))
+
+# MongoDB 6+ با changeStreamPreAndPostImages روی partners: مقدار from در funnel_stage_changed
+EVENTS_PRE_IMAGES = os.getenv("PARTNER_EVENTS_PRE_IMAGES", "false").lower() in ("1", "true", "yes")
+
+OUTBOX_POLL_INTERVAL_MS = int(os.getenv("PARTNER_OUTBOX_POLL_INTERVAL_MS", "1000"))
+# _id های outbox از چند worker دقیقاً به ترتیب commit نیستند؛
+# فقط داکیومنت‌های قدیمی‌تر از این فاصله خوانده می‌شوند (دقت زمان ObjectId ثانیه است)
+OUTBOX_SETTLE_MS = int(os.getenv("PARTNER_OUTBOX_SETTLE_MS", "1000"))
+
+OFFSETS_COLLECTION = "event_offsets"
+
+RETRY_MIN_SECONDS = 0.5
+RETRY_MAX_SECONDS = 30.0
+
+# کدهای خطای resume token منقضی‌شده (oplog جلوتر رفته)
+_HISTORY_LOST_CODES = {280, 286}
+
+_registry = get_metrics_registry()
+
+EVENTS_PUBLISHED = _registry.counter(
+    "partner_events_published_total",
+    "Partner events delivered to the sink",
+    ("type",),
+)
+EVENTS_PUBLISH_FAILURES = _registry.counter(
+    "partner_events_publish_failures_total",
+    "Failed sink deliveries (batch retried)",
+)
+EVENTS_QUEUE_DEPTH = _registry.gauge(
+    "partner_events_queue_depth",
+    "Events read from the source and waiting for the sink",
+)
+
+
+class PartnerEventPipeline:
+    def __init__(
+        self,
+        collection: AsyncIOMotorCollection,
+        sink: EventSink,
+        source: Literal["change_stream", "outbox"],
+        batch_size: int = EVENTS_BATCH_SIZE,
+        batch_interval_ms: int = EVENTS_BATCH_INTERVAL_MS,
+        queue_size: int = EVENTS_QUEUE_SIZE,
+    ):
+        self.collection = collection
+        self.sink = sink
+        self.source = source
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval_ms / 1000
+
+        self.offsets = collection.database[OFFSETS_COLLECTION]
+        self.outbox = collection.database[OUTBOX_COLLECTION]
+        self.offset_id = f"{collection.name}:{source}"
+
+        # (event, offset) — offset بعد از تحویل batch ذخیره می‌شود
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self._tasks: List[asyncio.Task] = []
+
+    # -------------------------------------------------
+    # Lifecycle
+    # -------------------------------------------------
+    def start(self):
+        reader = self._tail_change_stream if self.source == "change_stream" else self._tail_outbox
+        self._tasks = [
+            asyncio.create_task(reader(), name="partner-events-reader"),
+            asyncio.create_task(self._publish_loop(), name="partner-events-publisher"),
+        ]
+        logging.info(f"Partner event pipeline started ({self.source} → {self.sink.name})")
+
+    async def stop(self):
+        """
+        رویدادهای تحویل‌نشده در صف رها می‌شوند؛ offset آن‌ها ذخیره نشده
+        و بعد از start بعدی دوباره خوانده می‌شوند
+        """
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await self.sink.close()
+
+    # -------------------------------------------------
+    # Offsets (resume token / آخرین _id outbox)
+    # -------------------------------------------------
+    async def _load_offset(self):
+        doc = await self.offsets.find_one({"_id": self.offset_id})
+        return doc["offset"] if doc else None
+
+    async def _save_offset(self, offset):
+        await self.offsets.update_one(
+            {"_id": self.offset_id},
+            {"$set": {"offset": offset, "updated_at": datetime.utcnow()}},
+            upsert=True,
+        )
+
+    async def _enqueue(self, event: PartnerEvent, offset):
+        # صف پر → همین‌جا منتظر (backpressure)
+        await self.queue.put((event, offset))
+        EVENTS_QUEUE_DEPTH.set(self.queue.qsize())
+
+    # -------------------------------------------------
+    # Readers
+    # -------------------------------------------------
+    async def _tail_change_stream(self):
+        token = await self._load_offset()
+        delay = RETRY_MIN_SECONDS
+
+        options = {}
+        if EVENTS_PRE_IMAGES:
+            options["full_document_before_change"] = "whenAvailable"
+
+        while True:
+            try:
+                async with self.collection.watch(
+                    [{"$match": {"operationType": {"$in": ["insert", "update"]}}}],
+                    resume_after=token,
+                    **options,
+                ) as stream:
+                    delay = RETRY_MIN_SECONDS
+                    async for change in stream:
+                        token = change["_id"]
+                        event = event_from_change(change)
+                        if event is not None:
+                            await self._enqueue(event, token)
+
+            except OperationFailure as e:
+                if e.code in _HISTORY_LOST_CODES:
+                    # رویدادهای بین آخرین token و الان از دست رفته‌اند
+                    logging.error("Change stream resume token expired; resuming from now")
+                    token = None
+                    continue
+                logging.exception("Change stream failed; retrying")
+            except PyMongoError:
+                logging.exception("Change stream failed; retrying")
+
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, RETRY_MAX_SECONDS)
+
+    async def _tail_outbox(self):
+        last: Optional[ObjectId] = await self._load_offset()
+
+        while True:
+            try:
+                cutoff = datetime.now(timezone.utc) - timedelta(milliseconds=OUTBOX_SETTLE_MS)
+                query = {"_id": {"$lt": ObjectId.from_datetime(cutoff)}}
+                if last is not None:
+                    query["_id"]["$gt"] = last
+
+                docs = await (
+                    self.outbox
+                    .find(query)
+                    .sort("_id", ASCENDING)
+                    .limit(self.batch_size)
+                    .to_list(length=self.batch_size)
+                )
+            except PyMongoError:
+                logging.exception("Outbox read failed; retrying")
+                docs = []
+
+            for doc in docs:
+                last = doc["_id"]
+                await self._enqueue(event_from_outbox(doc), last)
+
+            if len(docs) < self.batch_size:
+                await asyncio.sleep(OUTBOX_POLL_INTERVAL_MS / 1000)
+
+    # -------------------------------------------------
+    # Publisher
+    # -------------------------------------------------
+    async def _next_batch(self) -> List[Tuple[PartnerEvent, object]]:
+        batch = [await self.queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.batch_interval
+
+        while len(batch) < self.batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        EVENTS_QUEUE_DEPTH.set(self.queue.qsize())
+        return batch
+
+    async def _publish_loop(self):
+        while True:
+            batch = await self._next_batch()
+            events = [event for event, _ in batch]
+            delay = RETRY_MIN_SECONDS
+
+            while True:
+                try:
+                    await self.sink.publish(events)
+                    break
+                except Exception:
+                    EVENTS_PUBLISH_FAILURES.inc()
+                    logging.exception(f"Partner event sink failed; retrying in {delay:.1f}s")
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, RETRY_MAX_SECONDS)
+
+            for event in events:
+                EVENTS_PUBLISHED.inc(type=event.type)
+
+            try:
+                await self._save_offset(batch[-1][1])
+            except PyMongoError:
+                # offset قدیمی‌تر فقط یعنی تحویل دوباره بعد از restart
+                logging.exception("Saving partner event offset failed")
+
+
+# -------------------------------------------------
+# Singleton (lifespan)
+# -------------------------------------------------
+_pipeline: Optional[PartnerEventPipeline] = None
+
+
+def get_partner_event_pipeline() -> Optional[PartnerEventPipeline]:
+    return _pipeline
+
+
+async def start_partner_events(
+    collection: AsyncIOMotorCollection,
+    sink: Optional[EventSink] = None,
+    source: EventsSource = EVENTS_SOURCE,
+    consumer: bool = EVENTS_CONSUMER,
+) -> Optional[PartnerEventPipeline]:
+    """
+    انتخاب منبع (auto: probe change stream)، روشن کردن outbox در صورت نیاز
+    و شروع pipeline اگر این پردازه مصرف‌کننده باشد
+    sink: پیش‌فرض sink_from_env()، فقط وقتی pipeline واقعاً شروع می‌شود
+    (تنظیمات sink با رویدادهای خاموش startup را متوقف نکند)
+    """
+    global _pipeline
+
+    if source == "off":
+        return None
+
+    if source == "auto":
+        source = "change_stream" if await change_streams_available(collection) else "outbox"
+
+    # PartnerRepository در همه worker ها باید outbox بنویسد، حتی اگر مصرف‌کننده نباشند
+    set_outbox_enabled(source == "outbox")
+
+    if not consumer:
+        return None
+
+    if sink is None:
+        sink = sink_from_env()
+
+    _pipeline = PartnerEventPipeline(collection, sink, source)
+    _pipeline.start()
+    return _pipeline
+
+
+async def stop_partner_events():
+    global _pipeline
+
+    if _pipeline is not None:
+        await _pipeline.stop()
+        _pipeline = None
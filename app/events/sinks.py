@@ -0,0 +1,113 @@
+import asyncio
+import os
+from abc import ABC, abstractmethod
+import urllib.request
+from typing import List
+
+import orjson
+
+from app.events.partner_events import PartnerEvent
+
+
+# =====================================
+# Event sinks
+# publish(batch) یک batch را تحویل می‌دهد؛ exception یعنی تحویل نشد
+# (pipeline با backoff دوباره تلاش می‌کند و resume token جلو نمی‌رود)
+# - queue:   asyncio.Queue درون‌پردازه‌ای (مصرف‌کننده‌های داخل همین اپ)
+# - webhook: POST یک JSON {"events": [...]} برای هر batch
+# - file:    NDJSON (یک خط برای هر رویداد)
+# =====================================
+
+EVENTS_SINK = os.getenv("PARTNER_EVENTS_SINK", "queue")
+EVENTS_QUEUE_SIZE = int(os.getenv("PARTNER_EVENTS_SINK_QUEUE_SIZE", "10000"))
+EVENTS_WEBHOOK_URL = os.getenv("PARTNER_EVENTS_WEBHOOK_URL", "")
+EVENTS_WEBHOOK_TIMEOUT = float(os.getenv("PARTNER_EVENTS_WEBHOOK_TIMEOUT", "5"))
+EVENTS_FILE = os.getenv("PARTNER_EVENTS_FILE", "partner_events.ndjson")
+
+
+def _event_json(event: PartnerEvent) -> bytes:
+    return orjson.dumps(event.model_dump(mode="json"))
+
+
+class EventSink(ABC):
+    name = "base"
+
+    @abstractmethod
+    async def publish(self, events: List[PartnerEvent]):
+        ...
+
+    async def close(self):
+        pass
+
+
+class QueueSink(EventSink):
+    """
+    صف پر → publish منتظر می‌ماند (backpressure تا خود change stream)
+    """
+
+    name = "queue"
+
+    def __init__(self, maxsize: int = EVENTS_QUEUE_SIZE):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+
+    async def publish(self, events: List[PartnerEvent]):
+        for event in events:
+            await self.queue.put(event)
+
+
+class WebhookSink(EventSink):
+    """
+    urllib روی thread (بدون وابستگی HTTP client جدید)؛ پاسخ غیر 2xx = خطا
+    """
+
+    name = "webhook"
+
+    def __init__(self, url: str, timeout: float = EVENTS_WEBHOOK_TIMEOUT):
+        if not url:
+            raise ValueError("PARTNER_EVENTS_WEBHOOK_URL is required for the webhook sink")
+        self.url = url
+        self.timeout = timeout
+
+    def _post(self, body: bytes):
+        request = urllib.request.Request(
+            self.url,
+            data=body,
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        # HTTPError برای 4xx / 5xx
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            if not 200 <= response.status < 300:
+                raise RuntimeError(f"Webhook responded {response.status}")
+
+    async def publish(self, events: List[PartnerEvent]):
+        body = b'{"events":[' + b",".join(_event_json(e) for e in events) + b"]}"
+        await asyncio.to_thread(self._post, body)
+
+
+class FileSink(EventSink):
+    name = "file"
+
+    def __init__(self, path: str = EVENTS_FILE):
+        self.path = path
+
+    def _append(self, lines: bytes):
+        with open(self.path, "ab") as f:
+            f.write(lines)
+
+    async def publish(self, events: List[PartnerEvent]):
+        lines = b"".join(_event_json(e) + b"\n" for e in events)
+        await asyncio.to_thread(self._append, lines)
+
+
+def sink_from_env() -> EventSink:
+    """
+    فقط وقتی pipeline در همین پردازه اجرا می‌شود ساخته شود (app.events.pipeline)
+    """
+    if EVENTS_SINK == "webhook":
+        return WebhookSink(EVENTS_WEBHOOK_URL)
+    if EVENTS_SINK == "file":
+        return FileSink(EVENTS_FILE)
+    if EVENTS_SINK == "queue":
+        return QueueSink()
+    raise ValueError(f"Unknown PARTNER_EVENTS_SINK: {EVENTS_SINK}")
@@ -1,9 +1,31 @@
+import time
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
-from app.database.mongo import ensure_indexes
+from app.database.mongo import (
+    MONGO_ENSURE_INDEXES_ON_STARTUP,
+    ensure_indexes_async,
+    get_async_mongo_client,
+    get_async_partners_collection,
+    close_mongo_clients,
+)
+from app.database.monitoring import register_mongo_monitoring
+from app.events.feed import close_partner_feed
+from app.events.pipeline import start_partner_events, stop_partner_events
+from app.repositories.partner_cache import check_partner_cache_backend
+from app.repositories.suggest_index import (
+    SUGGEST_INDEX_ENABLED,
+    build_suggest_index,
+    start_suggest_refresh,
+    stop_suggest_refresh,
+)
 from app.routers.partners import router as partners_router
+from app.routers.metrics import router as metrics_router
+from app.utils.response import ORJSONResponse
+from app.utils.timing import TimingMiddleware
+from app.utils.warmup import APP_WARMUP, record_startup_phase, warm_up
 
 
 @asynccontextmanager
@@ -11,21 +33,46 @@ async def lifespan(app: FastAPI):
     """
     Lifespan event handler
     - Startup logic
-    - Shutdown logic (if needed later)
+    - Shutdown logic
     """
     # ---- Startup ----
-    ensure_indexes()
+    check_partner_cache_backend()  # کش درون‌پردازه‌ای با چند worker → خطا
+    register_mongo_monitoring()  # قبل از ساخت اولین client
+    get_async_mongo_client()  # Motor client داخل event loop ساخته شود
+
+    # با app.serve ایندکس‌ها یک بار پیش از fork ساخته می‌شوند، نه در هر worker
+    if MONGO_ENSURE_INDEXES_ON_STARTUP:
+        started = time.perf_counter()
+        await ensure_indexes_async()
+        record_startup_phase("ensure_indexes", started)
+
+    if SUGGEST_INDEX_ENABLED:
+        started = time.perf_counter()
+        await build_suggest_index(get_async_partners_collection())
+        record_startup_phase("suggest_index", started)
+        # write های worker های دیگر را با rebuild دوره‌ای می‌گیرد
+        start_suggest_refresh(get_async_partners_collection())
+
+    if APP_WARMUP:
+        await warm_up(app)
+
+    # change stream (یا outbox) → sink؛ PARTNER_EVENTS_SOURCE=off یعنی خاموش
+    await start_partner_events(get_async_partners_collection())
 
     yield
 
     # ---- Shutdown ----
-    # (اینجا اگر خواستی بعداً connection رو ببندی)
+    await stop_suggest_refresh()
+    await close_partner_feed()
+    await stop_partner_events()
+    close_mongo_clients()
 
 
 app = FastAPI(
     title="CRM Backend",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 app.add_middleware(
@@ -34,6 +81,11 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
 
+# بیرونی‌ترین لایه: زمان کل درخواست (شامل CORS) + phase ها
+app.add_middleware(TimingMiddleware)
+
 app.include_router(partners_router)
+app.include_router(metrics_router)
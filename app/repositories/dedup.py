@@ -0,0 +1,264 @@
+import os
+import random
+import zlib
+from typing import Dict, Iterable, Iterator, List, Literal, Optional, Set
+
+from bson import ObjectId
+
+from app.utils.text import normalize_text, normalize_phone
+
+
+# =====================================
+# Duplicate detection engine
+# مشترک بین quick-entry (آنلاین) و app.tools.dedup_partners (batch)
+#
+# dedup.phones: شماره‌های نرمال‌شده کامل (تطابق دقیق، ایندکس‌دار)
+# dedup.bands:  LSH band های MinHash روی trigram های brand_name
+#               (نام‌های با شباهت Jaccard بالا با احتمال زیاد یک band مشترک دارند)
+# کاندیداها با یک find روی این دو آرایه پیدا و بعد دقیق امتیازدهی می‌شوند
+# =====================================
+
+DedupMode = Literal["off", "warn", "reject"]
+
+DEDUP_MODE: DedupMode = os.getenv("PARTNER_DEDUP_MODE", "warn")
+DEDUP_THRESHOLD = float(os.getenv("PARTNER_DEDUP_THRESHOLD", "0.6"))
+
+# سقف هزینه روی مسیر insert
+DEDUP_MAX_CANDIDATES = int(os.getenv("PARTNER_DEDUP_MAX_CANDIDATES", "20"))
+DEDUP_MAX_TIME_MS = int(os.getenv("PARTNER_DEDUP_MAX_TIME_MS", "50"))
+
+# 8 band × 4 ردیف → آستانه تقریبی LSH برابر (1/8)^(1/4) ≈ 0.59
+MINHASH_BANDS = 8
+MINHASH_ROWS = 4
+MINHASH_PERMUTATIONS = MINHASH_BANDS * MINHASH_ROWS
+
+_PRIME = (1 << 61) - 1
+
+# seed ثابت: امضاها بین پردازه‌ها و بین اجراها یکسان می‌مانند
+_rng = random.Random(0x5E4A)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME))
+    for _ in range(MINHASH_PERMUTATIONS)
+]
+
+
+def shingles(brand_name: Optional[str]) -> Set[str]:
+    """
+    trigram های کاراکتری نام نرمال‌شده (نام‌های خیلی کوتاه: خود نام)
+    """
+    text = normalize_text(brand_name)
+    if len(text) < 3:
+        return {text} if text else set()
+
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def minhash_bands(grams: Set[str]) -> List[str]:
+    if not grams:
+        return []
+
+    hashes = [zlib.crc32(gram.encode()) for gram in grams]
+    signature = [
+        min((a * h + b) % _PRIME for h in hashes)
+        for a, b in _PERMUTATIONS
+    ]
+
+    bands = []
+    for band in range(MINHASH_BANDS):
+        rows = signature[band * MINHASH_ROWS:(band + 1) * MINHASH_ROWS]
+        key = zlib.crc32(",".join(map(str, rows)).encode())
+        bands.append(f"{band}:{key:08x}")
+
+    return bands
+
+
+def identity_phones(identity: Optional[dict]) -> List[str]:
+    phones = []
+    for contact in (identity or {}).get("contact_numbers") or []:
+        phone = normalize_phone(contact.get("number"))
+        if phone and phone not in phones:
+            phones.append(phone)
+    return phones
+
+
+def dedup_fields(identity: Optional[dict]) -> dict:
+    identity = identity or {}
+
+    return {
+        "phones": identity_phones(identity),
+        "bands": minhash_bands(shingles(identity.get("brand_name"))),
+    }
+
+
+def candidate_query(fields: dict) -> Optional[dict]:
+    """
+    شرط Mongo برای کاندیداها؛ None اگر نه شماره‌ای هست نه نامی
+    """
+    clauses = []
+    if fields["phones"]:
+        clauses.append({"dedup.phones": {"$in": fields["phones"]}})
+    if fields["bands"]:
+        clauses.append({"dedup.bands": {"$in": fields["bands"]}})
+
+    if not clauses:
+        return None
+
+    return {"meta.is_deleted": False, "$or": clauses}
+
+
+# projection کاندیداها (فقط آنچه امتیازدهی و پاسخ لازم دارد)
+CANDIDATE_PROJECTION = {
+    "identity.brand_name": 1,
+    "identity.city": 1,
+    "identity.contact_numbers": 1,
+}
+
+
+def score_candidate(identity: dict, candidate: dict) -> Optional[dict]:
+    """
+    شماره مشترک → امتیاز 1
+    نام مشابه (Jaccard ≥ آستانه) در همان شهر (یا شهر نامعلوم) → امتیاز شباهت
+    None یعنی تکراری نیست (برخورد تصادفی band)
+    """
+    other = candidate.get("identity") or {}
+    reasons = []
+    score = 0.0
+
+    if set(identity_phones(identity)) & set(identity_phones(other)):
+        reasons.append("phone")
+        score = 1.0
+
+    city = normalize_text(identity.get("city"))
+    other_city = normalize_text(other.get("city"))
+
+    if not city or not other_city or city == other_city:
+        similarity = jaccard(
+            shingles(identity.get("brand_name")),
+            shingles(other.get("brand_name")),
+        )
+        if similarity >= DEDUP_THRESHOLD:
+            reasons.append("name")
+            score = max(score, round(similarity, 3))
+
+    if not reasons:
+        return None
+
+    return {
+        "id": str(candidate["_id"]),
+        "brand_name": other.get("brand_name"),
+        "city": other.get("city"),
+        "score": score,
+        "reasons": reasons,
+    }
+
+
+def rank_candidates(identity: dict, candidates: Iterable[dict]) -> List[dict]:
+    matches = [
+        match for match in (score_candidate(identity, c) for c in candidates)
+        if match is not None
+    ]
+    matches.sort(key=lambda m: m["score"], reverse=True)
+    return matches
+
+
+# batch: بزرگ‌ترین bucket قابل مقایسه (جفت‌ها O(n²))؛ بزرگ‌ترها معمولاً شماره
+# placeholder (مثلاً 0000000000) هستند و فقط گزارش می‌شوند
+DEDUP_MAX_BUCKET = int(os.getenv("PARTNER_DEDUP_MAX_BUCKET", "200"))
+
+# تعداد _id هایی که با یک find خوانده می‌شوند
+DEDUP_FETCH_BATCH = 1000
+
+BUCKET_FIELDS = {"p": "dedup.phones", "b": "dedup.bands"}
+
+
+def bucket_pipeline(field: str) -> List[dict]:
+    """
+    گروه‌بندی سمت سرور روی یک کلید (شماره / band)؛ فقط bucket های با بیش از یک عضو
+    """
+    return [
+        {"$match": {"meta.is_deleted": False, field: {"$exists": True, "$ne": []}}},
+        {"$project": {"key": f"${field}"}},
+        {"$unwind": "$key"},
+        {"$group": {"_id": "$key", "ids": {"$push": "$_id"}, "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": 1}}},
+    ]
+
+
+def iter_buckets(collection, max_bucket: int = DEDUP_MAX_BUCKET, oversized: Optional[List[dict]] = None) -> Iterator[List]:
+    """
+    _id های هر bucket (کرسر aggregate، نه کل کالکشن در حافظه)
+    bucket های بزرگ‌تر از max_bucket به oversized اضافه و رد می‌شوند
+    """
+    for prefix, field in BUCKET_FIELDS.items():
+        for bucket in collection.aggregate(bucket_pipeline(field), allowDiskUse=True):
+            if bucket["count"] > max_bucket:
+                if oversized is not None:
+                    oversized.append({"key": f"{prefix}:{bucket['_id']}", "count": bucket["count"]})
+                continue
+            yield sorted(bucket["ids"])
+
+
+def _summary(doc: dict) -> dict:
+    identity = doc.get("identity") or {}
+    return {"id": str(doc["_id"]), "brand_name": identity.get("brand_name"), "city": identity.get("city")}
+
+
+def group_duplicates(
+    collection,
+    max_bucket: int = DEDUP_MAX_BUCKET,
+    oversized: Optional[List[dict]] = None,
+) -> List[List[dict]]:
+    """
+    batch: bucket های مشترک (شماره / band) از aggregate + همان امتیازدهی quick-entry
+    - حافظه: فقط bucket های جاری و جفت‌های تکراری، نه کل کالکشن
+    - هر جفت فقط یک بار امتیاز می‌گیرد؛ bucket ها حداکثر max_bucket عضو دارند
+    خروجی: برای هر داکیومنت که تکراری دارد، [doc, *matches] (هر جفت فقط یک بار)
+    """
+    seen: Set[tuple] = set()
+    summaries: Dict[ObjectId, dict] = {}
+    matches: Dict[ObjectId, List[dict]] = {}
+    pending: List[List] = []
+
+    def flush():
+        ids = {oid for bucket in pending for oid in bucket}
+        docs = {
+            doc["_id"]: doc
+            for doc in collection.find({"_id": {"$in": list(ids)}}, CANDIDATE_PROJECTION)
+        }
+
+        for bucket in pending:
+            for i, oid in enumerate(bucket):
+                if oid not in docs:
+                    continue
+                identity = docs[oid].get("identity") or {}
+                for other in bucket[i + 1:]:
+                    if other not in docs or (oid, other) in seen:
+                        continue
+                    seen.add((oid, other))
+
+                    match = score_candidate(identity, docs[other])
+                    if match is not None:
+                        summaries.setdefault(oid, _summary(docs[oid]))
+                        matches.setdefault(oid, []).append(match)
+
+        pending.clear()
+
+    size = 0
+    for bucket in iter_buckets(collection, max_bucket, oversized):
+        pending.append(bucket)
+        size += len(bucket)
+        if size >= DEDUP_FETCH_BATCH:
+            flush()
+            size = 0
+    flush()
+
+    return [
+        [summaries[oid], *sorted(found, key=lambda m: m["score"], reverse=True)]
+        for oid, found in sorted(matches.items())
+    ]
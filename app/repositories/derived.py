@@ -0,0 +1,115 @@
+import re
+from typing import List, Optional
+
+from app.utils.text import normalize_text, tokenize, normalize_phone, phone_suffixes
+from app.repositories.dedup import dedup_fields
+from app.utils.geo import geo_point
+
+
+# =====================================
+# Derived fields (داخلی؛ فقط برای ایندکس و کوئری)
+# موقع write از روی داکیومنت ساخته می‌شوند و در خواندن حذف می‌شوند
+#
+# search.terms:  توکن‌های نرمال‌شده brand_name / manager_full_name / city
+# search.phones: شماره‌های نرمال‌شده + بخش‌های انتهایی آن‌ها
+# جستجو = regex با ^ (prefix) روی این آرایه‌ها → محدوده ایندکس، نه اسکن
+#
+# dedup.*: کلیدهای تشخیص تکراری (app.repositories.dedup)
+#
+# geo: identity.location به صورت GeoJSON Point (ایندکس 2dsphere / nearby)
+# =====================================
+
+DERIVED_FIELDS = ("search", "dedup", "geo")
+
+# projection پیش‌فرض خواندن (وقتی کل داکیومنت خواسته شده)
+EXCLUDE_DERIVED = {name: 0 for name in DERIVED_FIELDS}
+
+# فیلدهایی که تغییرشان derived fields را کهنه می‌کند
+DERIVED_SOURCES = ("identity",)
+
+SEARCH_TERM_FIELDS = ("brand_name", "manager_full_name", "city")
+
+# q فقط شامل رقم و جداکننده‌های رایج شماره تلفن
+_PHONE_QUERY = re.compile(r"[\d\s+\-()]+")
+
+
+def search_fields(identity: Optional[dict]) -> dict:
+    identity = identity or {}
+
+    terms: List[str] = []
+    for field in SEARCH_TERM_FIELDS:
+        for token in tokenize(identity.get(field)):
+            if token not in terms:
+                terms.append(token)
+
+    phones: List[str] = []
+    for contact in identity.get("contact_numbers") or []:
+        phone = normalize_phone(contact.get("number"))
+        if not phone:
+            continue
+        for suffix in phone_suffixes(phone):
+            if suffix not in phones:
+                phones.append(suffix)
+
+    return {"terms": terms, "phones": phones}
+
+
+def derived_fields(doc: dict) -> dict:
+    """
+    doc: داکیومنت کامل (یا حداقل بخش‌های DERIVED_SOURCES)
+    """
+    identity = doc.get("identity")
+
+    return {
+        "search": search_fields(identity),
+        "dedup": dedup_fields(identity),
+        "geo": geo_point((identity or {}).get("location")),
+    }
+
+
+def touches_derived(update_data: dict) -> bool:
+    """
+    آیا $set یکی از منابع derived fields را عوض می‌کند؟
+    """
+    return any(
+        key == source or key.startswith(f"{source}.")
+        for key in update_data
+        for source in DERIVED_SOURCES
+    )
+
+
+def read_projection(projection: Optional[dict]) -> dict:
+    """
+    projection کاربر (inclusion) یا حذف فیلدهای داخلی برای کل داکیومنت
+    """
+    return projection if projection is not None else EXCLUDE_DERIVED
+
+
+def search_query(q: str) -> Optional[dict]:
+    """
+    q → شرط Mongo
+    - هر توکن باید prefix یکی از search.terms باشد
+    - q تماماً عددی: prefix یکی از search.phones (یعنی هر بخشی از شماره) یا terms
+    None اگر q بعد از نرمال‌سازی خالی باشد
+    """
+    tokens = tokenize(q)
+    if not tokens:
+        return None
+
+    terms_query = {
+        "$and": [
+            {"search.terms": {"$regex": f"^{re.escape(token)}"}}
+            for token in tokens
+        ]
+    }
+
+    if _PHONE_QUERY.fullmatch(normalize_text(q)):
+        phone = normalize_phone(q)
+        return {
+            "$or": [
+                {"search.phones": {"$regex": f"^{re.escape(phone)}"}},
+                terms_query,
+            ]
+        }
+
+    return terms_query
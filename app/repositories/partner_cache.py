@@ -0,0 +1,245 @@
+import logging
+import os
+from typing import Any, Optional, Sequence, Tuple
+
+import orjson
+
+from app.utils.cache import TTLCache
+from app.utils.response import orjson_default
+
+
+# =====================================
+# Partner read-through cache (get_by_id)
+# - memory: LRU + TTL درون‌پردازه (پیش‌فرض)
+# - redis: هر کلاینت سازگار با redis.asyncio (get / set(ex=) / delete)
+#          برای تست می‌توان fakeredis را با set_partner_cache جایگزین کرد
+# - none: بدون کش
+#
+# stale read: get_by_id اول lookup (مقدار + token نسل کلید) و بعد از find_one
+# با همان token set می‌کند؛ اگر بین این دو delete آمده باشد set نادیده گرفته
+# می‌شود (memory) یا مقدار با نسل قدیمی در get بعدی miss حساب می‌شود (redis)
+#
+# memory فقط write های همین پردازه را می‌بیند → با چند worker مجاز نیست
+# (check_partner_cache_backend در lifespan)؛ redis یا none
+# =====================================
+
+PARTNER_CACHE_BACKEND = os.getenv("PARTNER_CACHE_BACKEND", "memory")
+PARTNER_CACHE_TTL = float(os.getenv("PARTNER_CACHE_TTL", "30"))
+PARTNER_CACHE_MAXSIZE = int(os.getenv("PARTNER_CACHE_MAXSIZE", "10000"))
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+REDIS_KEY_PREFIX = "crm:partner:"
+REDIS_GENERATION_PREFIX = "crm:partner:gen:"
+
+# uvicorn / gunicorn --workers (app.serve هم برای worker ها ست می‌کند)
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+
+
+class PartnerCache:
+    """
+    کش خالی (backend=none)؛ پایه بقیه backend ها
+    """
+
+    backend = "none"
+    shared = True
+
+    async def lookup(self, partner_id: str) -> Tuple[Optional[Any], Any]:
+        """
+        (مقدار یا None, token)؛ token به set همان خواندن داده می‌شود
+        """
+        return None, None
+
+    async def get(self, partner_id: str) -> Optional[Any]:
+        value, _ = await self.lookup(partner_id)
+        return value
+
+    async def set(self, partner_id: str, value: Any, token: Any = None):
+        pass
+
+    async def delete(self, partner_id: str):
+        pass
+
+    async def delete_many(self, partner_ids: Sequence[str]):
+        """
+        invalidate چند کلید (bulk update)؛ backend های شبکه‌ای در یک round trip
+        """
+        for partner_id in partner_ids:
+            await self.delete(partner_id)
+
+    def stats(self) -> dict:
+        return {"backend": self.backend}
+
+
+class MemoryPartnerCache(PartnerCache):
+    """
+    خود آبجکت (Partner یا dict) نگه داشته می‌شود؛ hit یعنی بدون ساخت دوباره مدل
+    """
+
+    backend = "memory"
+    shared = False
+
+    def __init__(self, maxsize: int = PARTNER_CACHE_MAXSIZE, ttl: float = PARTNER_CACHE_TTL):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        # partner_id → epoch آخرین delete (فقط باید از طول یک find_one بیشتر بماند)
+        self._invalidated = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._epoch = 0
+        self.stale_sets = 0
+
+    async def lookup(self, partner_id: str) -> Tuple[Optional[Any], Any]:
+        return self._cache.get(partner_id), self._epoch
+
+    async def set(self, partner_id: str, value: Any, token: Any = None):
+        if token is not None and (self._invalidated.get(partner_id) or 0) > token:
+            # داکیومنت پیش از یک write هم‌زمان خوانده شده
+            self.stale_sets += 1
+            return
+        self._cache.set(partner_id, value)
+
+    async def delete(self, partner_id: str):
+        self._epoch += 1
+        self._invalidated.set(partner_id, self._epoch)
+        self._cache.delete(partner_id)
+
+    def stats(self) -> dict:
+        return {"backend": self.backend, "stale_sets": self.stale_sets, **self._cache.stats()}
+
+
+class RedisPartnerCache(PartnerCache):
+    """
+    مقدار به صورت JSON {"g": نسل, "v": مقدار} ذخیره می‌شود و در hit به dict برمی‌گردد
+    - نسل هر کلید (crm:partner:gen:<id>) با هر delete در هر worker بالا می‌رود
+    - lookup: مقدار و نسل در یک MGET؛ نسل متفاوت = مقدار قدیمی = miss
+    خطای Redis نباید خواندن را خراب کند: miss حساب می‌شود
+    """
+
+    backend = "redis"
+
+    def __init__(self, client, ttl: float = PARTNER_CACHE_TTL):
+        self.client = client
+        self.ttl = ttl
+
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.errors = 0
+
+    @property
+    def _generation_ttl(self) -> int:
+        # بیشتر از عمر هر مقداری که با نسل قبلی set شده باشد
+        return max(int(self.ttl), 1) * 2 + 60
+
+    async def lookup(self, partner_id: str) -> Tuple[Optional[Any], Any]:
+        try:
+            raw, generation = await self.client.mget(
+                REDIS_KEY_PREFIX + partner_id,
+                REDIS_GENERATION_PREFIX + partner_id,
+            )
+        except Exception:
+            self.errors += 1
+            logging.exception("Partner cache get failed")
+            return None, None
+
+        generation = int(generation or 0)
+
+        if raw is None:
+            self.misses += 1
+            return None, generation
+
+        entry = orjson.loads(raw)
+        if not isinstance(entry, dict) or entry.get("g") != generation:
+            self.stale += 1
+            self.misses += 1
+            return None, generation
+
+        self.hits += 1
+        return entry["v"], generation
+
+    async def set(self, partner_id: str, value: Any, token: Any = None):
+        try:
+            if token is None:
+                token = int(await self.client.get(REDIS_GENERATION_PREFIX + partner_id) or 0)
+            await self.client.set(
+                REDIS_KEY_PREFIX + partner_id,
+                orjson.dumps({"g": token, "v": value}, default=orjson_default),
+                ex=max(int(self.ttl), 1),
+            )
+        except Exception:
+            self.errors += 1
+            logging.exception("Partner cache set failed")
+
+    async def delete(self, partner_id: str):
+        await self.delete_many([partner_id])
+
+    async def delete_many(self, partner_ids: Sequence[str]):
+        """
+        یک pipeline: INCR / EXPIRE نسل هر کلید و یک DEL چندکلیدی
+        """
+        if not partner_ids:
+            return
+
+        try:
+            async with self.client.pipeline(transaction=False) as pipe:
+                for partner_id in partner_ids:
+                    pipe.incr(REDIS_GENERATION_PREFIX + partner_id)
+                    pipe.expire(REDIS_GENERATION_PREFIX + partner_id, self._generation_ttl)
+                pipe.delete(*[REDIS_KEY_PREFIX + partner_id for partner_id in partner_ids])
+                await pipe.execute()
+        except Exception:
+            self.errors += 1
+            logging.exception("Partner cache delete failed")
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.backend,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "errors": self.errors,
+        }
+
+
+# =====================================
+# Singleton
+# =====================================
+
+_partner_cache: Optional[PartnerCache] = None
+
+
+def get_partner_cache() -> PartnerCache:
+    global _partner_cache
+
+    if _partner_cache is None:
+        if PARTNER_CACHE_BACKEND == "redis":
+            import redis.asyncio as redis_asyncio
+
+            _partner_cache = RedisPartnerCache(redis_asyncio.from_url(REDIS_URL))
+        elif PARTNER_CACHE_BACKEND == "memory":
+            _partner_cache = MemoryPartnerCache()
+        else:
+            _partner_cache = PartnerCache()
+
+        logging.info(f"Partner cache backend: {_partner_cache.backend}")
+
+    return _partner_cache
+
+
+def check_partner_cache_backend(workers: int = WEB_CONCURRENCY):
+    """
+    کش درون‌پردازه‌ای با چند worker: write یک worker کش بقیه را پاک نمی‌کند
+    و تا PARTNER_CACHE_TTL partner و ETag قدیمی (304 اشتباه) برمی‌گردد
+    """
+    cache = get_partner_cache()
+    if workers > 1 and not cache.shared:
+        raise RuntimeError(
+            f"PARTNER_CACHE_BACKEND={cache.backend} is per-process and cannot be used with "
+            f"{workers} workers; use PARTNER_CACHE_BACKEND=redis (or none)"
+        )
+
+
+def set_partner_cache(cache: PartnerCache):
+    """
+    جایگزینی backend (مثلاً RedisPartnerCache روی fakeredis در تست / benchmark)
+    """
+    global _partner_cache
+    _partner_cache = cache
@@ -1,10 +1,658 @@
+import asyncio
+import copy
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional, List, Tuple
+from typing import Optional, List, Tuple, Literal, Dict, Iterator, AsyncIterator
 from bson import ObjectId
+from pymongo import DESCENDING, ReturnDocument, UpdateOne
 from pymongo.collection import Collection
+from pymongo.errors import BulkWriteError, ExecutionTimeout, PyMongoError
+from motor.motor_asyncio import AsyncIOMotorCollection
 
 from app.models.partner import Partner
-from app.database.mongo import get_partners_collection
+from app.schemas.partner_filter import PartnerListFilter
+from app.utils.cursor import encode_cursor
+from app.utils.cache import TTLCache
+from app.utils.timing import phase, timed
+from app.repositories.partner_cache import PartnerCache, get_partner_cache
+from app.repositories.suggest_index import SuggestIndex, get_suggest_index
+from app.repositories.rollups import (
+    ROLLUP_COLLECTION,
+    ROLLUP_PROJECTION,
+    StatsSource,
+    touches_rollup,
+    rollup_deltas,
+    rollup_ops,
+    rollup_filter,
+    rollup_ready_query,
+    fold_rollups,
+    stats_facet_pipeline,
+    shape_facet_result,
+)
+from app.repositories.dedup import (
+    DEDUP_MAX_CANDIDATES,
+    DEDUP_MAX_TIME_MS,
+    CANDIDATE_PROJECTION,
+    dedup_fields,
+    candidate_query,
+    rank_candidates,
+)
+from app.repositories.derived import (
+    EXCLUDE_DERIVED,
+    derived_fields,
+    touches_derived,
+    read_projection,
+    search_query,
+)
+from app.events.outbox import (
+    OUTBOX_COLLECTION,
+    outbox_docs,
+    outbox_enabled,
+    resolve_outbox,
+    resolve_outbox_sync,
+)
+from app.database.mongo import (
+    get_partners_collection,
+    get_async_partners_collection,
+)
+
+
+# -------------------------------------------------
+# Total count cache
+# count_documents روی فیلترهای پهن از خود find گران‌تر است
+# -------------------------------------------------
+COUNT_CACHE_TTL = float(os.getenv("PARTNER_COUNT_CACHE_TTL", "30"))
+
+# exact: count_documents تازه | estimated: از کش (TTL) | none: بدون total
+TotalMode = Literal["exact", "estimated", "none"]
+
+_count_cache = TTLCache(maxsize=512, ttl=COUNT_CACHE_TTL)
+
+
+# -------------------------------------------------
+# Fast read path
+# خواندن بدون Partner(**doc) برای داده‌های قابل اعتماد کالکشن خودمان
+# -------------------------------------------------
+TRUSTED_READS = os.getenv("PARTNER_TRUSTED_READS", "false").lower() in ("1", "true", "yes")
+
+
+# -------------------------------------------------
+# Rollups readiness
+# تا rebuild_rollups یک بار اجرا نشده، partner_rollups ناقص است (فقط write های
+# بعد از deploy) → stats از live؛ بعد از دیدن نشانه دیگر چک نمی‌شود
+# -------------------------------------------------
+_rollup_marker_seen = False
+
+ROLLUPS_NOT_READY = "Rollups are not initialized yet; run python -m app.tools.rebuild_rollups"
+
+
+def _count_cache_key(query: dict) -> str:
+    return json.dumps(query, sort_keys=True, default=str)
+
+
+# -------------------------------------------------
+# List version (ETag لیست)
+# از آخرین تغییر کالکشن: (max meta.updated_at, _id آن) با ایندکس updated_at_id؛
+# write ها هزینه اضافه ندارند (هر write خودش meta.updated_at را ست می‌کند)
+# دو write در یک میلی‌ثانیه یا ساعت عقب‌تر یک worker ممکن است نسخه را عوض نکند؛
+# برای محدود کردن این حالت، نسخه هر LIST_VERSION_MAX_AGE ثانیه هم عوض می‌شود
+# -------------------------------------------------
+LIST_VERSION_MAX_AGE = float(os.getenv("PARTNER_LIST_VERSION_MAX_AGE", "60"))
+
+LATEST_CHANGE_SORT = [("meta.updated_at", DESCENDING), ("_id", DESCENDING)]
+
+
+def count_cache_stats() -> dict:
+    return _count_cache.stats()
+
+
+def _list_version(latest: Optional[dict]) -> str:
+    """
+    آخرین داکیومنت تغییر کرده → نسخه لیست
+    """
+    window = int(time.time() // LIST_VERSION_MAX_AGE) if LIST_VERSION_MAX_AGE > 0 else 0
+    if latest is None:
+        return f"empty:{window}"
+
+    updated_at = (latest.get("meta") or {}).get("updated_at")
+    return f"{updated_at}:{latest['_id']}:{window}"
+
+
+def _invalidate_list_caches():
+    """
+    بعد از هر write (create / update / soft_delete) صدا زده شود
+    """
+    _count_cache.clear()
+
+
+# -------------------------------------------------
+# Shared helpers (sync & async)
+# -------------------------------------------------
+def _to_object_id(partner_id: str) -> Optional[ObjectId]:
+    try:
+        return ObjectId(partner_id)
+    except Exception:
+        return None
+
+
+def _doc_to_partner(doc: dict) -> Partner | dict:
+    """
+    TRUSTED_READS: داکیومنت توسط خود ما نوشته شده؛ بدون اعتبارسنجی دوباره
+    (ساخت Partner روی هر سطر) به صورت dict با همان شکل برگردانده می‌شود
+    """
+    if TRUSTED_READS:
+        return {"id": str(doc.pop("_id")), **doc}
+
+    doc["id"] = str(doc["_id"])
+    del doc["_id"]
+    return Partner(**doc)
+
+
+def partner_insert_doc(partner: Partner) -> dict:
+    """
+    Partner → داکیومنت Mongo همراه با derived fields (search, ...)
+    """
+    data = partner.model_dump(exclude={"id"})
+    data.update(derived_fields(data))
+    return data
+
+
+def _suggest_sync(index: SuggestIndex, partner_id: str, doc: dict):
+    """
+    داکیومنت بعد از update → ایندکس suggest (حذف‌شده‌ها پیشنهاد نمی‌شوند)
+    """
+    if doc.get("meta", {}).get("is_deleted"):
+        index.remove(partner_id)
+    else:
+        index.upsert(partner_id, doc.get("identity", {}).get("brand_name"))
+
+
+# update identity: تعداد تلاش دوباره وقتی write هم‌زمانی شرط را عوض کرده
+DERIVED_UPDATE_RETRIES = 10
+
+
+def unchanged_filter(before: dict) -> dict:
+    """
+    update شرطی: فقط اگر داکیومنت از زمان خواندن تغییر نکرده باشد
+    (identity خودش هم در شرط است؛ دقت updated_at در Mongo میلی‌ثانیه است)
+    """
+    return {
+        "_id": before["_id"],
+        "meta.updated_at": before.get("meta", {}).get("updated_at"),
+        "identity": before.get("identity"),
+    }
+
+
+def _apply_set(doc: dict, data: dict) -> dict:
+    """
+    اعمال محلی یک $set (مسیرهای nested با نقطه) روی داکیومنت
+    """
+    for path, value in data.items():
+        target = doc
+        *parents, leaf = path.split(".")
+        for part in parents:
+            if not isinstance(target.get(part), dict):
+                target[part] = {}
+            target = target[part]
+        target[leaf] = value
+    return doc
+
+
+def _bulk_update_targets(updates: List[Tuple[str, dict]]) -> Tuple[Dict[str, str], Dict[str, ObjectId]]:
+    """
+    شناسه‌های معتبر و یکتا؛ بقیه همان‌جا خطا می‌گیرند
+    (دو تغییر روی یک partner در یک bulk_write بدون ترتیب، rollup را نامعین می‌کند)
+    """
+    results: Dict[str, str] = {}
+    oids: Dict[str, ObjectId] = {}
+
+    for partner_id, _ in updates:
+        if partner_id in oids or partner_id in results:
+            results[partner_id] = "duplicate id in batch"
+            oids.pop(partner_id, None)
+            continue
+
+        oid = _to_object_id(partner_id)
+        if oid is None:
+            results[partner_id] = "invalid id"
+        else:
+            oids[partner_id] = oid
+
+    return results, oids
+
+
+# bulk update: آیتم‌هایی که ابعاد rollup را عوض می‌کنند هر کدام یک find_one_and_update
+# با تصویر قبل اتمیک دارند؛ حداکثر این تعداد هم‌زمان (pool را قفل نکند)
+BULK_TRACKED_CONCURRENCY = int(os.getenv("PARTNER_BULK_TRACKED_CONCURRENCY", "16"))
+
+# (partner_id, oid, $set نهایی)
+BulkItem = Tuple[str, ObjectId, dict]
+
+
+def _bulk_update_split(
+    updates: List[Tuple[str, dict]],
+    oids: Dict[str, ObjectId],
+    now: datetime
+) -> Tuple[List[BulkItem], List[BulkItem]]:
+    """
+    plain: بدون اثر روی rollup → همه در یک bulk_write بدون شرط
+    tracked: ابعاد rollup را عوض می‌کنند → find_one_and_update جدا با تصویر قبل همان write
+    (تصویر قبل از یک find جدا با PATCH هم‌زمان کهنه می‌شود: rollup و رویداد from اشتباه)
+    """
+    plain: List[BulkItem] = []
+    tracked: List[BulkItem] = []
+
+    for partner_id, data in updates:
+        oid = oids.get(partner_id)
+        if oid is None:
+            continue
+
+        data = {"meta.updated_at": now, **data}
+        (tracked if touches_rollup(data) else plain).append((partner_id, oid, data))
+
+    return plain, tracked
+
+
+def _bulk_update_ops(plain: List[BulkItem]) -> List[UpdateOne]:
+    return [UpdateOne({"_id": oid}, {"$set": data}) for _, oid, data in plain]
+
+
+def _bulk_missing_query(plain: List[BulkItem], matched: int, errors: Dict[int, str]) -> Optional[dict]:
+    """
+    اگر همه op ها match شدند None؛ وگرنه کوئری یافتن داکیومنت‌های موجود (بقیه not_found)
+    """
+    if matched >= len(plain) - len(errors):
+        return None
+    return {"_id": {"$in": [oid for _, oid, _ in plain]}}
+
+
+def _bulk_update_finish(
+    plain: List[BulkItem],
+    errors: Dict[int, str],
+    existing: Optional[set],
+    results: Dict[str, str]
+):
+    """
+    نتیجه هر op بدون شرط؛ existing=None یعنی همه match شدند
+    """
+    for index, (partner_id, oid, _) in enumerate(plain):
+        if index in errors:
+            results[partner_id] = errors[index]
+        elif existing is not None and oid not in existing:
+            results[partner_id] = "not_found"
+        else:
+            results[partner_id] = "updated"
+
+
+def _tracked_result(partner_id: str, before: Optional[dict], data: dict, results: Dict[str, str]) -> list:
+    """
+    نتیجه find_one_and_update یک آیتم tracked → changes برای rollup / outbox
+    """
+    if before is None:
+        results[partner_id] = "not_found"
+        return []
+
+    results[partner_id] = "updated"
+    return [(before, _apply_set(copy.deepcopy(before), data))]
+
+
+def _updated_ids(results: Dict[str, str]) -> List[str]:
+    return [partner_id for partner_id, status in results.items() if status == "updated"]
+
+
+# dict: فیلترهای خام (مسیر → مقدار) | PartnerListFilter: DSL اعتبارسنجی‌شده
+ListFilters = dict | PartnerListFilter
+
+# فیلدهای لیستی PartnerListFilter → مسیر در داکیومنت
+LIST_FILTER_PATHS = {
+    "funnel_stage": "analysis.funnel_stage",
+    "business_type": "identity.business_type",
+    "financial_level": "analysis.financial_level",
+    "purchase_readiness": "analysis.purchase_readiness",
+    "potential_level": "analysis.potential_level",
+    "acquisition_source": "acquisition.source",
+    "province": "identity.province",
+    "city": "identity.city",
+}
+
+
+def _in_or_equal(values: list):
+    # تک مقدار: تساوی (equality در ایندکس‌ها و rollup ها)
+    values = [getattr(v, "value", v) for v in values]
+    return values[0] if len(values) == 1 else {"$in": values}
+
+
+def _compile_filter(f: PartnerListFilter) -> dict:
+    """
+    PartnerListFilter → یک کوئری Mongo
+    equality / $in روی فیلدهای ایندکس‌شده، بازه created_at روی کلید sort
+    """
+    query: dict = {"meta.is_deleted": False}
+
+    for name, path in LIST_FILTER_PATHS.items():
+        values = getattr(f, name)
+        if values:
+            query[path] = _in_or_equal(values)
+
+    if f.map_link:
+        query["identity.map_link"] = f.map_link
+
+    if f.tags:
+        if len(f.tags) == 1:
+            query["analysis.tags"] = f.tags[0]
+        else:
+            query["analysis.tags"] = {"$all" if f.tags_mode == "all" else "$in": f.tags}
+
+    created = {}
+    if f.created_from:
+        created["$gte"] = f.created_from
+    if f.created_to:
+        created["$lte"] = f.created_to
+    if created:
+        query["meta.created_at"] = created
+
+    for r in f.ranges:
+        bounds = query.setdefault(f"financial_estimation.{r.field}", {})
+        if r.min is not None:
+            bounds["$gte"] = r.min
+        if r.max is not None:
+            bounds["$lte"] = r.max
+
+    if f.q:
+        search = search_query(f.q)
+        if search:
+            query.update(search)
+
+    return query
+
+
+def _build_list_query(filters: ListFilters) -> dict:
+    """
+    فیلترهای داینامیک (nested fields) یا PartnerListFilter → کوئری Mongo
+    """
+    if isinstance(filters, PartnerListFilter):
+        return _compile_filter(filters)
+
+    query = {}
+
+    for key, value in filters.items():
+        if value is not None:
+            query[key] = value
+
+    return query
+
+
+# اندازه batch کرسر در export (تعداد داکیومنت در هر getMore)
+EXPORT_BATCH_SIZE = int(os.getenv("PARTNER_EXPORT_BATCH_SIZE", "1000"))
+
+# ترتیب ثابت لیست؛ _id برای شکستن تساوی created_at (keyset)
+LIST_SORT = [("meta.created_at", DESCENDING), ("_id", DESCENDING)]
+
+
+def _apply_keyset(query: dict, after: Tuple[datetime, ObjectId]) -> dict:
+    """
+    شرط «بعد از cursor» روی (meta.created_at, _id) به ترتیب نزولی
+    """
+    created_at, oid = after
+
+    return {
+        "$and": [
+            query,
+            {"meta.created_at": {"$lte": created_at}},
+            {
+                "$or": [
+                    {"meta.created_at": {"$lt": created_at}},
+                    {"meta.created_at": created_at, "_id": {"$lt": oid}},
+                ]
+            },
+        ]
+    }
+
+
+# فاصله از نقطه جستجو (متر) در خروجی nearby
+NEARBY_DISTANCE_FIELD = "distance_m"
+
+
+def _nearby_pipeline(
+    filters: ListFilters,
+    lat: float,
+    lng: float,
+    radius_m: float,
+    limit: int,
+    projection: Optional[dict] = None
+) -> List[dict]:
+    """
+    $geoNear روی geo (ایندکس 2dsphere) + همان فیلترهای list؛ مرتب بر اساس فاصله
+    """
+    project = dict(read_projection(projection))
+    if projection is not None:
+        project[NEARBY_DISTANCE_FIELD] = 1
+
+    return [
+        {
+            "$geoNear": {
+                "near": {"type": "Point", "coordinates": [lng, lat]},
+                "key": "geo",
+                "distanceField": NEARBY_DISTANCE_FIELD,
+                "maxDistance": radius_m,
+                "query": _build_list_query(filters),
+                "spherical": True,
+            }
+        },
+        {"$limit": limit},
+        {"$project": project},
+    ]
+
+
+# -------------------------------------------------
+# Query / result helpers (sync & async)
+# دو کلاس repository فقط I/O را انجام می‌دهند؛ ساخت کوئری و پردازش نتیجه این‌جاست
+# -------------------------------------------------
+def _inserted_changes(
+    partners: List[Partner],
+    docs: List[dict],
+    errors: Dict[int, str],
+    index: SuggestIndex
+) -> list:
+    """
+    بعد از insert_many: id هر ردیف موفق روی partner + ایندکس suggest
+    خروجی: changes (None, داکیومنت) برای rollup / outbox
+    """
+    changes = []
+
+    for i, (partner, doc) in enumerate(zip(partners, docs)):
+        if i in errors:
+            continue
+        partner.id = str(doc["_id"])
+        index.upsert(partner.id, partner.identity.brand_name)
+        changes.append((None, doc))
+
+    return changes
+
+
+def _duplicates_cursor(collection, identity: dict):
+    """
+    کرسر کاندیداهای تکراری (pymongo یا Motor)؛ None اگر identity چیزی برای مقایسه ندارد
+    """
+    query = candidate_query(dedup_fields(identity))
+    if query is None:
+        return None
+
+    return (
+        collection
+        .find(query, CANDIDATE_PROJECTION)
+        .limit(DEDUP_MAX_CANDIDATES)
+        .max_time_ms(DEDUP_MAX_TIME_MS)
+    )
+
+
+def _prepare_update(data: dict) -> Tuple[dict, bool, bool]:
+    """
+    $set نهایی (با updated_at) + آیا derived fields / rollup را عوض می‌کند
+    """
+    data = {"meta.updated_at": datetime.utcnow(), **data}
+    return data, touches_derived(data), touches_rollup(data)
+
+
+def _find_and_set(oid: ObjectId, data: dict, track: bool, projection: dict = EXCLUDE_DERIVED) -> dict:
+    """
+    آرگومان‌های find_one_and_update؛ track: تصویر قبل (rollup) وگرنه تصویر بعد
+    """
+    return {
+        "filter": {"_id": oid},
+        "update": {"$set": data},
+        "projection": projection,
+        "return_document": ReturnDocument.BEFORE if track else ReturnDocument.AFTER,
+    }
+
+
+def _find_and_set_result(doc: Optional[dict], data: dict, track: bool) -> Tuple[Optional[dict], Optional[dict]]:
+    """
+    نتیجه _find_and_set → (قبل, بعد)؛ با track تصویر بعد = قبل + همین $set
+    """
+    if not track:
+        return None, doc
+    if doc is None:
+        return None, None
+    return doc, _apply_set(copy.deepcopy(doc), data)
+
+
+def _derived_update(before: dict, data: dict) -> Tuple[dict, dict, dict]:
+    """
+    update شرطی identity: (filter, update, تصویر بعد)؛ derived fields از تصویر بعد
+    """
+    after = _apply_set(copy.deepcopy(before), data)
+    return unchanged_filter(before), {"$set": {**data, **derived_fields(after)}}, after
+
+
+def _concurrent_update(oid: ObjectId) -> RuntimeError:
+    return RuntimeError(f"Partner {oid} is being updated concurrently; retry")
+
+
+def _stats_match(filters: ListFilters, source: StatsSource) -> Optional[dict]:
+    return None if source == "live" else rollup_filter(_build_list_query(filters))
+
+
+def _stats_plan(match: Optional[dict], source: StatsSource, ready: bool) -> Optional[dict]:
+    """
+    شرط روی rollup ها، یا None یعنی live
+    ValueError: source=rollup با فیلتری که rollup ندارد یا پیش از ساخت rollup ها
+    """
+    if match is not None and not ready:
+        if source == "rollup":
+            raise ValueError(ROLLUPS_NOT_READY)
+        return None
+
+    if match is None and source == "rollup":
+        raise ValueError("Filters not supported by rollups")
+
+    return match
+
+
+def _rollup_stats(rows: List[dict], group_by: List[str]) -> dict:
+    return {**fold_rollups(rows, group_by), "source": "rollup"}
+
+
+def _live_stats(result: dict, group_by: List[str]) -> dict:
+    return {**shape_facet_result(result, group_by), "source": "live"}
+
+
+def _cached_count(query: dict, with_total: TotalMode) -> Tuple[str, Optional[int]]:
+    """
+    (کلید کش, مقدار کش‌شده)؛ فقط estimated از کش می‌خواند
+    """
+    key = _count_cache_key(query)
+    return key, _count_cache.get(key) if with_total == "estimated" else None
+
+
+def _soft_delete_args(partner_id: str) -> dict:
+    """
+    آرگومان‌های find_one_and_update برای soft delete (تصویر قبل برای rollup)
+    """
+    now = datetime.utcnow()
+    return {
+        "filter": {"_id": ObjectId(partner_id), "meta.is_deleted": False},
+        "update": {
+            "$set": {
+                "meta.is_deleted": True,
+                "meta.deleted_at": datetime.now(),
+                "meta.updated_at": now,
+            }
+        },
+        "projection": ROLLUP_PROJECTION,
+        "return_document": ReturnDocument.BEFORE,
+    }
+
+
+@dataclass
+class PartnerPage:
+    """
+    نتیجه list: آیتم‌ها + اطلاعات صفحه‌بندی
+    items: Partner، یا dict (TRUSTED_READS / projection جزئی)
+    """
+    items: List[Partner | dict]
+    total: Optional[int]
+    has_next: bool
+    next_cursor: Optional[str] = None
+
+
+def _from_cache(value: Partner | dict) -> Partner | dict:
+    """
+    backend های بیرونی (Redis) dict برمی‌گردانند
+    """
+    if isinstance(value, dict) and not TRUSTED_READS:
+        return Partner(**value)
+    return value
+
+
+def _doc_to_row(doc: dict) -> dict:
+    """
+    داکیومنت projection شده → dict جزئی (بدون ساخت مدل کامل Partner)
+    """
+    doc["id"] = str(doc.pop("_id"))
+    return doc
+
+
+def _bulk_matched(exc: BulkWriteError) -> int:
+    return exc.details.get("nMatched", 0)
+
+
+def _bulk_write_errors(exc: BulkWriteError) -> Dict[int, str]:
+    return {
+        err["index"]: err.get("errmsg", "write error")
+        for err in exc.details.get("writeErrors", [])
+    }
+
+
+def _build_page(
+    docs: List[dict],
+    limit: int,
+    total: Optional[int],
+    projection: Optional[dict] = None
+) -> PartnerPage:
+    """
+    docs با limit+1 آیتم خوانده شده‌اند؛ آیتم اضافه فقط نشانه صفحه بعد است
+    """
+    has_next = len(docs) > limit
+    docs = docs[:limit]
+
+    next_cursor = None
+    if has_next and docs:
+        last = docs[-1]
+        next_cursor = encode_cursor(last["meta"]["created_at"], last["_id"])
+
+    convert = _doc_to_partner if projection is None else _doc_to_row
+
+    return PartnerPage(
+        items=[convert(doc) for doc in docs],
+        total=total,
+        has_next=has_next,
+        next_cursor=next_cursor,
+    )
 
 
 class PartnerRepository:
@@ -14,104 +662,797 @@ class PartnerRepository:
     - بدون منطق بیزینسی
     """
 
-    def __init__(self, collection: Optional[Collection] = None):
-        self.collection = collection or get_partners_collection()
+    def __init__(
+        self,
+        collection: Optional[Collection] = None,
+        suggest_index: Optional[SuggestIndex] = None
+    ):
+        self.collection = (
+            collection if collection is not None else get_partners_collection()
+        )
+        self.suggest_index = (
+            suggest_index if suggest_index is not None else get_suggest_index()
+        )
+        self.rollups = self.collection.database[ROLLUP_COLLECTION]
+
+    # -------------------------------------------------
+    # Write hooks
+    # -------------------------------------------------
+    def _after_write(self, *partner_ids: str):
+        """
+        بعد از هر write موفق: کش‌های لیست (نسخه لیست از خود داده خوانده می‌شود)
+        """
+        _invalidate_list_caches()
+
+    def get_version(self) -> str:
+        latest = self.collection.find_one({}, {"meta.updated_at": 1}, sort=LATEST_CHANGE_SORT)
+        return _list_version(latest)
+
+    def _apply_rollups(self, changes: list):
+        """
+        changes: (قبل, بعد) هر write؛ خطا write اصلی را خراب نمی‌کند
+        (انحراف احتمالی با app.tools.rebuild_rollups اصلاح می‌شود)
+        """
+        ops = rollup_ops(rollup_deltas(changes))
+        if not ops:
+            return
+
+        try:
+            self.rollups.bulk_write(ops, ordered=False)
+        except Exception:
+            logging.exception("Partner rollup update failed")
+
+    def _write_outbox(self, changes: list):
+        """
+        فقط وقتی change stream در دسترس نیست (app.events.pipeline)
+        """
+        if outbox_enabled() is False:
+            return
+
+        docs = outbox_docs(changes)
+        if not docs or not resolve_outbox_sync(self.collection):
+            return
+
+        try:
+            self.collection.database[OUTBOX_COLLECTION].insert_many(docs, ordered=False)
+        except Exception:
+            logging.exception("Partner outbox write failed")
+
+    def _record_changes(self, changes: list):
+        """
+        changes: (قبل, بعد) هر write → rollup ها + outbox رویدادها
+        """
+        self._apply_rollups(changes)
+        self._write_outbox(changes)
 
     # -------------------------------------------------
     # Create
     # -------------------------------------------------
     def create(self, partner: Partner) -> Partner:
-        data = partner.model_dump(exclude={"id"})
+        data = partner_insert_doc(partner)
         result = self.collection.insert_one(data)
+        self._record_changes([(None, data)])
+        self._after_write()
         partner.id = str(result.inserted_id)
+        self.suggest_index.upsert(partner.id, partner.identity.brand_name)
         return partner
 
+    def create_many(self, partners: List[Partner]) -> Dict[int, str]:
+        """
+        insert_many بدون ترتیب: خطای یک ردیف بقیه batch را متوقف نمی‌کند
+        خروجی: {index: error} برای ردیف‌های ناموفق؛ id بقیه روی partner ست می‌شود
+        """
+        if not partners:
+            return {}
+
+        docs = [partner_insert_doc(partner) for partner in partners]
+
+        errors: Dict[int, str] = {}
+        try:
+            self.collection.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            errors = _bulk_write_errors(e)
+
+        self._record_changes(_inserted_changes(partners, docs, errors, self.suggest_index))
+        self._after_write()
+        return errors
+
     # -------------------------------------------------
-    # Get by ID
+    # Duplicate candidates
     # -------------------------------------------------
-    def get_by_id(self, partner_id: str) -> Optional[Partner]:
+    def find_duplicates(self, identity: dict) -> List[dict]:
+        """
+        کاندیداهای تکراری برای identity جدید (شماره مشترک / نام مشابه)
+        حداکثر DEDUP_MAX_CANDIDATES و DEDUP_MAX_TIME_MS؛ timeout یعنی بدون کاندیدا
+        """
+        cursor = _duplicates_cursor(self.collection, identity)
+        if cursor is None:
+            return []
+
         try:
-            oid = ObjectId(partner_id)
-        except Exception:
+            candidates = list(cursor)
+        except ExecutionTimeout:
+            logging.warning("Duplicate check timed out; skipped")
+            return []
+
+        return rank_candidates(identity, candidates)
+
+    # -------------------------------------------------
+    # Get by ID
+    # -------------------------------------------------
+    def get_by_id(self, partner_id: str) -> Optional[Partner | dict]:
+        oid = _to_object_id(partner_id)
+        if oid is None:
             return None
 
-        doc = self.collection.find_one({"_id": oid})
+        doc = self.collection.find_one({"_id": oid}, EXCLUDE_DERIVED)
         if not doc:
             return None
 
-        doc["id"] = str(doc["_id"])
-        del doc["_id"]
-        return Partner(**doc)
+        return _doc_to_partner(doc)
 
     # -------------------------------------------------
     # Update (Partial / Nested)
     # -------------------------------------------------
-    def update(self, partner_id: str, data: dict) -> Optional[Partner]:
-        try:
-            oid = ObjectId(partner_id)
-        except Exception:
+    def update(
+        self,
+        partner_id: str,
+        data: dict,
+        return_document: bool = True
+    ) -> Optional[Partner | dict | bool]:
+        """
+        یک round trip: find_one_and_update با داکیومنت بعد از تغییر
+        return_document=False (Prefer: return=minimal): فقط update_one و خروجی True
+        تغییر identity: derived fields در همان update (شرطی) نوشته می‌شوند
+        """
+        oid = _to_object_id(partner_id)
+        if oid is None:
             return None
 
-        result = self.collection.update_one(
-            {"_id": oid},
-            {"$set": data}
-        )
+        data, refresh, track = _prepare_update(data)
+
+        if not return_document and not refresh and not track:
+            result = self.collection.update_one(
+                {"_id": oid},
+                {"$set": data}
+            )
+
+            if result.matched_count == 0:
+                return None
 
-        if result.matched_count == 0:
+            self._after_write(partner_id)
+            return True
+
+        if refresh:
+            before, doc = self._update_with_derived(oid, data)
+        else:
+            result = self.collection.find_one_and_update(**_find_and_set(oid, data, track))
+            before, doc = _find_and_set_result(result, data, track)
+
+        if doc is None:
             return None
 
-        return self.get_by_id(partner_id)
+        if refresh:
+            _suggest_sync(self.suggest_index, partner_id, doc)
+
+        if track:
+            self._record_changes([(before, doc)])
+
+        self._after_write(partner_id)
+
+        return _doc_to_partner(doc) if return_document else True
+
+    def _update_with_derived(self, oid: ObjectId, data: dict) -> Tuple[Optional[dict], Optional[dict]]:
+        """
+        تغییر identity: خواندن، ساخت derived fields از تصویر بعد و یک update شرطی
+        ($set + derived با هم)؛ write هم‌زمان → شرط نمی‌خورد → از نو
+        خروجی: (قبل, بعد) یا (None, None) اگر داکیومنت نباشد
+        """
+        for _ in range(DERIVED_UPDATE_RETRIES):
+            before = self.collection.find_one({"_id": oid}, EXCLUDE_DERIVED)
+            if before is None:
+                return None, None
+
+            query, update, after = _derived_update(before, data)
+            result = self.collection.update_one(query, update)
+            if result.matched_count:
+                return before, after
+
+        raise _concurrent_update(oid)
+
+    # -------------------------------------------------
+    # Bulk update (many partial updates, one bulk_write)
+    # -------------------------------------------------
+    def bulk_update(self, updates: List[Tuple[str, dict]]) -> Dict[str, str]:
+        """
+        updates: (partner_id, $set با مسیرهای nested)
+        - بدون اثر روی rollup: یک bulk_write بدون ترتیب (find فقط اگر بعضی match نشدند)
+        - تغییر ابعاد rollup: هر آیتم find_one_and_update با تصویر قبل (اتمیک)
+        - خروجی: {partner_id: "updated" | "not_found" | پیام خطا}
+        derived fields بازسازی نمی‌شوند؛ برای identity از update() استفاده شود
+        """
+        results, oids = _bulk_update_targets(updates)
+        if not oids:
+            return results
+
+        plain, tracked = _bulk_update_split(updates, oids, datetime.utcnow())
+
+        if plain:
+            errors: Dict[int, str] = {}
+            try:
+                matched = self.collection.bulk_write(_bulk_update_ops(plain), ordered=False).matched_count
+            except BulkWriteError as e:
+                errors, matched = _bulk_write_errors(e), _bulk_matched(e)
+
+            missing = _bulk_missing_query(plain, matched, errors)
+            existing = None if missing is None else {doc["_id"] for doc in self.collection.find(missing, {"_id": 1})}
+            _bulk_update_finish(plain, errors, existing, results)
+
+        changes = []
+        for partner_id, oid, data in tracked:
+            try:
+                before = self.collection.find_one_and_update(**_find_and_set(oid, data, True, ROLLUP_PROJECTION))
+            except PyMongoError as e:
+                results[partner_id] = str(e)
+                continue
+            changes.extend(_tracked_result(partner_id, before, data, results))
+
+        self._record_changes(changes)
+        self._after_write(*_updated_ids(results))
+
+        return results
+
+    def find_ids(self, filters: ListFilters, limit: int) -> List[str]:
+        cursor = self.collection.find(_build_list_query(filters), {"_id": 1}).limit(limit)
+        return [str(doc["_id"]) for doc in cursor]
 
     # -------------------------------------------------
     # List + Filter + Pagination
     # -------------------------------------------------
     def list(
         self,
-        filters: dict,
+        filters: ListFilters,
         page: int = 1,
-        limit: int = 20
-    ) -> Tuple[List[Partner], int]:
+        limit: int = 20,
+        after: Optional[Tuple[datetime, ObjectId]] = None,
+        with_total: TotalMode = "exact",
+        projection: Optional[dict] = None
+    ) -> PartnerPage:
         """
         لیست مخاطبین با فیلتر و صفحه‌بندی
+        - page/limit: حالت قدیمی (skip)
+        - after: حالت keyset؛ (created_at, _id) آخرین آیتم صفحه قبل
+        - with_total: exact / estimated (کش TTL) / none (فقط has_next)
+        - projection: فقط فیلدهای لازم (app.repositories.projections)
         """
 
-        query = {}
-
-        # فیلترهای داینامیک (nested fields)
-        for key, value in filters.items():
-            if value is not None:
-                query[key] = value
+        query = _build_list_query(filters)
+        with phase("mongo_count"):
+            total = self._count(query, with_total)
 
-        skip = max(page - 1, 0) * limit
+        if after is not None:
+            query = _apply_keyset(query, after)
+            skip = 0
+        else:
+            skip = max(page - 1, 0) * limit
 
         cursor = (
             self.collection
-            .find(query)
+            .find(query, read_projection(projection))
+            .sort(LIST_SORT)
             .skip(skip)
-            .limit(limit)
-            .sort("meta.created_at", -1)
+            .limit(limit + 1)
         )
 
-        total = self.collection.count_documents(query)
+        with phase("mongo_find"):
+            docs = list(cursor)
 
-        partners: List[Partner] = []
+        with phase("build"):
+            return _build_page(docs, limit, total, projection)
+
+    # -------------------------------------------------
+    # Export (streaming)
+    # -------------------------------------------------
+    def iter_docs(
+        self,
+        filters: ListFilters,
+        projection: Optional[dict] = None,
+        batch_size: int = EXPORT_BATCH_SIZE
+    ) -> Iterator[dict]:
+        """
+        همه داکیومنت‌های فیلتر شده، مستقیم از کرسر (بدون ساخت Partner)
+        """
+        cursor = (
+            self.collection
+            .find(_build_list_query(filters), read_projection(projection))
+            .sort(LIST_SORT)
+            .batch_size(batch_size)
+        )
 
         for doc in cursor:
-            doc["id"] = str(doc["_id"])
-            del doc["_id"]
-            partners.append(Partner(**doc))
+            yield _doc_to_row(doc)
+
+    # -------------------------------------------------
+    # Nearby (geo)
+    # -------------------------------------------------
+    def nearby(
+        self,
+        filters: ListFilters,
+        lat: float,
+        lng: float,
+        radius_m: float,
+        limit: int = 20,
+        projection: Optional[dict] = None
+    ) -> List[dict]:
+        """
+        نزدیک‌ترین مخاطبین در شعاع radius_m؛ هر ردیف با distance_m
+        """
+        pipeline = _nearby_pipeline(filters, lat, lng, radius_m, limit, projection)
+        return [_doc_to_row(doc) for doc in self.collection.aggregate(pipeline)]
+
+    # -------------------------------------------------
+    # Stats
+    # -------------------------------------------------
+    def _rollups_ready(self) -> bool:
+        global _rollup_marker_seen
+
+        if not _rollup_marker_seen:
+            _rollup_marker_seen = self.rollups.find_one(rollup_ready_query(), {"_id": 1}) is not None
+        return _rollup_marker_seen
+
+    def stats(self, filters: ListFilters, group_by: List[str], source: StatsSource = "auto") -> dict:
+        """
+        auto: از rollup ها اگر فیلترها فقط روی ابعاد rollup باشند، وگرنه live ($facet)
+        ValueError: source=rollup با فیلتری که rollup ندارد یا پیش از ساخت rollup ها
+        """
+        match = _stats_match(filters, source)
+        match = _stats_plan(match, source, match is not None and self._rollups_ready())
 
-        return partners, total
+        if match is not None:
+            return _rollup_stats(list(self.rollups.find(match)), group_by)
+
+        pipeline = stats_facet_pipeline(_build_list_query(filters), group_by)
+        return _live_stats(next(self.collection.aggregate(pipeline)), group_by)
+
+    def _count(self, query: dict, with_total: TotalMode) -> Optional[int]:
+        if with_total == "none":
+            return None
+
+        key, cached = _cached_count(query, with_total)
+        if cached is not None:
+            return cached
+
+        total = self.collection.count_documents(query)
+        _count_cache.set(key, total)
+        return total
 
     def soft_delete(self, partner_id: str) -> bool:
-        result = self.collection.update_one(
-            {"_id": ObjectId(partner_id), "meta.is_deleted": False},
-            {
-                "$set": {
-                    "meta.is_deleted": True,
-                    "meta.deleted_at": datetime.now()
-                }
-            }
+        before = self.collection.find_one_and_update(**_soft_delete_args(partner_id))
+
+        if before is None:
+            return False
+
+        self.suggest_index.remove(partner_id)
+        self._record_changes([(before, None)])
+        self._after_write(partner_id)
+        return True
+
+
+class AsyncPartnerRepository:
+    """
+    نسخه async همان PartnerRepository (روی Motor)
+    - همان متدها: create, get_by_id, update, list, soft_delete
+    - برای route های async تا threadpool درگیر I/O دیتابیس نشود
+    - get_by_id از کش read-through (partner_cache) می‌خواند؛ write ها invalidate می‌کنند
+    """
+
+    def __init__(
+        self,
+        collection: Optional[AsyncIOMotorCollection] = None,
+        cache: Optional[PartnerCache] = None,
+        suggest_index: Optional[SuggestIndex] = None
+    ):
+        self.collection = (
+            collection if collection is not None
+            else get_async_partners_collection()
         )
+        self.cache = cache if cache is not None else get_partner_cache()
+        self.suggest_index = (
+            suggest_index if suggest_index is not None else get_suggest_index()
+        )
+        self.rollups = self.collection.database[ROLLUP_COLLECTION]
+
+    # -------------------------------------------------
+    # Write hooks
+    # -------------------------------------------------
+    async def _after_write(self, *partner_ids: str):
+        """
+        بعد از هر write موفق: کش‌های لیست و کش get_by_id
+        (نسخه لیست از خود داده خوانده می‌شود؛ write دیگری لازم نیست)
+        """
+        _invalidate_list_caches()
+
+        if partner_ids:
+            await self.cache.delete_many(partner_ids)
+
+    async def get_version(self) -> str:
+        """
+        نسخه لیست از آخرین تغییر کالکشن (بین همه worker ها مشترک)؛ یک خواندن روی ایندکس
+        """
+        latest = await self.collection.find_one({}, {"meta.updated_at": 1}, sort=LATEST_CHANGE_SORT)
+        return _list_version(latest)
+
+    async def _apply_rollups(self, changes: list):
+        """
+        changes: (قبل, بعد) هر write؛ خطا write اصلی را خراب نمی‌کند
+        (انحراف احتمالی با app.tools.rebuild_rollups اصلاح می‌شود)
+        """
+        ops = rollup_ops(rollup_deltas(changes))
+        if not ops:
+            return
+
+        try:
+            await self.rollups.bulk_write(ops, ordered=False)
+        except Exception:
+            logging.exception("Partner rollup update failed")
+
+    async def _write_outbox(self, changes: list):
+        """
+        فقط وقتی change stream در دسترس نیست (app.events.pipeline)
+        """
+        if outbox_enabled() is False:
+            return
+
+        docs = outbox_docs(changes)
+        if not docs or not await resolve_outbox(self.collection):
+            return
+
+        try:
+            await self.collection.database[OUTBOX_COLLECTION].insert_many(docs, ordered=False)
+        except Exception:
+            logging.exception("Partner outbox write failed")
+
+    async def _record_changes(self, changes: list):
+        """
+        changes: (قبل, بعد) هر write → rollup ها + outbox رویدادها
+        """
+        await self._apply_rollups(changes)
+        await self._write_outbox(changes)
+
+    # -------------------------------------------------
+    # Create
+    # -------------------------------------------------
+    async def create(self, partner: Partner) -> Partner:
+        data = partner_insert_doc(partner)
+        result = await self.collection.insert_one(data)
+        await self._record_changes([(None, data)])
+        await self._after_write()
+        partner.id = str(result.inserted_id)
+        self.suggest_index.upsert(partner.id, partner.identity.brand_name)
+        return partner
+
+    async def create_many(self, partners: List[Partner]) -> Dict[int, str]:
+        """
+        insert_many بدون ترتیب: خطای یک ردیف بقیه batch را متوقف نمی‌کند
+        خروجی: {index: error} برای ردیف‌های ناموفق؛ id بقیه روی partner ست می‌شود
+        """
+        if not partners:
+            return {}
+
+        docs = [partner_insert_doc(partner) for partner in partners]
+
+        errors: Dict[int, str] = {}
+        try:
+            await self.collection.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            errors = _bulk_write_errors(e)
+
+        await self._record_changes(_inserted_changes(partners, docs, errors, self.suggest_index))
+        await self._after_write()
+        return errors
+
+    # -------------------------------------------------
+    # Duplicate candidates
+    # -------------------------------------------------
+    async def find_duplicates(self, identity: dict) -> List[dict]:
+        """
+        کاندیداهای تکراری برای identity جدید (شماره مشترک / نام مشابه)
+        حداکثر DEDUP_MAX_CANDIDATES و DEDUP_MAX_TIME_MS؛ timeout یعنی بدون کاندیدا
+        """
+        cursor = _duplicates_cursor(self.collection, identity)
+        if cursor is None:
+            return []
+
+        try:
+            candidates = await cursor.to_list(length=DEDUP_MAX_CANDIDATES)
+        except ExecutionTimeout:
+            logging.warning("Duplicate check timed out; skipped")
+            return []
+
+        return rank_candidates(identity, candidates)
+
+    # -------------------------------------------------
+    # Get by ID
+    # -------------------------------------------------
+    async def get_by_id(self, partner_id: str) -> Optional[Partner | dict]:
+        oid = _to_object_id(partner_id)
+        if oid is None:
+            return None
+
+        cached, token = await timed("cache", self.cache.lookup(partner_id))
+        if cached is not None:
+            return _from_cache(cached)
+
+        doc = await timed("mongo_find", self.collection.find_one({"_id": oid}, EXCLUDE_DERIVED))
+        if not doc:
+            return None
+
+        with phase("build"):
+            partner = _doc_to_partner(doc)
+        # token: اگر write هم‌زمانی بعد از lookup کلید را پاک کرده، set نادیده گرفته می‌شود
+        await self.cache.set(partner_id, partner, token)
+        return partner
+
+    # -------------------------------------------------
+    # Update (Partial / Nested)
+    # -------------------------------------------------
+    async def update(
+        self,
+        partner_id: str,
+        data: dict,
+        return_document: bool = True
+    ) -> Optional[Partner | dict | bool]:
+        """
+        یک round trip: find_one_and_update با داکیومنت بعد از تغییر
+        return_document=False (Prefer: return=minimal): فقط update_one و خروجی True
+        تغییر identity: derived fields در همان update (شرطی) نوشته می‌شوند
+        """
+        oid = _to_object_id(partner_id)
+        if oid is None:
+            return None
+
+        data, refresh, track = _prepare_update(data)
+
+        if not return_document and not refresh and not track:
+            result = await self.collection.update_one(
+                {"_id": oid},
+                {"$set": data}
+            )
+
+            if result.matched_count == 0:
+                return None
+
+            await self._after_write(partner_id)
+            return True
+
+        if refresh:
+            before, doc = await self._update_with_derived(oid, data)
+        else:
+            result = await self.collection.find_one_and_update(**_find_and_set(oid, data, track))
+            before, doc = _find_and_set_result(result, data, track)
+
+        if doc is None:
+            return None
+
+        if refresh:
+            _suggest_sync(self.suggest_index, partner_id, doc)
+
+        if track:
+            await self._record_changes([(before, doc)])
+
+        await self._after_write(partner_id)
+
+        return _doc_to_partner(doc) if return_document else True
+
+    async def _update_with_derived(self, oid: ObjectId, data: dict) -> Tuple[Optional[dict], Optional[dict]]:
+        """
+        تغییر identity: خواندن، ساخت derived fields از تصویر بعد و یک update شرطی
+        ($set + derived با هم)؛ write هم‌زمان → شرط نمی‌خورد → از نو
+        خروجی: (قبل, بعد) یا (None, None) اگر داکیومنت نباشد
+        """
+        for _ in range(DERIVED_UPDATE_RETRIES):
+            before = await self.collection.find_one({"_id": oid}, EXCLUDE_DERIVED)
+            if before is None:
+                return None, None
+
+            query, update, after = _derived_update(before, data)
+            result = await self.collection.update_one(query, update)
+            if result.matched_count:
+                return before, after
+
+        raise _concurrent_update(oid)
+
+    # -------------------------------------------------
+    # Bulk update (many partial updates, one bulk_write)
+    # -------------------------------------------------
+    async def bulk_update(self, updates: List[Tuple[str, dict]]) -> Dict[str, str]:
+        """
+        updates: (partner_id, $set با مسیرهای nested)
+        - بدون اثر روی rollup: یک bulk_write بدون ترتیب (find فقط اگر بعضی match نشدند)
+        - تغییر ابعاد rollup: هر آیتم find_one_and_update با تصویر قبل (اتمیک)،
+          حداکثر BULK_TRACKED_CONCURRENCY هم‌زمان و موازی با bulk_write
+        - خروجی: {partner_id: "updated" | "not_found" | پیام خطا}
+        derived fields بازسازی نمی‌شوند؛ برای identity از update() استفاده شود
+        """
+        results, oids = _bulk_update_targets(updates)
+        if not oids:
+            return results
+
+        plain, tracked = _bulk_update_split(updates, oids, datetime.utcnow())
+        semaphore = asyncio.Semaphore(BULK_TRACKED_CONCURRENCY)
+
+        async def update_plain():
+            errors: Dict[int, str] = {}
+            try:
+                result = await self.collection.bulk_write(_bulk_update_ops(plain), ordered=False)
+                matched = result.matched_count
+            except BulkWriteError as e:
+                errors, matched = _bulk_write_errors(e), _bulk_matched(e)
+
+            missing = _bulk_missing_query(plain, matched, errors)
+            existing = None
+            if missing is not None:
+                existing = {doc["_id"] async for doc in self.collection.find(missing, {"_id": 1})}
+            _bulk_update_finish(plain, errors, existing, results)
+            return []
+
+        async def update_tracked(partner_id: str, oid: ObjectId, data: dict) -> list:
+            async with semaphore:
+                try:
+                    before = await self.collection.find_one_and_update(
+                        **_find_and_set(oid, data, True, ROLLUP_PROJECTION)
+                    )
+                except PyMongoError as e:
+                    results[partner_id] = str(e)
+                    return []
+            return _tracked_result(partner_id, before, data, results)
+
+        batches = await asyncio.gather(
+            *([update_plain()] if plain else []),
+            *(update_tracked(*item) for item in tracked),
+        )
+        changes = [change for batch in batches for change in batch]
+
+        await self._record_changes(changes)
+        await self._after_write(*_updated_ids(results))
+
+        return results
+
+    async def find_ids(self, filters: ListFilters, limit: int) -> List[str]:
+        cursor = self.collection.find(_build_list_query(filters), {"_id": 1}).limit(limit)
+        return [str(doc["_id"]) for doc in await cursor.to_list(length=limit)]
+
+    # -------------------------------------------------
+    # List + Filter + Pagination
+    # -------------------------------------------------
+    async def list(
+        self,
+        filters: ListFilters,
+        page: int = 1,
+        limit: int = 20,
+        after: Optional[Tuple[datetime, ObjectId]] = None,
+        with_total: TotalMode = "exact",
+        projection: Optional[dict] = None
+    ) -> PartnerPage:
+        """
+        لیست مخاطبین با فیلتر و صفحه‌بندی
+        - page/limit: حالت قدیمی (skip)
+        - after: حالت keyset؛ (created_at, _id) آخرین آیتم صفحه قبل
+        - with_total: exact / estimated (کش TTL) / none (فقط has_next)
+        - projection: فقط فیلدهای لازم (app.repositories.projections)
+        """
+
+        query = _build_list_query(filters)
+
+        if after is not None:
+            page_query = _apply_keyset(query, after)
+            skip = 0
+        else:
+            page_query = query
+            skip = max(page - 1, 0) * limit
+
+        cursor = (
+            self.collection
+            .find(page_query, read_projection(projection))
+            .sort(LIST_SORT)
+            .skip(skip)
+            .limit(limit + 1)
+        )
+
+        # find و count موازی اجرا می‌شوند
+        docs, total = await asyncio.gather(
+            timed("mongo_find", cursor.to_list(length=limit + 1)),
+            timed("mongo_count", self._count(query, with_total)),
+        )
+
+        with phase("build"):
+            return _build_page(docs, limit, total, projection)
+
+    # -------------------------------------------------
+    # Export (streaming)
+    # -------------------------------------------------
+    async def iter_docs(
+        self,
+        filters: ListFilters,
+        projection: Optional[dict] = None,
+        batch_size: int = EXPORT_BATCH_SIZE
+    ) -> AsyncIterator[dict]:
+        """
+        همه داکیومنت‌های فیلتر شده، مستقیم از کرسر (بدون ساخت Partner)
+        """
+        cursor = (
+            self.collection
+            .find(_build_list_query(filters), read_projection(projection))
+            .sort(LIST_SORT)
+            .batch_size(batch_size)
+        )
+
+        async for doc in cursor:
+            yield _doc_to_row(doc)
+
+    # -------------------------------------------------
+    # Nearby (geo)
+    # -------------------------------------------------
+    async def nearby(
+        self,
+        filters: ListFilters,
+        lat: float,
+        lng: float,
+        radius_m: float,
+        limit: int = 20,
+        projection: Optional[dict] = None
+    ) -> List[dict]:
+        """
+        نزدیک‌ترین مخاطبین در شعاع radius_m؛ هر ردیف با distance_m
+        """
+        pipeline = _nearby_pipeline(filters, lat, lng, radius_m, limit, projection)
+        docs = await self.collection.aggregate(pipeline).to_list(length=limit)
+        return [_doc_to_row(doc) for doc in docs]
+
+    # -------------------------------------------------
+    # Stats
+    # -------------------------------------------------
+    async def _rollups_ready(self) -> bool:
+        global _rollup_marker_seen
+
+        if not _rollup_marker_seen:
+            _rollup_marker_seen = await self.rollups.find_one(rollup_ready_query(), {"_id": 1}) is not None
+        return _rollup_marker_seen
+
+    async def stats(self, filters: ListFilters, group_by: List[str], source: StatsSource = "auto") -> dict:
+        """
+        auto: از rollup ها اگر فیلترها فقط روی ابعاد rollup باشند، وگرنه live ($facet)
+        ValueError: source=rollup با فیلتری که rollup ندارد یا پیش از ساخت rollup ها
+        """
+        match = _stats_match(filters, source)
+        match = _stats_plan(match, source, match is not None and await self._rollups_ready())
+
+        if match is not None:
+            return _rollup_stats(await self.rollups.find(match).to_list(length=None), group_by)
+
+        pipeline = stats_facet_pipeline(_build_list_query(filters), group_by)
+        results = await self.collection.aggregate(pipeline).to_list(length=1)
+        return _live_stats(results[0], group_by)
+
+    async def _count(self, query: dict, with_total: TotalMode) -> Optional[int]:
+        if with_total == "none":
+            return None
+
+        key, cached = _cached_count(query, with_total)
+        if cached is not None:
+            return cached
+
+        total = await self.collection.count_documents(query)
+        _count_cache.set(key, total)
+        return total
+
+    async def soft_delete(self, partner_id: str) -> bool:
+        before = await self.collection.find_one_and_update(**_soft_delete_args(partner_id))
+
+        if before is None:
+            return False
 
-        return result.matched_count == 1
\ No newline at end of file
+        self.suggest_index.remove(partner_id)
+        await self._record_changes([(before, None)])
+        await self._after_write(partner_id)
+        return True
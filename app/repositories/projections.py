@@ -0,0 +1,87 @@
+from typing import Dict, List, Optional, Set, Tuple, get_args
+
+from pydantic import BaseModel
+
+from app.models.partner import Partner
+
+
+# =====================================
+# Field projection برای list_partners
+# =====================================
+
+# همیشه خوانده می‌شود (cursor صفحه بعد از آن ساخته می‌شود)
+ALWAYS_INCLUDED = ("meta.created_at",)
+
+PARTNER_FIELD_PRESETS: Dict[str, Optional[Tuple[str, ...]]] = {
+    # کارت لیست: نام برند، شهر، مرحله قیف، شماره تماس
+    "card": (
+        "identity.brand_name",
+        "identity.city",
+        "identity.contact_numbers",
+        "analysis.funnel_stage",
+    ),
+    # کل داکیومنت (رفتار قبلی)
+    "full": None,
+}
+
+
+def _model_paths(model: type[BaseModel], prefix: str = "") -> List[str]:
+    """
+    مسیرهای فیلد به ترتیب تعریف در مدل
+    """
+    paths = []
+
+    for name, info in model.model_fields.items():
+        path = f"{prefix}{name}"
+        paths.append(path)
+
+        # Optional[SubModel] و List[SubModel] هم زیرفیلد دارند
+        for candidate in (info.annotation, *get_args(info.annotation)):
+            if isinstance(candidate, type) and issubclass(candidate, BaseModel):
+                paths += _model_paths(candidate, prefix=f"{path}.")
+
+    return paths
+
+
+_ORDERED_PATHS = [p for p in _model_paths(Partner) if p != "id"]
+
+# بخش‌ها (identity, analysis, ...) و فیلدهای داخلی آن‌ها
+PARTNER_FIELD_PATHS: Set[str] = set(_ORDERED_PATHS)
+
+# فقط برگ‌ها، به ترتیب مدل (ستون‌های CSV)
+PARTNER_LEAF_PATHS: List[str] = [
+    path for path in _ORDERED_PATHS
+    if not any(other.startswith(f"{path}.") for other in PARTNER_FIELD_PATHS)
+]
+
+
+def resolve_projection(fields: Optional[str]) -> Optional[dict]:
+    """
+    fields: نام preset (card / full) یا لیست فیلدها با کاما
+    None یعنی کل داکیومنت
+    ValueError برای فیلد ناشناخته
+    """
+    if not fields:
+        return None
+
+    fields = fields.strip()
+
+    if fields in PARTNER_FIELD_PRESETS:
+        paths = PARTNER_FIELD_PRESETS[fields]
+    else:
+        paths = tuple(f.strip() for f in fields.split(",") if f.strip())
+        unknown = [f for f in paths if f not in PARTNER_FIELD_PATHS]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+
+    if paths is None:
+        return None
+
+    selected = set(paths) | set(ALWAYS_INCLUDED)
+
+    # Mongo روی مسیرهای هم‌پوشان (identity و identity.city) خطا می‌دهد
+    return {
+        path: 1
+        for path in sorted(selected)
+        if not any(path.startswith(f"{other}.") for other in selected)
+    }
@@ -0,0 +1,272 @@
+from datetime import datetime
+from enum import Enum
+from typing import Dict, Iterable, List, Literal, Optional, Tuple
+
+from pymongo import UpdateOne
+
+
+# =====================================
+# Partner rollups (GET /partners/stats)
+# یک داکیومنت به ازای هر ترکیب ابعاد:
+#   {_id: {funnel_stage: "lead", business_type: "furniture_showroom", province: "Tehran", source: null},
+#    funnel_stage, business_type, province, source, count}
+# _id زیرداکیومنت با ترتیب ثابت ابعاد است (None با "" یکی نمی‌شود، مقدار حاوی "|" هم مشکلی ندارد)
+# write ها (create / update / soft_delete) فقط count ترکیب قبل و بعد را $inc می‌کنند
+# خواندن آمار = O(تعداد ترکیب‌ها)، نه O(تعداد partner ها)
+# =====================================
+
+ROLLUP_COLLECTION = "partner_rollups"
+
+# نشانه «rollup ها یک بار کامل ساخته شده‌اند» (داخل همان کالکشن، با rebuild و rename
+# همراه داده‌ها ظاهر می‌شود)؛ تا وقتی نباشد stats از حالت live می‌خواند
+# روی دیتابیس موجود: python -m app.tools.rebuild_rollups (app.serve خودکار اجرا می‌کند)
+ROLLUP_STATE_ID = "_state"
+
+# نسخه شکل داکیومنت‌ها؛ نشانه با نسخه قدیمی‌تر یعنی rollup ها باید از نو ساخته شوند
+# 2: _id زیرداکیومنت (قبلاً رشته "a|b|c|d")
+ROLLUP_FORMAT = 2
+
+# نام بعد → مسیر فیلد در داکیومنت partner
+ROLLUP_DIMENSIONS: Dict[str, str] = {
+    "funnel_stage": "analysis.funnel_stage",
+    "business_type": "identity.business_type",
+    "province": "identity.province",
+    "source": "acquisition.source",
+}
+
+# برای خواندن تصویر قبل / بعد در update و soft_delete
+ROLLUP_PROJECTION = {
+    **{path: 1 for path in ROLLUP_DIMENSIONS.values()},
+    "meta.is_deleted": 1,
+}
+
+RollupKey = Tuple[Optional[str], ...]
+
+# auto: rollup اگر فیلترها اجازه دهند | rollup | live ($facet روی partners)
+StatsSource = Literal["auto", "rollup", "live"]
+
+
+def _get_path(doc: dict, path: str):
+    value = doc
+    for part in path.split("."):
+        value = value.get(part) if isinstance(value, dict) else None
+    if isinstance(value, Enum):
+        value = value.value
+    return value
+
+
+def rollup_key(doc: Optional[dict]) -> Optional[RollupKey]:
+    """
+    None برای داکیومنت ناموجود یا حذف‌شده (در آمار حساب نمی‌شود)
+    """
+    if not doc or _get_path(doc, "meta.is_deleted"):
+        return None
+
+    return tuple(_get_path(doc, path) for path in ROLLUP_DIMENSIONS.values())
+
+
+def rollup_id(key: RollupKey) -> dict:
+    return dict(zip(ROLLUP_DIMENSIONS, key))
+
+
+def rollup_id_key(rollup_id_doc: dict) -> RollupKey:
+    """
+    _id یک داکیومنت rollup → همان ترکیب (قابل hash، برای مقایسه)
+    """
+    return tuple(rollup_id_doc.get(name) for name in ROLLUP_DIMENSIONS)
+
+
+def rollup_ready_query() -> dict:
+    """
+    نشانه ساخت کامل با شکل فعلی داکیومنت‌ها
+    """
+    return {"_id": ROLLUP_STATE_ID, "format": ROLLUP_FORMAT}
+
+
+def touches_rollup(update_data: dict) -> bool:
+    """
+    آیا $set یکی از ابعاد (یا والد آن، مثل analysis) را عوض می‌کند؟
+    """
+    return any(
+        path == key or path.startswith(f"{key}.") or key.startswith(f"{path}.")
+        for key in update_data
+        for path in ROLLUP_DIMENSIONS.values()
+    )
+
+
+def rollup_deltas(changes: Iterable[Tuple[Optional[dict], Optional[dict]]]) -> Dict[RollupKey, int]:
+    """
+    (قبل, بعد) های هر write → تغییر count هر ترکیب
+    """
+    deltas: Dict[RollupKey, int] = {}
+
+    for before, after in changes:
+        old = rollup_key(before)
+        new = rollup_key(after)
+        if old == new:
+            continue
+        if old is not None:
+            deltas[old] = deltas.get(old, 0) - 1
+        if new is not None:
+            deltas[new] = deltas.get(new, 0) + 1
+
+    return {key: delta for key, delta in deltas.items() if delta}
+
+
+def rollup_ops(deltas: Dict[RollupKey, int]) -> List[UpdateOne]:
+    return [
+        UpdateOne(
+            {"_id": rollup_id(key)},
+            {
+                "$inc": {"count": delta},
+                "$setOnInsert": dict(zip(ROLLUP_DIMENSIONS, key)),
+            },
+            upsert=True,
+        )
+        for key, delta in deltas.items()
+    ]
+
+
+# -------------------------------------------------
+# Rebuild (app.tools.rebuild_rollups)
+# -------------------------------------------------
+def rebuild_pipeline() -> List[dict]:
+    """
+    شمارش کامل هر ترکیب از روی partners (تعداد خروجی = تعداد ترکیب‌ها)
+    """
+    return [
+        {"$match": {"meta.is_deleted": False}},
+        {
+            "$group": {
+                "_id": {name: f"${path}" for name, path in ROLLUP_DIMENSIONS.items()},
+                "count": {"$sum": 1},
+            }
+        },
+    ]
+
+
+def rollup_state_doc() -> dict:
+    return {"_id": ROLLUP_STATE_ID, "format": ROLLUP_FORMAT, "initialized_at": datetime.utcnow()}
+
+
+def rebuild_docs(rows: Iterable[dict]) -> List[dict]:
+    docs = []
+    for row in rows:
+        key = tuple(_raw(row["_id"].get(name)) for name in ROLLUP_DIMENSIONS)
+        docs.append({
+            "_id": rollup_id(key),
+            **dict(zip(ROLLUP_DIMENSIONS, key)),
+            "count": row["count"],
+        })
+    return docs
+
+
+# -------------------------------------------------
+# Stats (خواندن)
+# -------------------------------------------------
+def rollup_filter(filters: dict) -> Optional[dict]:
+    """
+    فیلترهای list → شرط روی rollup ها
+    None اگر فیلتری خارج از ابعاد rollup باشد (فقط حالت live جواب می‌دهد)
+    """
+    names = {path: name for name, path in ROLLUP_DIMENSIONS.items()}
+    match = {}
+
+    for key, value in filters.items():
+        if value is None or (key == "meta.is_deleted" and value is False):
+            continue
+        if key not in names:
+            return None
+        match[names[key]] = value
+
+    return match
+
+
+def fold_rollups(rows: Iterable[dict], group_by: List[str]) -> dict:
+    """
+    داکیومنت‌های rollup → همان شکل خروجی live ($facet)
+    """
+    total = 0
+    groups: Dict[tuple, int] = {}
+    by: Dict[str, Dict[str, int]] = {name: {} for name in ROLLUP_DIMENSIONS}
+
+    for row in rows:
+        count = row.get("count", 0)
+        if count <= 0:
+            continue
+
+        total += count
+
+        group = tuple(row.get(name) for name in group_by)
+        groups[group] = groups.get(group, 0) + count
+
+        for name in ROLLUP_DIMENSIONS:
+            value = _stat_label(row.get(name))
+            by[name][value] = by[name].get(value, 0) + count
+
+    return {
+        "total": total,
+        "groups": sorted(
+            ({**dict(zip(group_by, group)), "count": count} for group, count in groups.items()),
+            key=lambda g: g["count"],
+            reverse=True,
+        ),
+        "by": by,
+    }
+
+
+def _stat_label(value) -> str:
+    # کلید JSON؛ مقدار خالی با "unknown"
+    if isinstance(value, Enum):
+        value = value.value
+    return "unknown" if value is None else str(value)
+
+
+def stats_facet_pipeline(query: dict, group_by: List[str]) -> List[dict]:
+    """
+    حالت live: یک $facet روی partners با همان فیلترهای list
+    """
+    return [
+        {"$match": query},
+        {
+            "$facet": {
+                "total": [{"$count": "count"}],
+                "groups": [
+                    {
+                        "$group": {
+                            "_id": {name: f"${ROLLUP_DIMENSIONS[name]}" for name in group_by},
+                            "count": {"$sum": 1},
+                        }
+                    },
+                    {"$sort": {"count": -1}},
+                ],
+                **{
+                    f"by_{name}": [{"$group": {"_id": f"${path}", "count": {"$sum": 1}}}]
+                    for name, path in ROLLUP_DIMENSIONS.items()
+                },
+            }
+        },
+    ]
+
+
+def shape_facet_result(result: dict, group_by: List[str]) -> dict:
+    total = result["total"][0]["count"] if result["total"] else 0
+
+    return {
+        "total": total,
+        "groups": [
+            {
+                **{name: _raw(row["_id"].get(name)) for name in group_by},
+                "count": row["count"],
+            }
+            for row in result["groups"]
+        ],
+        "by": {
+            name: {_stat_label(row["_id"]): row["count"] for row in result[f"by_{name}"]}
+            for name in ROLLUP_DIMENSIONS
+        },
+    }
+
+
+def _raw(value):
+    return value.value if isinstance(value, Enum) else value
@@ -0,0 +1,195 @@
+import asyncio
+import bisect
+import logging
+import os
+import time
+from threading import Lock
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.utils.text import normalize_text
+
+
+# =====================================
+# Brand name suggest index (typeahead)
+# آرایه مرتب (key, partner_id) در حافظه هر worker
+# - key: brand_name نرمال‌شده از ابتدای هر کلمه آن
+#   («مبل آراد» → «مبل اراد» و «اراد») تا شروع هر کلمه قابل جستجو باشد
+# - lookup: bisect + خواندن پشت سر هم تا وقتی prefix برقرار است
+# - در lifespan ساخته می‌شود و write های همین worker آن را به‌روز می‌کنند
+# - eventually consistent: write های worker های دیگر (و تغییر مستقیم دیتابیس)
+#   این‌جا دیده نمی‌شوند تا rebuild بعدی؛ هر PARTNER_SUGGEST_REFRESH_SECONDS
+#   از نو ساخته می‌شود (0 = فقط در startup، مناسب تک‌worker)
+# =====================================
+
+SUGGEST_INDEX_ENABLED = os.getenv("PARTNER_SUGGEST_INDEX", "true").lower() in ("1", "true", "yes")
+SUGGEST_REFRESH_SECONDS = float(os.getenv("PARTNER_SUGGEST_REFRESH_SECONDS", "300"))
+
+
+def _suggest_keys(brand_name: Optional[str]) -> List[str]:
+    words = normalize_text(brand_name).split()
+    return list(dict.fromkeys(" ".join(words[i:]) for i in range(len(words))))
+
+
+class SuggestIndex:
+    def __init__(self):
+        self._entries: List[Tuple[str, str]] = []
+        self._names: Dict[str, str] = {}
+        self._lock = Lock()
+
+        self.built_at: Optional[float] = None
+        self.build_ms: Optional[float] = None
+
+    # -------------------------------------------------
+    # Build
+    # -------------------------------------------------
+    def build(self, rows: Iterable[Tuple[str, str]]):
+        """
+        rows: (partner_id, brand_name)؛ یک بار sort به جای insort تکی
+        """
+        started = time.perf_counter()
+
+        names = {}
+        entries = []
+        for partner_id, brand_name in rows:
+            if not brand_name:
+                continue
+            names[partner_id] = brand_name
+            entries.extend((key, partner_id) for key in _suggest_keys(brand_name))
+
+        entries.sort()
+
+        with self._lock:
+            self._entries = entries
+            self._names = names
+
+        self.built_at = time.time()
+        self.build_ms = round((time.perf_counter() - started) * 1000, 1)
+
+    # -------------------------------------------------
+    # Incremental updates
+    # -------------------------------------------------
+    def upsert(self, partner_id: str, brand_name: Optional[str]):
+        with self._lock:
+            self._remove(partner_id)
+            if not brand_name:
+                return
+
+            self._names[partner_id] = brand_name
+            for key in _suggest_keys(brand_name):
+                bisect.insort(self._entries, (key, partner_id))
+
+    def remove(self, partner_id: str):
+        with self._lock:
+            self._remove(partner_id)
+
+    def _remove(self, partner_id: str):
+        brand_name = self._names.pop(partner_id, None)
+        if brand_name is None:
+            return
+
+        for key in _suggest_keys(brand_name):
+            index = bisect.bisect_left(self._entries, (key, partner_id))
+            if index < len(self._entries) and self._entries[index] == (key, partner_id):
+                del self._entries[index]
+
+    # -------------------------------------------------
+    # Lookup
+    # -------------------------------------------------
+    def suggest(self, prefix: str, limit: int = 10) -> List[dict]:
+        prefix = normalize_text(prefix)
+        if not prefix:
+            return []
+
+        results = []
+        seen = set()
+
+        with self._lock:
+            index = bisect.bisect_left(self._entries, (prefix, ""))
+
+            while index < len(self._entries) and len(results) < limit:
+                key, partner_id = self._entries[index]
+                if not key.startswith(prefix):
+                    break
+
+                if partner_id not in seen:
+                    seen.add(partner_id)
+                    results.append({"id": partner_id, "brand_name": self._names[partner_id]})
+
+                index += 1
+
+        return results
+
+    def stats(self) -> dict:
+        return {
+            "partners": len(self._names),
+            "entries": len(self._entries),
+            "built_at": self.built_at,
+            "build_ms": self.build_ms,
+        }
+
+
+# =====================================
+# Singleton
+# =====================================
+
+_suggest_index = SuggestIndex()
+
+
+def get_suggest_index() -> SuggestIndex:
+    return _suggest_index
+
+
+async def build_suggest_index(collection) -> SuggestIndex:
+    """
+    همه partner های حذف‌نشده (فقط brand_name) از Motor collection
+    """
+    cursor = collection.find(
+        {"meta.is_deleted": False},
+        {"identity.brand_name": 1},
+    ).batch_size(5000)
+
+    rows = []
+    async for doc in cursor:
+        rows.append((str(doc["_id"]), (doc.get("identity") or {}).get("brand_name")))
+
+    _suggest_index.build(rows)
+    logging.info(f"Suggest index built: {_suggest_index.stats()}")
+    return _suggest_index
+
+
+# =====================================
+# Periodic rebuild
+# =====================================
+
+_refresh_task: Optional[asyncio.Task] = None
+
+
+async def _refresh_loop(collection, interval: float):
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await build_suggest_index(collection)
+        except Exception as e:
+            # ایندکس قبلی سر جایش می‌ماند؛ دور بعد دوباره
+            logging.warning(f"Suggest index refresh failed: {e}")
+
+
+def start_suggest_refresh(collection, interval: float = SUGGEST_REFRESH_SECONDS):
+    global _refresh_task
+
+    if interval <= 0 or _refresh_task is not None:
+        return
+    _refresh_task = asyncio.create_task(_refresh_loop(collection, interval), name="suggest-index-refresh")
+
+
+async def stop_suggest_refresh():
+    global _refresh_task
+
+    if _refresh_task is None:
+        return
+    _refresh_task.cancel()
+    try:
+        await _refresh_task
+    except asyncio.CancelledError:
+        pass
+    _refresh_task = None
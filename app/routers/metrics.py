@@ -0,0 +1,68 @@
+from fastapi import APIRouter
+from fastapi.responses import Response
+
+from app.repositories.partner_cache import get_partner_cache
+from app.repositories.partner_repository import count_cache_stats
+from app.repositories.suggest_index import get_suggest_index
+from app.utils.metrics import PROMETHEUS_CONTENT_TYPE, get_metrics_registry
+from app.utils.profiling import ProfilingSettings, get_request_profiler
+from app.utils.response import api_error, api_success
+
+
+router = APIRouter(
+    prefix="/metrics",
+    tags=["Metrics"]
+)
+
+
+# --------------------------------------------------
+# Prometheus (Mongo command / pool)
+# --------------------------------------------------
+@router.get("")
+async def prometheus_metrics():
+    """
+    همه metric های ثبت‌شده با فرمت متنی Prometheus
+    """
+    return Response(
+        content=get_metrics_registry().render(),
+        media_type=PROMETHEUS_CONTENT_TYPE,
+    )
+
+
+# --------------------------------------------------
+# Cache counters
+# --------------------------------------------------
+@router.get("/cache")
+async def cache_metrics():
+    """
+    شمارنده‌های hit / miss / eviction کش‌ها
+    """
+    return {
+        "partner_cache": get_partner_cache().stats(),
+        "count_cache": count_cache_stats(),
+        "suggest_index": get_suggest_index().stats(),
+    }
+
+
+# --------------------------------------------------
+# Sampling profiler (روشن / خاموش در زمان اجرا)
+# --------------------------------------------------
+@router.get("/profiling")
+async def profiling_status():
+    """
+    تنظیمات فعلی profiler و dump های اخیر
+    """
+    return api_success(get_request_profiler().stats())
+
+
+@router.put("/profiling")
+async def configure_profiling(settings: ProfilingSettings):
+    """
+    every_n=0 خاموش؛ every_n=N یعنی یکی از هر N درخواست زیر path_prefix
+    """
+    try:
+        get_request_profiler().configure(settings)
+    except ValueError as e:
+        return api_error(str(e), 400)
+
+    return api_success(get_request_profiler().stats(), message="Profiling updated")
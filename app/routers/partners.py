@@ -1,16 +1,43 @@
-from fastapi import APIRouter, Query
-
-from app.utils.helpers import object_id_or_400
-from app.utils.response import api_success, api_error, build_pagination
+import time
+from datetime import datetime
+from typing import List, Literal
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
+from pydantic import ValidationError
+
+from app.utils.helpers import object_id_or_400, cursor_or_400
+from app.utils.response import api_success_response, api_error, build_pagination
+from app.utils.bulk_import import (
+    NDJSON_CONTENT_TYPES,
+    CSV_CONTENT_TYPES,
+    iter_ndjson_rows,
+    iter_csv_rows,
+    format_row_error,
+)
+from app.utils.export import csv_columns, csv_chunks, ndjson_chunks
+from app.utils.etag import weak_etag, etag_matches, partner_etag
 
 from app.schemas.partner_quick_entry import PartnerQuickEntry
+from app.schemas.partner_filter import PartnerListFilter
+from app.schemas.partner_bulk_update import (
+    BULK_UPDATE_MAX_ITEMS,
+    PartnerBulkUpdate,
+    section_update_data,
+)
 from app.schemas.partner_relationship import PartnerRelationshipUpdate
 from app.schemas.partner_analysis import PartnerAnalysisUpdate
 from app.schemas.partner_financial_estimation import PartnerFinancialEstimationUpdate
 from app.schemas.partner_acquisition import PartnerAcquisitionUpdate
 
-from app.models.partner import Partner, Identity, Relationship, Analysis
-from app.repositories.partner_repository import PartnerRepository
+from app.models.partner import Partner
+from app.repositories.partner_repository import AsyncPartnerRepository
+from app.repositories.projections import resolve_projection
+from app.repositories.suggest_index import get_suggest_index
+from app.repositories.dedup import DEDUP_MODE, DedupMode
+from app.repositories.rollups import ROLLUP_DIMENSIONS, StatsSource
+from app.database.mongo import get_async_partners_collection
+from app.events.feed import get_partner_feed, sse_chunks
 
 
 router = APIRouter(
@@ -24,66 +51,419 @@ router = APIRouter(
 # --------------------------------------------------
 
 @router.post("/quick-entry")
-def quick_entry(payload: PartnerQuickEntry):
+async def quick_entry(
+    payload: PartnerQuickEntry,
+    dedup: DedupMode | None = Query(None),
+):
     """
     ورود سریع مخاطب (کارت ویزیت / اکسل / لید)
     فقط brand_name اجباری است
+    - dedup (پیش‌فرض PARTNER_DEDUP_MODE):
+      off: بدون بررسی | warn: ثبت + کاندیداها در meta.duplicates | reject: عدم ثبت (409)
+    """
+
+    partner = payload.to_partner()
+
+    repo = AsyncPartnerRepository()
+
+    duplicates = []
+    mode = dedup or DEDUP_MODE
+    if mode != "off":
+        duplicates = await repo.find_duplicates(partner.identity.model_dump())
+
+        if duplicates and mode == "reject":
+            return api_error(
+                "Possible duplicate partner",
+                409,
+                data={"duplicates": duplicates},
+            )
+
+    created = await repo.create(partner)
+
+    return api_success_response(
+        created,
+        "Partner created",
+        extra_meta={"duplicates": duplicates} if duplicates else None,
+    )
+
+
+# --------------------------------------------------
+# Quick Entry (Bulk)
+# --------------------------------------------------
+
+async def _iter_json_array(rows: list):
+    for row in rows:
+        yield row
+
+
+@router.post("/quick-entry/bulk")
+async def quick_entry_bulk(
+    request: Request,
+    batch_size: int = Query(1000, ge=1, le=10000),
+):
+    """
+    ورود گروهی مخاطبین (اکسل / کارت ویزیت)
+    - بدنه: JSON array، یا استریم NDJSON / CSV (بر اساس Content-Type)
+    - هر ردیف همان PartnerQuickEntry؛ در CSV شماره‌ها با ; جدا می‌شوند
+    - insert_many بدون ترتیب در batch ها؛ خطای هر ردیف جدا گزارش می‌شود
+    """
+
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+
+    if content_type in NDJSON_CONTENT_TYPES:
+        rows = iter_ndjson_rows(request.stream())
+    elif content_type in CSV_CONTENT_TYPES:
+        rows = iter_csv_rows(request.stream())
+    else:
+        try:
+            body = await request.json()
+        except ValueError:
+            return api_error("Invalid JSON body", 400)
+
+        if not isinstance(body, list):
+            return api_error("Expected a JSON array of quick-entry rows", 400)
+
+        rows = _iter_json_array(body)
+
+    repo = AsyncPartnerRepository()
+    started = time.perf_counter()
+
+    received = 0
+    inserted = 0
+    errors = []
+    batch: list[tuple[int, Partner]] = []
+
+    async def flush():
+        nonlocal inserted
+        failed = await repo.create_many([partner for _, partner in batch])
+
+        for position, (row, _) in enumerate(batch):
+            if position in failed:
+                errors.append({"row": row, "error": failed[position]})
+
+        inserted += len(batch) - len(failed)
+        batch.clear()
+
+    async for data in rows:
+        row = received
+        received += 1
+
+        try:
+            if isinstance(data, Exception):
+                raise data
+            partner = PartnerQuickEntry.model_validate(data).to_partner()
+        except ValueError as e:
+            errors.append({"row": row, "error": format_row_error(e)})
+            continue
+
+        batch.append((row, partner))
+        if len(batch) >= batch_size:
+            await flush()
+
+    if batch:
+        await flush()
+
+    elapsed = time.perf_counter() - started
+    errors.sort(key=lambda e: e["row"])
+
+    return api_success_response(
+        {
+            "received": received,
+            "inserted": inserted,
+            "failed": len(errors),
+            "errors": errors,
+            "elapsed_ms": round(elapsed * 1000, 1),
+            "rows_per_sec": round(received / elapsed, 1) if elapsed else None,
+        },
+        "Bulk import finished",
+    )
+
+
+# --------------------------------------------------
+# List filters (مشترک بین list / export)
+# --------------------------------------------------
+def _multi(values: List[str] | None) -> List[str]:
+    """
+    ?x=a&x=b و ?x=a,b هر دو → [a, b]
+    """
+    return [
+        part.strip()
+        for value in values or []
+        for part in value.split(",")
+        if part.strip()
+    ]
+
+
+def partner_list_filters(
+    funnel_stage: List[str] | None = Query(None),
+    business_type: List[str] | None = Query(None),
+    financial_level: List[str] | None = Query(None),
+    purchase_readiness: List[str] | None = Query(None),
+    potential_level: List[str] | None = Query(None),
+    acquisition_source: List[str] | None = Query(None),
+    province: List[str] | None = Query(None),
+    city: List[str] | None = Query(None),
+    map_link: str | None = Query(None),
+    tag: List[str] | None = Query(None),
+    tags_mode: Literal["any", "all"] = Query("any"),
+    created_from: datetime | None = Query(None),
+    created_to: datetime | None = Query(None),
+    range: List[str] | None = Query(None),
+    q: str | None = Query(None),
+) -> PartnerListFilter:
+    """
+    query param های فیلتر list_partners → PartnerListFilter
+    - هر فیلتر چند مقداری: تکرار param یا جدا با کاما (funnel_stage=lead,qualified)
+    - tag چند مقداری با tags_mode=any|all
+    - created_from / created_to: بازه meta.created_at (ISO 8601)
+    - range: field:min..max روی فیلدهای عددی financial_estimation (قابل تکرار)
+    - q: جستجوی prefix روی نام برند / مدیر / شهر و بخشی از شماره تماس
+    """
+    try:
+        return PartnerListFilter(
+            funnel_stage=_multi(funnel_stage),
+            business_type=_multi(business_type),
+            financial_level=_multi(financial_level),
+            purchase_readiness=_multi(purchase_readiness),
+            potential_level=_multi(potential_level),
+            acquisition_source=_multi(acquisition_source),
+            province=_multi(province),
+            city=_multi(city),
+            map_link=map_link,
+            tags=_multi(tag),
+            tags_mode=tags_mode,
+            created_from=created_from,
+            created_to=created_to,
+            ranges=range or [],
+            q=q,
+        )
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=format_row_error(e))
+
+
+# --------------------------------------------------
+# Suggest (typeahead)
+# --------------------------------------------------
+@router.get("/suggest")
+async def suggest_partners(
+    prefix: str = Query(..., min_length=1),
+    limit: int = Query(10, ge=1, le=50),
+):
+    """
+    پیشنهاد نام برندهای موجود هنگام تایپ (جلوگیری از ثبت تکراری)
+    - از ایندکس درون‌حافظه‌ای؛ بدون کوئری به Mongo
+    """
+    return api_success_response(get_suggest_index().suggest(prefix, limit))
+
+
+# --------------------------------------------------
+# Nearby (geo)
+# --------------------------------------------------
+@router.get("/nearby")
+async def nearby_partners(
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    radius: float = Query(5000, gt=0, le=100_000),
+    limit: int = Query(20, ge=1, le=200),
+    fields: str | None = Query(None),
+    filters: PartnerListFilter = Depends(partner_list_filters),
+):
+    """
+    مخاطبین در شعاع radius (متر) از نقطه (lat, lng)، نزدیک‌ترین اول
+    - همان فیلترهای list_partners (funnel_stage، city، q، ...)
+    - هر آیتم با distance_m
+    """
+
+    try:
+        projection = resolve_projection(fields)
+    except ValueError as e:
+        return api_error(str(e), 400)
+
+    repo = AsyncPartnerRepository()
+    items = await repo.nearby(filters, lat, lng, radius, limit, projection)
+
+    return api_success_response(items)
+
+
+# --------------------------------------------------
+# Stats (funnel / segment)
+# --------------------------------------------------
+@router.get("/stats")
+async def partner_stats(
+    filters: PartnerListFilter = Depends(partner_list_filters),
+    group_by: str = Query(",".join(ROLLUP_DIMENSIONS)),
+    source: StatsSource = Query("auto"),
+):
+    """
+    تعداد مخاطبین به تفکیک funnel_stage × business_type × province × source
+    - group_by: ابعاد جدول groups (با کاما)؛ by همیشه شمارش هر بعد به تنهایی است
+    - source=auto: از rollup های از پیش محاسبه‌شده (O(تعداد ترکیب‌ها)) اگر
+      فیلترها فقط روی همین ابعاد باشند، وگرنه aggregation زنده ($facet)
+    """
+
+    dimensions = [d.strip() for d in group_by.split(",") if d.strip()]
+    unknown = [d for d in dimensions if d not in ROLLUP_DIMENSIONS]
+    if unknown:
+        return api_error(f"Unknown dimensions: {', '.join(unknown)}", 400)
+
+    repo = AsyncPartnerRepository()
+
+    try:
+        stats = await repo.stats(filters, dimensions, source)
+    except ValueError as e:
+        return api_error(str(e), 400)
+
+    return api_success_response(stats)
+
+
+# --------------------------------------------------
+# Export (Streaming)
+# --------------------------------------------------
+@router.get("/export")
+async def export_partners(
+    filters: PartnerListFilter = Depends(partner_list_filters),
+    format: Literal["ndjson", "csv"] = Query("ndjson"),
+    fields: str | None = Query(None),
+):
+    """
+    خروجی کامل مخاطبین فیلتر شده (همان فیلترهای list_partners)
+    به صورت استریم NDJSON یا CSV، مستقیم از کرسر Mongo
     """
 
-    partner = Partner(
-        identity=Identity(
-            brand_name=payload.brand_name,                 # ✅ تنها الزام
-            manager_full_name=payload.manager_full_name,
-            business_type=payload.business_type,
-
-            # ⬇️ مهم: هیچ چیز اجباری نیست
-            contact_numbers=payload.contact_numbers or [],
-            social_links=[],  # quick-entry اصلاً شبکه اجتماعی نمی‌خواهد
-
-            province=payload.province,
-            city=payload.city,
-            full_address=None,
-            location=payload.location,
-        ),
-        relationship=Relationship(
-            notes=payload.notes
-        ),
-        analysis=Analysis()  # funnel_stage = prospect
+    try:
+        projection = resolve_projection(fields)
+    except ValueError as e:
+        return api_error(str(e), 400)
+
+    repo = AsyncPartnerRepository()
+    docs = repo.iter_docs(filters, projection)
+
+    if format == "csv":
+        return StreamingResponse(
+            csv_chunks(docs, csv_columns(projection)),
+            media_type="text/csv; charset=utf-8",
+            headers={"Content-Disposition": 'attachment; filename="partners.csv"'},
+        )
+
+    return StreamingResponse(
+        ndjson_chunks(docs),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="partners.ndjson"'},
     )
 
-    repo = PartnerRepository()
-    created = repo.create(partner)
 
-    return api_success(created, "Partner created")
+# --------------------------------------------------
+# Live feed (SSE)
+# --------------------------------------------------
+@router.get("/stream")
+async def stream_partners(
+    filters: PartnerListFilter = Depends(partner_list_filters),
+    fields: str | None = Query(None),
+):
+    """
+    تغییرات زنده مخاطبین (Server-Sent Events) با همان فیلترهای list_partners
+    - upsert: ساخته / ویرایش شده و منطبق با فیلتر (partner با همان fields لیست)
+    - remove: حذف شده یا دیگر با فیلتر منطبق نیست (فقط partner هایی که قبلاً منطبق بوده‌اند)
+    - reset: کلاینت عقب مانده؛ لیست را دوباره بخواند
+    همه کلاینت‌ها یک upstream مشترک دارند (change stream یا poll)
+    """
+
+    try:
+        projection = resolve_projection(fields)
+    except ValueError as e:
+        return api_error(str(e), 400)
+
+    feed = get_partner_feed(get_async_partners_collection())
+
+    try:
+        subscription = feed.subscribe(filters, projection)
+    except ValueError as e:
+        return api_error(str(e), 503)
+
+    return StreamingResponse(
+        sse_chunks(feed, subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 
 # --------------------------------------------------
 # Get Partner
 # --------------------------------------------------
 @router.get("/{partner_id}")
-def get_partner(partner_id: str):
+async def get_partner(
+    partner_id: str,
+    if_none_match: str | None = Header(None)
+):
     """
     دریافت پروفایل کامل یک مخاطب / مشتری
+    - ETag از meta.updated_at؛ با If-None-Match برابر، 304 بدون بدنه
     """
 
     oid = object_id_or_400(partner_id)
 
-    repo = PartnerRepository()
-    partner = repo.get_by_id(str(oid))
+    repo = AsyncPartnerRepository()
+    partner = await repo.get_by_id(str(oid))
 
     if not partner:
         return api_error("Partner not found", 404)
 
-    return api_success(partner)
+    etag = partner_etag(partner)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    return api_success_response(partner, headers={"ETag": etag})
 
 
 # --------------------------------------------------
 # Generic update helper
 # --------------------------------------------------
-def update_nested_field(
+def wants_minimal(prefer: str | None) -> bool:
+    """
+    Prefer: return=minimal (RFC 7240) → داکیومنت به‌روز شده برگردانده نشود
+    """
+    if not prefer:
+        return False
+
+    return any(
+        part.strip().lower() == "return=minimal"
+        for part in prefer.split(",")
+    )
+
+
+async def apply_partner_update(
+    partner_id: str,
+    update_data: dict,
+    success_message: str,
+    prefer: str | None = None
+):
+    repo = AsyncPartnerRepository()
+
+    if wants_minimal(prefer):
+        updated = await repo.update(partner_id, update_data, return_document=False)
+        if not updated:
+            return api_error("Partner not found", 404)
+
+        return api_success_response(
+            None,
+            success_message,
+            headers={"Preference-Applied": "return=minimal"},
+        )
+
+    updated = await repo.update(partner_id, update_data)
+
+    if not updated:
+        return api_error("Partner not found", 404)
+
+    return api_success_response(updated, success_message)
+
+
+async def update_nested_field(
     partner_id: str,
     payload,
     prefix: str,
-    success_message: str
+    success_message: str,
+    prefer: str | None = None
 ):
     oid = object_id_or_400(partner_id)
 
@@ -95,31 +475,93 @@ def update_nested_field(
     if not update_data:
         return api_error("No data provided for update", 400)
 
-    repo = PartnerRepository()
-    updated = repo.update(str(oid), update_data)
+    return await apply_partner_update(str(oid), update_data, success_message, prefer)
 
-    if not updated:
-        return api_error("Partner not found", 404)
 
-    return api_success(updated, success_message)
+# --------------------------------------------------
+# Bulk update
+# --------------------------------------------------
+@router.patch("/bulk")
+async def bulk_update_partners(body: PartnerBulkUpdate):
+    """
+    بروزرسانی گروهی (مثلاً تغییر مرحله / تگ بعد از جلسه سگمنت‌بندی)
+    - items: [{id, section, payload}] با همان schema های PATCH هر بخش
+    - یا filter (فیلترهای list) + section + payload برای همه موارد منطبق
+    یک bulk_write بدون ترتیب (تغییر ابعاد stats: هر آیتم اتمیک جدا)؛ نتیجه هر آیتم جدا گزارش می‌شود
+    """
+    started = time.perf_counter()
+    repo = AsyncPartnerRepository()
+
+    # index آیتم → خطای اعتبارسنجی payload (به bulk_write نمی‌رسد)
+    invalid = {}
+
+    if body.filter is not None:
+        try:
+            data = section_update_data(body.section, body.payload)
+        except (ValidationError, ValueError) as e:
+            return api_error(format_row_error(e), 400)
+
+        ids = await repo.find_ids(body.filter, limit=BULK_UPDATE_MAX_ITEMS + 1)
+        if len(ids) > BULK_UPDATE_MAX_ITEMS:
+            return api_error(
+                f"Filter matches more than {BULK_UPDATE_MAX_ITEMS} partners",
+                400,
+            )
+
+        items = [(partner_id, data) for partner_id in ids]
+    else:
+        items = []
+        for index, item in enumerate(body.items):
+            try:
+                items.append((item.id, section_update_data(item.section, item.payload)))
+            except (ValidationError, ValueError) as e:
+                invalid[index] = format_row_error(e)
+
+    results = await repo.bulk_update(items)
+
+    ids = [item.id for item in body.items] if body.filter is None else [pid for pid, _ in items]
+    report = []
+    for index, partner_id in enumerate(ids):
+        status = invalid.get(index) or results.get(partner_id, "skipped")
+        report.append({
+            "index": index,
+            "id": partner_id,
+            "status": "updated" if status == "updated" else "failed",
+            **({} if status == "updated" else {"error": status}),
+        })
+
+    updated = sum(1 for r in report if r["status"] == "updated")
+
+    return api_success_response(
+        {
+            "received": len(ids),
+            "updated": updated,
+            "failed": len(report) - updated,
+            "items": report,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        },
+        "Bulk update finished",
+    )
 
 
 # --------------------------------------------------
 # Relationship
 # --------------------------------------------------
 @router.patch("/{partner_id}/relationship")
-def update_relationship(
+async def update_relationship(
     partner_id: str,
-    payload: PartnerRelationshipUpdate
+    payload: PartnerRelationshipUpdate,
+    prefer: str | None = Header(None)
 ):
     """
     بروزرسانی وضعیت ارتباط انسانی با مخاطب
     """
-    return update_nested_field(
+    return await update_nested_field(
         partner_id,
         payload,
         prefix="relationship",
-        success_message="Relationship updated"
+        success_message="Relationship updated",
+        prefer=prefer
     )
 
 
@@ -127,18 +569,20 @@ def update_relationship(
 # Analysis
 # --------------------------------------------------
 @router.patch("/{partner_id}/analysis")
-def update_analysis(
+async def update_analysis(
     partner_id: str,
-    payload: PartnerAnalysisUpdate
+    payload: PartnerAnalysisUpdate,
+    prefer: str | None = Header(None)
 ):
     """
     بروزرسانی وضعیت تحلیلی (Upgrade لید / سگمنت‌بندی)
     """
-    return update_nested_field(
+    return await update_nested_field(
         partner_id,
         payload,
         prefix="analysis",
-        success_message="Analysis updated"
+        success_message="Analysis updated",
+        prefer=prefer
     )
 
 
@@ -146,18 +590,20 @@ def update_analysis(
 # Financial Estimation
 # --------------------------------------------------
 @router.patch("/{partner_id}/financial-estimation")
-def update_financial_estimation(
+async def update_financial_estimation(
     partner_id: str,
-    payload: PartnerFinancialEstimationUpdate
+    payload: PartnerFinancialEstimationUpdate,
+    prefer: str | None = Header(None)
 ):
     """
     بروزرسانی اطلاعات مالی تخمینی
     """
-    return update_nested_field(
+    return await update_nested_field(
         partner_id,
         payload,
         prefix="financial_estimation",
-        success_message="Financial estimation updated"
+        success_message="Financial estimation updated",
+        prefer=prefer
     )
 
 
@@ -165,18 +611,20 @@ def update_financial_estimation(
 # Acquisition
 # --------------------------------------------------
 @router.patch("/{partner_id}/acquisition")
-def update_acquisition(
+async def update_acquisition(
     partner_id: str,
-    payload: PartnerAcquisitionUpdate
+    payload: PartnerAcquisitionUpdate,
+    prefer: str | None = Header(None)
 ):
     """
     بروزرسانی منبع آشنایی مخاطب
     """
-    return update_nested_field(
+    return await update_nested_field(
         partner_id,
         payload,
         prefix="acquisition",
-        success_message="Acquisition updated"
+        success_message="Acquisition updated",
+        prefer=prefer
     )
 
 
@@ -184,82 +632,94 @@ def update_acquisition(
 # List & Search
 # --------------------------------------------------
 @router.get("")
-def list_partners(
-    funnel_stage: str | None = Query(None),
-    business_type: str | None = Query(None),
-    financial_level: str | None = Query(None),
-    purchase_readiness: str | None = Query(None),
-    potential_level: str | None = Query(None),
-    acquisition_source: str | None = Query(None),
-    province: str | None = Query(None),
-    city: str | None = Query(None),
-    map_link: str | None = Query(None),
-    tag: str | None = Query(None),
+async def list_partners(
+    request: Request,
+    filters: PartnerListFilter = Depends(partner_list_filters),
     page: int = 1,
     limit: int = 20,
+    cursor: str | None = Query(None),
+    with_total: Literal["exact", "estimated", "none"] = Query("exact"),
+    fields: str | None = Query(None),
+    if_none_match: str | None = Header(None),
 ):
     """
     لیست و جستجوی مخاطبین / مشتریان
+    - صفحه‌بندی با page/limit یا (سریع‌تر برای صفحات عمیق) با cursor
+    - cursor همان next_cursor پاسخ قبلی است
+    - with_total: exact / estimated (کش کوتاه‌مدت) / none (بدون شمارش، فقط has_next)
+    - fields: preset (card / full) یا لیست فیلدها با کاما، مثل identity.brand_name,identity.city
+    - ETag از آخرین تغییر کالکشن (max meta.updated_at) + query؛ با If-None-Match برابر، 304
     """
 
-    filters = {
-        "meta.is_deleted": False
-    }
+    try:
+        projection = resolve_projection(fields)
+    except ValueError as e:
+        return api_error(str(e), 400)
+
+    after = cursor_or_400(cursor) if cursor else None
 
-    if funnel_stage:
-        filters["analysis.funnel_stage"] = funnel_stage
-    if business_type:
-        filters["identity.business_type"] = business_type
-    if financial_level:
-        filters["analysis.financial_level"] = financial_level
-    if purchase_readiness:
-        filters["analysis.purchase_readiness"] = purchase_readiness
-    if potential_level:
-        filters["analysis.potential_level"] = potential_level
-    if acquisition_source:
-        filters["acquisition.source"] = acquisition_source
-    if province:
-        filters["identity.province"] = province
-    if city:
-        filters["identity.city"] = city
-    if map_link:
-        filters["identity.map_link"] = map_link
-    if tag:
-        filters["analysis.tags"] = tag
+    repo = AsyncPartnerRepository()
 
-    repo = PartnerRepository()
-    partners, total = repo.list(filters, page, limit)
+    # نسخه قبل از داده خوانده می‌شود: write همزمان در بدترین حالت ETag کهنه‌تر می‌دهد، نه داده کهنه با ETag تازه
+    version = await repo.get_version()
+    etag = weak_etag(version, sorted(request.query_params.multi_items()))
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
 
-    pagination = build_pagination(page, limit, total)
+    result = await repo.list(
+        filters,
+        page,
+        limit,
+        after=after,
+        with_total=with_total,
+        projection=projection,
+    )
+
+    pagination = build_pagination(
+        page,
+        limit,
+        result.total,
+        has_next=result.has_next,
+        next_cursor=result.next_cursor,
+        cursor=cursor,
+    )
 
-    return api_success(partners, pagination=pagination)
+    return api_success_response(
+        result.items,
+        pagination=pagination,
+        headers={"ETag": etag},
+    )
 
 
 # --------------------------------------------------
 # Soft Delete
 # --------------------------------------------------
 @router.delete("/{partner_id}")
-def delete_partner(partner_id: str):
+async def delete_partner(partner_id: str):
     """
     حذف مخاطب (Soft Delete)
     """
 
     oid = object_id_or_400(partner_id)
 
-    repo = PartnerRepository()
-    success = repo.soft_delete(str(oid))
+    repo = AsyncPartnerRepository()
+    success = await repo.soft_delete(str(oid))
 
     if not success:
         return api_error("Partner not found or already deleted", 404)
 
-    return api_success(None, "Partner deleted successfully")
+    return api_success_response(None, "Partner deleted successfully")
 
 
 from app.schemas.partner_identity import PartnerIdentityUpdate
 
 
 @router.patch("/{partner_id}/identity")
-def update_identity(partner_id: str, payload: PartnerIdentityUpdate):
+async def update_identity(
+    partner_id: str,
+    payload: PartnerIdentityUpdate,
+    prefer: str | None = Header(None)
+):
     """
     بروزرسانی اطلاعات هویتی پایه مخاطب
     """
@@ -273,11 +733,5 @@ def update_identity(partner_id: str, payload: PartnerIdentityUpdate):
     if not update_data:
         return api_error("No data provided for update")
 
-    repo = PartnerRepository()
-    updated = repo.update(str(oid), update_data)
-
-    if not updated:
-        return api_error("Partner not found", 404)
-
-    return api_success(updated, "Identity updated")
+    return await apply_partner_update(str(oid), update_data, "Identity updated", prefer)
 
@@ -0,0 +1,79 @@
+import os
+from typing import Dict, List, Literal, Optional, Type
+
+from pydantic import BaseModel, Field, model_validator
+
+from app.schemas.partner_filter import PartnerListFilter
+from app.schemas.partner_relationship import PartnerRelationshipUpdate
+from app.schemas.partner_analysis import PartnerAnalysisUpdate
+from app.schemas.partner_financial_estimation import PartnerFinancialEstimationUpdate
+from app.schemas.partner_acquisition import PartnerAcquisitionUpdate
+
+
+# حداکثر تعداد partner در یک درخواست (items یا نتیجه filter)
+BULK_UPDATE_MAX_ITEMS = int(os.getenv("PARTNER_BULK_UPDATE_MAX_ITEMS", "5000"))
+
+# identity عمداً نیست: derived fields (search / dedup / geo) برای هر داکیومنت
+# باید از روی کل identity دوباره ساخته شوند
+BulkSection = Literal["relationship", "analysis", "financial_estimation", "acquisition"]
+
+SECTION_SCHEMAS: Dict[str, Type[BaseModel]] = {
+    "relationship": PartnerRelationshipUpdate,
+    "analysis": PartnerAnalysisUpdate,
+    "financial_estimation": PartnerFinancialEstimationUpdate,
+    "acquisition": PartnerAcquisitionUpdate,
+}
+
+
+def section_update_data(section: str, payload: dict) -> dict:
+    """
+    اعتبارسنجی payload با همان schema های PATCH تکی → $set با مسیرهای nested
+    ValidationError / ValueError برای payload نامعتبر یا خالی
+    """
+    update = SECTION_SCHEMAS[section](**payload)
+
+    data = {
+        f"{section}.{field}": value
+        for field, value in update.model_dump(exclude_unset=True).items()
+    }
+
+    if not data:
+        raise ValueError("No data provided for update")
+
+    return data
+
+
+class PartnerBulkUpdateItem(BaseModel):
+    id: str
+    section: BulkSection
+    payload: dict
+
+
+class PartnerBulkUpdate(BaseModel):
+    """
+    دو حالت:
+    - items: لیست {id, section, payload} (هر آیتم جدا اعتبارسنجی و گزارش می‌شود)
+    - filter + section + payload: یک تغییر روی همه partner های منطبق
+    """
+
+    items: List[PartnerBulkUpdateItem] = Field(default_factory=list)
+
+    filter: Optional[PartnerListFilter] = None
+    section: Optional[BulkSection] = None
+    payload: Optional[dict] = None
+
+    @model_validator(mode="after")
+    def one_mode(self):
+        if self.items and self.filter is not None:
+            raise ValueError("Use either items or filter, not both")
+
+        if self.filter is not None:
+            if self.section is None or self.payload is None:
+                raise ValueError("filter mode requires section and payload")
+        elif not self.items:
+            raise ValueError("items or filter is required")
+
+        if len(self.items) > BULK_UPDATE_MAX_ITEMS:
+            raise ValueError(f"At most {BULK_UPDATE_MAX_ITEMS} items per request")
+
+        return self
@@ -0,0 +1,107 @@
+from datetime import datetime, timezone
+from typing import List, Literal, Optional, get_args
+
+from pydantic import BaseModel, Field, field_validator, model_validator
+
+from app.models.partner import (
+    FinancialEstimation,
+    FunnelStage,
+    BusinessType,
+    CustomerFinancialLevel,
+    PurchaseReadiness,
+    PotentialLevel,
+    AcquisitionSource,
+)
+
+
+# فیلدهای عددی FinancialEstimation (قابل استفاده در range)
+RANGE_FIELDS = [
+    name for name, info in FinancialEstimation.model_fields.items()
+    if any(t in (int, float) for t in (info.annotation, *get_args(info.annotation)))
+]
+
+
+class RangeFilter(BaseModel):
+    """
+    range=field:min..max (هر دو سر اختیاری، شامل خود مرز)
+    """
+
+    field: str
+    min: Optional[float] = None
+    max: Optional[float] = None
+
+    @field_validator("field")
+    @classmethod
+    def known_field(cls, value: str) -> str:
+        value = value.removeprefix("financial_estimation.")
+        if value not in RANGE_FIELDS:
+            raise ValueError(f"range field must be one of: {', '.join(RANGE_FIELDS)}")
+        return value
+
+    @model_validator(mode="after")
+    def bounded(self):
+        if self.min is None and self.max is None:
+            raise ValueError("range needs min and/or max")
+        if self.min is not None and self.max is not None and self.min > self.max:
+            raise ValueError("range min is greater than max")
+        return self
+
+    @classmethod
+    def parse(cls, raw: str) -> "RangeFilter":
+        field, sep, bounds = raw.partition(":")
+        low, dots, high = bounds.partition("..")
+        if not sep or not dots:
+            raise ValueError(f"invalid range {raw!r}, expected field:min..max")
+
+        return cls(field=field, min=low or None, max=high or None)
+
+
+class PartnerListFilter(BaseModel):
+    """
+    فیلترهای list_partners (و export / nearby / stats)
+    - لیست‌ها: یک مقدار = تساوی، چند مقدار = $in
+    - tags: any ($in) یا all ($all)
+    - created_from / created_to: روی meta.created_at
+    - ranges: بازه عددی روی فیلدهای FinancialEstimation
+    کامپایل به کوئری Mongo در PartnerRepository (_build_list_query)
+    """
+
+    funnel_stage: List[FunnelStage] = Field(default_factory=list)
+    business_type: List[BusinessType] = Field(default_factory=list)
+    financial_level: List[CustomerFinancialLevel] = Field(default_factory=list)
+    purchase_readiness: List[PurchaseReadiness] = Field(default_factory=list)
+    potential_level: List[PotentialLevel] = Field(default_factory=list)
+    acquisition_source: List[AcquisitionSource] = Field(default_factory=list)
+
+    province: List[str] = Field(default_factory=list)
+    city: List[str] = Field(default_factory=list)
+    map_link: Optional[str] = None
+
+    tags: List[str] = Field(default_factory=list)
+    tags_mode: Literal["any", "all"] = "any"
+
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
+
+    ranges: List[RangeFilter] = Field(default_factory=list)
+
+    q: Optional[str] = None
+
+    @field_validator("ranges", mode="before")
+    @classmethod
+    def parse_ranges(cls, value):
+        return [RangeFilter.parse(v) if isinstance(v, str) else v for v in value or []]
+
+    @field_validator("created_from", "created_to")
+    @classmethod
+    def naive_utc(cls, value: Optional[datetime]) -> Optional[datetime]:
+        # Mongo تاریخ را naive (UTC) نگه می‌دارد؛ ورودی با و بدون timezone قابل مقایسه شوند
+        if value is not None and value.tzinfo is not None:
+            return value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+
+    @model_validator(mode="after")
+    def created_order(self):
+        if self.created_from and self.created_to and self.created_from > self.created_to:
+            raise ValueError("created_from is after created_to")
+        return self
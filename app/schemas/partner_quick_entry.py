@@ -1,7 +1,15 @@
 from pydantic import BaseModel
 from typing import Optional, List
 
-from app.models.partner import BusinessType, ContactNumber, GeoLocation
+from app.models.partner import (
+    BusinessType,
+    ContactNumber,
+    GeoLocation,
+    Partner,
+    Identity,
+    Relationship,
+    Analysis,
+)
 
 
 class PartnerQuickEntry(BaseModel):
@@ -23,3 +31,28 @@ class PartnerQuickEntry(BaseModel):
     location: Optional[GeoLocation] = None
 
     notes: Optional[str] = None
+
+    def to_partner(self) -> Partner:
+        """
+        ساخت Partner از ورودی ورود سریع (تکی و bulk)
+        """
+        return Partner(
+            identity=Identity(
+                brand_name=self.brand_name,                 # ✅ تنها الزام
+                manager_full_name=self.manager_full_name,
+                business_type=self.business_type,
+
+                # ⬇️ مهم: هیچ چیز اجباری نیست
+                contact_numbers=self.contact_numbers or [],
+                social_links=[],  # quick-entry اصلاً شبکه اجتماعی نمی‌خواهد
+
+                province=self.province,
+                city=self.city,
+                full_address=None,
+                location=self.location,
+            ),
+            relationship=Relationship(
+                notes=self.notes
+            ),
+            analysis=Analysis()  # funnel_stage = prospect
+        )
@@ -0,0 +1,151 @@
+"""
+Production entry point: چند worker با startup سبک
+
+1. ایندکس‌ها یک بار در همین پردازه (پیش از fork) با app.tools.manage_indexes
+   و در worker ها MONGO_ENSURE_INDEXES_ON_STARTUP=false
+2. سقف کل connection های Mongo (MONGO_TOTAL_POOL_SIZE) بین worker ها تقسیم می‌شود
+   → MONGO_MAX_POOL_SIZE هر worker (اگر صریحاً تنظیم نشده باشد)
+3. هر worker در lifespan خودش pool، مدل‌ها و openapi را warm می‌کند (app.utils.warmup)
+4. اگر partner_rollups هنوز ساخته نشده (دیتابیس موجود، اولین deploy) یک بار
+   ساخته می‌شود؛ تا آن موقع GET /partners/stats از حالت live می‌خواند
+5. با PARTNER_EVENTS_SOURCE روشن، مصرف‌کننده رویدادها باید یک پردازه باشد:
+   worker ها PARTNER_EVENTS_CONSUMER=false می‌گیرند و consumer جدا اجرا می‌شود
+   (مثلاً یک instance تک‌worker با PARTNER_EVENTS_CONSUMER=true)
+6. با بیش از یک worker کش partner باید مشترک باشد (PARTNER_CACHE_BACKEND=redis یا none)؛
+   با memory اجرا متوقف می‌شود. WEB_CONCURRENCY به worker ها می‌رسد تا هر worker هم
+   در lifespan همین را بررسی کند
+7. ایندکس suggest در حافظه هر worker است و eventually consistent: write های worker های
+   دیگر با rebuild دوره‌ای (PARTNER_SUGGEST_REFRESH_SECONDS) دیده می‌شوند
+
+اجرا:
+    python -m app.serve --workers 4
+    MONGO_TOTAL_POOL_SIZE=200 python -m app.serve --workers 8 --port 8080
+    python -m app.serve --workers 4 --skip-indexes   # ایندکس‌ها و rollup ها در مرحله deploy جدا
+
+worker ها با spawn ساخته می‌شوند (uvicorn)؛ env این پردازه را به ارث می‌برند
+و app.main را از نو import می‌کنند، پس تنظیمات زیر باید پیش از uvicorn.run در env باشند.
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+
+import uvicorn
+
+
+DEFAULT_WORKERS = int(os.getenv("WEB_CONCURRENCY", "1"))
+# سقف connection های Mongo برای کل این instance (همه worker ها)؛ خالی = تقسیم نکن
+MONGO_TOTAL_POOL_SIZE = os.getenv("MONGO_TOTAL_POOL_SIZE")
+# حداقل pool هر worker حتی اگر سقف کل کوچک باشد
+MIN_WORKER_POOL_SIZE = 4
+
+
+def worker_pool_size(total: int, workers: int) -> int:
+    return max(total // max(workers, 1), MIN_WORKER_POOL_SIZE)
+
+
+def worker_env(workers: int) -> dict:
+    """
+    env هایی که پیش از fork روی worker ها تنظیم می‌شوند
+    (مقدار صریح موجود در env دست نمی‌خورد)
+    """
+    # ایندکس‌ها را همین پردازه (یا مرحله deploy با --skip-indexes) ساخته است
+    env = {"MONGO_ENSURE_INDEXES_ON_STARTUP": "false", "WEB_CONCURRENCY": str(workers)}
+
+    cache_backend = os.getenv("PARTNER_CACHE_BACKEND", "memory")
+    if workers > 1 and cache_backend == "memory":
+        # invalidation یک worker به کش بقیه نمی‌رسد → partner / ETag قدیمی
+        raise RuntimeError(
+            f"PARTNER_CACHE_BACKEND=memory is per-process and cannot be used with {workers} workers; "
+            "set PARTNER_CACHE_BACKEND=redis (or none)"
+        )
+
+    if workers > 1 and float(os.getenv("PARTNER_SUGGEST_REFRESH_SECONDS", "300")) <= 0:
+        logging.warning(
+            "PARTNER_SUGGEST_REFRESH_SECONDS=0 with several workers: /partners/suggest only sees "
+            "writes made by the same worker until restart"
+        )
+
+    if MONGO_TOTAL_POOL_SIZE and "MONGO_MAX_POOL_SIZE" not in os.environ:
+        env["MONGO_MAX_POOL_SIZE"] = str(worker_pool_size(int(MONGO_TOTAL_POOL_SIZE), workers))
+
+    events_on = os.getenv("PARTNER_EVENTS_SOURCE", "off") != "off"
+    if workers > 1 and events_on and "PARTNER_EVENTS_CONSUMER" not in os.environ:
+        env["PARTNER_EVENTS_CONSUMER"] = "false"
+        logging.warning(
+            "PARTNER_EVENTS_SOURCE is on with several workers: workers only write the outbox; "
+            "run one process with PARTNER_EVENTS_CONSUMER=true to publish events"
+        )
+
+    return env
+
+
+def manage_indexes() -> float:
+    # import دیرهنگام: app.database.mongo تنظیمات env را در زمان import می‌خواند
+    from app.database.mongo import close_mongo_clients, get_partners_collection
+    from app.tools.manage_indexes import sync_indexes
+    from app.tools.rebuild_rollups import ensure_rollups
+
+    started = time.perf_counter()
+    try:
+        rows = sync_indexes()
+        if ensure_rollups(get_partners_collection()):
+            logging.info("partner_rollups built (first run on this database)")
+    finally:
+        # client این پردازه به worker ها نمی‌رسد (spawn)؛ بی‌کار باز نماند
+        close_mongo_clients()
+
+    created = [r["name"] for r in rows if r.get("action") == "created"]
+    changed = [r["name"] for r in rows if r["status"] == "changed"]
+    if changed:
+        logging.warning(f"Indexes differ from the declared spec: {changed}; run app.tools.manage_indexes --rebuild")
+
+    elapsed = time.perf_counter() - started
+    logging.info(f"Indexes ensured once for all workers in {elapsed * 1000:.0f} ms (created: {len(created)})")
+    return elapsed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument(
+        "--skip-indexes",
+        action="store_true",
+        help="indexes and rollups are managed by a separate deploy step",
+    )
+    parser.add_argument("--log-level", default=os.getenv("LOG_LEVEL", "info"))
+    parser.add_argument("--timeout-keep-alive", type=int, default=5)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=args.log_level.upper())
+
+    # پیش از ساخت ایندکس‌ها: پیکربندی نامعتبر زود رد شود
+    try:
+        env = worker_env(args.workers)
+    except RuntimeError as e:
+        logging.error(str(e))
+        return 2
+
+    if not args.skip_indexes:
+        manage_indexes()
+
+    os.environ.update(env)
+    logging.info(f"Starting {args.workers} workers with {env}")
+
+    uvicorn.run(
+        "app.main:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        log_level=args.log_level,
+        timeout_keep_alive=args.timeout_keep_alive,
+        proxy_headers=True,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
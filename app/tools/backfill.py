@@ -0,0 +1,106 @@
+"""
+ساخت دوباره derived fields (app.repositories.derived) برای داکیومنت‌های موجود
+- پیش‌فرض: فقط داکیومنت‌هایی که هنوز فیلد ندارند
+- --all: همه داکیومنت‌ها (مثلاً بعد از تغییر قواعد نرمال‌سازی)
+- migration فیلدهای جدید (مثلاً geo برای identity.location) با همین اجرای پیش‌فرض
+- هر update شرطی است (unchanged_filter، مثل update در repository): اگر PATCH هم‌زمانی
+  داکیومنت را عوض کرده باشد، batch دوباره خوانده و از نو نوشته می‌شود؛ آن‌هایی که
+  بعد از DERIVED_UPDATE_RETRIES بار هنوز جا مانده‌اند در "conflicts" گزارش می‌شوند
+
+اجرا:
+    python -m app.tools.backfill
+    python -m app.tools.backfill --all --batch-size 500
+"""
+import argparse
+import json
+from typing import List, Tuple
+
+from pymongo import UpdateOne
+from pymongo.collection import Collection
+
+from app.database.mongo import get_partners_collection, ensure_indexes
+from app.repositories.derived import DERIVED_FIELDS, DERIVED_SOURCES, derived_fields
+from app.repositories.partner_repository import DERIVED_UPDATE_RETRIES, unchanged_filter
+
+
+# منابع derived fields + آنچه unchanged_filter مقایسه می‌کند
+BACKFILL_PROJECTION = {**{source: 1 for source in DERIVED_SOURCES}, "meta.updated_at": 1}
+
+
+def _write_batch(collection: Collection, docs: List[dict]) -> Tuple[int, int]:
+    """
+    خروجی: (modified, conflicts)
+    شرط نخورد → کل batch از نو خوانده می‌شود (op های موفق تکرارشان بی‌اثر است)
+    """
+    modified = 0
+
+    for _ in range(DERIVED_UPDATE_RETRIES):
+        ops = [UpdateOne(unchanged_filter(doc), {"$set": derived_fields(doc)}) for doc in docs]
+        if not ops:
+            return modified, 0
+
+        result = collection.bulk_write(ops, ordered=False)
+        modified += result.modified_count
+        if result.matched_count == len(ops):
+            return modified, 0
+
+        docs = list(collection.find({"_id": {"$in": [doc["_id"] for doc in docs]}}, BACKFILL_PROJECTION))
+
+    return modified, len(ops) - result.matched_count
+
+
+def backfill_derived(
+    collection: Collection,
+    recompute_all: bool = False,
+    batch_size: int = 1000
+) -> dict:
+    query = {} if recompute_all else {
+        "$or": [{name: {"$exists": False}} for name in DERIVED_FIELDS]
+    }
+
+    cursor = collection.find(query, BACKFILL_PROJECTION).batch_size(batch_size)
+
+    scanned = 0
+    modified = 0
+    conflicts = 0
+    batch = []
+
+    def flush():
+        nonlocal modified, conflicts
+        if batch:
+            written, missed = _write_batch(collection, batch)
+            modified += written
+            conflicts += missed
+            batch.clear()
+
+    for doc in cursor:
+        scanned += 1
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            flush()
+
+    flush()
+
+    return {"scanned": scanned, "modified": modified, "conflicts": conflicts}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--all", action="store_true", dest="recompute_all")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--ensure-indexes", action="store_true")
+    args = parser.parse_args()
+
+    if args.ensure_indexes:
+        ensure_indexes()
+
+    result = backfill_derived(
+        get_partners_collection(),
+        recompute_all=args.recompute_all,
+        batch_size=args.batch_size,
+    )
+    print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+گزارش مخاطبین تکراری در کل کالکشن (همان موتور quick-entry)
+- شماره مشترک یا نام مشابه در همان شهر
+- خروجی: هر خط یک JSON شامل داکیومنت و کاندیداهای تکراری آن
+- گروه‌بندی روی dedup.phones / dedup.bands با aggregate (نیاز به backfill derived fields)
+- bucket های بزرگ‌تر از --max-bucket (شماره placeholder) مقایسه نمی‌شوند و
+  در --summary به صورت oversized گزارش می‌شوند
+
+اجرا:
+    python -m app.tools.dedup_partners > duplicates.ndjson
+    python -m app.tools.dedup_partners --summary
+    python -m app.tools.dedup_partners --max-bucket 500
+"""
+import argparse
+import json
+import sys
+
+from app.database.mongo import get_partners_collection
+from app.repositories.dedup import DEDUP_MAX_BUCKET, group_duplicates
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--summary", action="store_true")
+    parser.add_argument("--max-bucket", type=int, default=DEDUP_MAX_BUCKET)
+    args = parser.parse_args()
+
+    oversized = []
+    groups = group_duplicates(get_partners_collection(), args.max_bucket, oversized)
+
+    if args.summary:
+        print(json.dumps({
+            "groups": len(groups),
+            "pairs": sum(len(group) - 1 for group in groups),
+            "phone_pairs": sum(
+                "phone" in match["reasons"] for group in groups for match in group[1:]
+            ),
+            "oversized_buckets": oversized,
+        }))
+        return
+
+    if oversized:
+        sys.stderr.write(f"skipped {len(oversized)} oversized buckets: {json.dumps(oversized)}\n")
+
+    for group in groups:
+        sys.stdout.write(json.dumps(
+            {"partner": group[0], "duplicates": group[1:]},
+            ensure_ascii=False,
+        ) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+اجرای explain() روی شکل‌های واقعی کوئری list_partners و گزارش پلن‌های بد
+- فیلترهای تکی / ترکیبی ایندکس + نمونه‌های DSL (چند مقداری، بازه تاریخ و مبلغ، tags)
+- COLLSCAN: اسکن کامل کالکشن
+- SORT: sort در حافظه (هیچ ایندکسی ترتیب created_at/_id را پوشش نمی‌دهد)
+
+اجرا:
+    python -m app.tools.explain_list_queries
+    python -m app.tools.explain_list_queries --ensure-indexes --json
+
+اگر حداقل یک پلن مشکل‌دار باشد exit code برابر 1 است (قابل استفاده در CI)
+"""
+import argparse
+import json
+import sys
+from datetime import datetime, timedelta
+from typing import Iterator, List, Optional, Tuple
+
+from bson import ObjectId
+from pymongo.collection import Collection
+
+from app.database.indexes import (
+    NOT_DELETED,
+    LIST_FILTER_FIELDS,
+    LIST_FILTER_COMBOS,
+)
+from app.database.mongo import get_partners_collection, ensure_indexes
+from app.models.partner import BusinessType, FunnelStage
+from app.schemas.partner_filter import PartnerListFilter
+from app.repositories.partner_repository import (
+    LIST_SORT,
+    ListFilters,
+    _build_list_query,
+    _apply_keyset,
+)
+
+
+BAD_STAGES = {"COLLSCAN", "SORT"}
+
+
+def list_filter_shapes() -> List[Tuple[str, ...]]:
+    """
+    بدون فیلتر + هر فیلتر تکی + ترکیب‌های تعریف‌شده در index spec
+    """
+    return [()] + [(f,) for f in LIST_FILTER_FIELDS] + list(LIST_FILTER_COMBOS)
+
+
+def dsl_filter_shapes() -> List[PartnerListFilter]:
+    """
+    شکل‌های DSL (PartnerListFilter) که باید بدون COLLSCAN / SORT اجرا شوند
+    """
+    month_ago = datetime.utcnow() - timedelta(days=30)
+
+    return [
+        PartnerListFilter(funnel_stage=[FunnelStage.lead, FunnelStage.qualified]),
+        PartnerListFilter(
+            funnel_stage=[FunnelStage.lead, FunnelStage.qualified],
+            business_type=[BusinessType.furniture_showroom, BusinessType.furniture_distributor],
+        ),
+        PartnerListFilter(created_from=month_ago),
+        PartnerListFilter(
+            funnel_stage=[FunnelStage.lead, FunnelStage.qualified],
+            created_from=month_ago,
+            ranges=["total_transaction_amount_estimated:1000000.."],
+        ),
+        PartnerListFilter(tags=["vip", "online"], tags_mode="all"),
+        PartnerListFilter(province=["Tehran", "Isfahan"]),
+    ]
+
+
+def _filter_label(filters: ListFilters) -> List[str]:
+    if isinstance(filters, PartnerListFilter):
+        return sorted(filters.model_dump(exclude_defaults=True))
+    return sorted(k for k in filters if k not in NOT_DELETED)
+
+
+def sample_value(collection: Collection, field: str):
+    """
+    یک مقدار واقعی از دیتابیس؛ اگر نبود مقدار ساختگی (پلن به مقدار وابسته نیست)
+    """
+    doc = collection.find_one(
+        {**NOT_DELETED, field: {"$exists": True, "$ne": None}},
+        {field: 1},
+    )
+
+    value = doc
+    for part in field.split("."):
+        value = value.get(part) if isinstance(value, dict) else None
+
+    if isinstance(value, list):
+        value = value[0] if value else None
+
+    return value if value is not None else "__sample__"
+
+
+def plan_stages(plan: dict) -> Iterator[dict]:
+    """
+    پیمایش بازگشتی درخت پلن (classic و SBE)
+    """
+    if not isinstance(plan, dict):
+        return
+
+    if "stage" in plan:
+        yield plan
+
+    for key in ("queryPlan", "inputStage"):
+        if key in plan:
+            yield from plan_stages(plan[key])
+
+    for child in plan.get("inputStages", []):
+        yield from plan_stages(child)
+
+
+def explain_shape(
+    collection: Collection,
+    filters: ListFilters,
+    after: Optional[Tuple[datetime, ObjectId]] = None,
+) -> dict:
+    query = _build_list_query(filters)
+    if after is not None:
+        query = _apply_keyset(query, after)
+
+    explain = collection.find(query).sort(LIST_SORT).limit(21).explain()
+    winning = explain["queryPlanner"]["winningPlan"]
+    stages = list(plan_stages(winning))
+    names = [stage["stage"] for stage in stages]
+
+    return {
+        "filters": _filter_label(filters),
+        "mode": "cursor" if after else "page",
+        "stages": names,
+        "indexes": sorted({s["indexName"] for s in stages if "indexName" in s}),
+        "problems": sorted(BAD_STAGES.intersection(names)),
+    }
+
+
+def explain_all(collection: Collection) -> List[dict]:
+    after = (datetime.utcnow(), ObjectId())
+    results = []
+
+    for shape in list_filter_shapes():
+        filters = dict(NOT_DELETED)
+        for field in shape:
+            filters[field] = sample_value(collection, field)
+
+        results.append(explain_shape(collection, filters))
+        results.append(explain_shape(collection, filters, after=after))
+
+    for filters in dsl_filter_shapes():
+        results.append(explain_shape(collection, filters))
+        results.append(explain_shape(collection, filters, after=after))
+
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ensure-indexes", action="store_true")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    if args.ensure_indexes:
+        ensure_indexes()
+
+    results = explain_all(get_partners_collection())
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for r in results:
+            status = "FLAG " + ",".join(r["problems"]) if r["problems"] else "ok"
+            filters = "+".join(r["filters"]) or "(none)"
+            print(f"{status:<16} {r['mode']:<7} {filters:<55} {','.join(r['indexes'])}")
+
+    return 1 if any(r["problems"] for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
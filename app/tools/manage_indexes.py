@@ -0,0 +1,162 @@
+"""
+مدیریت ایندکس‌ها یک بار برای کل deploy (نه در startup هر worker)
+ایندکس‌های تعریف‌شده (app.database.mongo.declared_index_models) با ایندکس‌های
+موجود در دیتابیس مقایسه می‌شوند:
+- missing: تعریف شده، در دیتابیس نیست → ساخته می‌شود
+- changed: همان نام (یا همان کلیدها) با کلید / گزینه متفاوت → فقط با --rebuild
+  (drop و ساخت دوباره؛ روی کالکشن بزرگ زمان‌بر است)
+- unknown: در دیتابیس هست، تعریف نشده → فقط گزارش، مگر با --drop-unknown
+
+اجرا:
+    python -m app.tools.manage_indexes              # ساخت missing ها
+    python -m app.tools.manage_indexes --check      # فقط گزارش (CI / پیش از deploy)
+    python -m app.tools.manage_indexes --rebuild --drop-unknown --json
+
+با --check اگر ایندکسی missing / changed باشد exit code برابر 1 است؛
+بدون --check اگر بعد از اعمال هنوز changed باقی مانده باشد
+"""
+import argparse
+import json
+import sys
+import time
+from typing import Dict, List
+
+from pymongo import IndexModel
+from pymongo.database import Database
+
+from app.database.mongo import declared_index_models, get_database
+
+
+# گزینه‌هایی که تفاوتشان یعنی ایندکس دیگری است
+COMPARED_OPTIONS = ("partialFilterExpression", "expireAfterSeconds", "unique", "sparse")
+
+
+def _normalize_key(key) -> List[tuple]:
+    # سرور جهت را گاهی double برمی‌گرداند (1.0)
+    items = key.items() if isinstance(key, dict) else key
+    return [(field, int(d) if isinstance(d, (int, float)) else d) for field, d in items]
+
+
+def _spec(info: dict) -> dict:
+    return {
+        "key": _normalize_key(info["key"]),
+        **{option: info[option] for option in COMPARED_OPTIONS if option in info},
+    }
+
+
+def diff_collection(db: Database, name: str, models: List[IndexModel]) -> List[dict]:
+    existing = {
+        index_name: _spec(info)
+        for index_name, info in db[name].index_information().items()
+        if index_name != "_id_"
+    }
+    by_key = {tuple(spec["key"]): index_name for index_name, spec in existing.items()}
+
+    rows = []
+    matched = set()
+
+    for model in models:
+        document = model.document
+        declared = _spec(document)
+        index_name = document["name"]
+
+        current_name = index_name if index_name in existing else by_key.get(tuple(declared["key"]))
+        if current_name is None:
+            status = "missing"
+        else:
+            matched.add(current_name)
+            same = current_name == index_name and existing[current_name] == declared
+            status = "ok" if same else "changed"
+
+        rows.append({
+            "collection": name,
+            "name": index_name,
+            "status": status,
+            "current": current_name,
+            "model": model,
+        })
+
+    for index_name in existing:
+        if index_name not in matched:
+            rows.append({"collection": name, "name": index_name, "status": "unknown", "current": index_name})
+
+    return rows
+
+
+def diff_indexes(db: Database) -> List[dict]:
+    rows = []
+    for name, models in declared_index_models().items():
+        rows.extend(diff_collection(db, name, models))
+    return rows
+
+
+def apply_diff(db: Database, rows: List[dict], rebuild: bool = False, drop_unknown: bool = False) -> List[dict]:
+    """
+    missing ها در یک create_indexes برای هر کالکشن؛ وضعیت جدید هر سطر در "action"
+    """
+    missing: Dict[str, List[IndexModel]] = {}
+
+    for row in rows:
+        collection = db[row["collection"]]
+        row["action"] = None
+
+        if row["status"] == "missing":
+            missing.setdefault(row["collection"], []).append(row["model"])
+            row["action"] = "created"
+        elif row["status"] == "changed" and rebuild:
+            collection.drop_index(row["current"])
+            missing.setdefault(row["collection"], []).append(row["model"])
+            row["action"] = "rebuilt"
+        elif row["status"] == "unknown" and drop_unknown:
+            collection.drop_index(row["current"])
+            row["action"] = "dropped"
+
+    for name, models in missing.items():
+        db[name].create_indexes(models)
+
+    return rows
+
+
+def sync_indexes(rebuild: bool = False, drop_unknown: bool = False) -> List[dict]:
+    """
+    نقطه ورود برنامه‌ای (app.serve پیش از fork کردن worker ها)
+    """
+    db = get_database()
+    return apply_diff(db, diff_indexes(db), rebuild=rebuild, drop_unknown=drop_unknown)
+
+
+def _unresolved(rows: List[dict], check: bool) -> bool:
+    if check:
+        return any(r["status"] in ("missing", "changed") for r in rows)
+    return any(r["status"] == "changed" and r.get("action") is None for r in rows)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--check", action="store_true")
+    parser.add_argument("--rebuild", action="store_true")
+    parser.add_argument("--drop-unknown", action="store_true")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    db = get_database()
+    rows = diff_indexes(db)
+    if not args.check:
+        apply_diff(db, rows, rebuild=args.rebuild, drop_unknown=args.drop_unknown)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    if args.json:
+        report = [{k: v for k, v in r.items() if k != "model"} for r in rows]
+        print(json.dumps({"indexes": report, "elapsed_ms": round(elapsed_ms, 1)}, indent=2))
+    else:
+        for r in rows:
+            action = r.get("action") or ""
+            print(f"{r['status']:<8} {action:<8} {r['collection']:<16} {r['name']}")
+        print(f"({elapsed_ms:.0f} ms)")
+
+    return 1 if _unresolved(rows, args.check) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
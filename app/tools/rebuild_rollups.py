@@ -0,0 +1,110 @@
+"""
+محاسبه کامل partner_rollups از روی partners (بعد از migration یا انحراف)
+- نتیجه در کالکشن موقت نوشته و با rename جایگزین می‌شود
+  (خواننده‌ها هیچ وقت rollup نیمه‌کاره نمی‌بینند)
+- write هایی که همزمان با اجرا انجام شوند ممکن است از قلم بیفتند؛
+  در ساعت کم‌ترافیک اجرا شود
+- --check: فقط مقایسه با rollup فعلی و گزارش اختلاف
+- --if-missing: فقط اگر rollup ها هنوز ساخته نشده‌اند یا شکلشان قدیمی است
+  (ROLLUP_FORMAT؛ app.serve پیش از شروع worker ها)
+
+اجرا:
+    python -m app.tools.rebuild_rollups
+    python -m app.tools.rebuild_rollups --check
+    python -m app.tools.rebuild_rollups --if-missing
+"""
+import argparse
+import json
+import sys
+
+from pymongo.collection import Collection
+
+from app.database.mongo import get_partners_collection
+from app.repositories.rollups import (
+    ROLLUP_COLLECTION,
+    ROLLUP_STATE_ID,
+    rebuild_pipeline,
+    rebuild_docs,
+    rollup_id_key,
+    rollup_ready_query,
+    rollup_state_doc,
+)
+
+
+def compute_rollups(collection: Collection) -> list:
+    return rebuild_docs(collection.aggregate(rebuild_pipeline()))
+
+
+def _label(key: tuple) -> str:
+    # کلید JSON گزارش؛ None و "" جدا می‌مانند
+    return json.dumps(list(key), ensure_ascii=False)
+
+
+def diff_rollups(collection: Collection, expected: list) -> dict:
+    current = {
+        _label(rollup_id_key(doc["_id"])): doc["count"]
+        for doc in collection.database[ROLLUP_COLLECTION].find(
+            {"_id": {"$ne": ROLLUP_STATE_ID}, "count": {"$ne": 0}}
+        )
+        if isinstance(doc["_id"], dict)
+    }
+    wanted = {_label(rollup_id_key(doc["_id"])): doc["count"] for doc in expected}
+
+    return {
+        key: {"rollup": current.get(key, 0), "actual": wanted.get(key, 0)}
+        for key in sorted(set(current) | set(wanted))
+        if current.get(key, 0) != wanted.get(key, 0)
+    }
+
+
+def replace_rollups(collection: Collection, docs: list):
+    """
+    نشانه ROLLUP_STATE_ID همراه داده‌ها در staging نوشته می‌شود (کالکشن خالی هم ساخته‌شده است)
+    """
+    database = collection.database
+    staging = database[f"{ROLLUP_COLLECTION}_rebuild"]
+
+    staging.drop()
+    staging.insert_many([*docs, rollup_state_doc()])
+    staging.rename(ROLLUP_COLLECTION, dropTarget=True)
+
+
+def rollups_initialized(collection: Collection) -> bool:
+    return collection.database[ROLLUP_COLLECTION].find_one(rollup_ready_query()) is not None
+
+
+def ensure_rollups(collection: Collection) -> bool:
+    """
+    ساخت کامل فقط اگر هنوز ساخته نشده (یا با ROLLUP_FORMAT قدیمی)؛ خروجی True اگر ساخته شد
+    """
+    if rollups_initialized(collection):
+        return False
+
+    replace_rollups(collection, compute_rollups(collection))
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--check", action="store_true")
+    parser.add_argument("--if-missing", action="store_true")
+    args = parser.parse_args()
+
+    collection = get_partners_collection()
+
+    if args.if_missing and rollups_initialized(collection):
+        print(json.dumps({"skipped": "already initialized"}))
+        return
+    docs = compute_rollups(collection)
+
+    if args.check:
+        diff = diff_rollups(collection, docs)
+        print(json.dumps({"groups": len(docs), "drift": diff}, ensure_ascii=False))
+        sys.exit(1 if diff else 0)
+
+    replace_rollups(collection, docs)
+    print(json.dumps({"groups": len(docs), "partners": sum(d["count"] for d in docs)}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+import csv
+import json
+from typing import AsyncIterator, Optional, Union
+
+from pydantic import ValidationError
+
+
+# =====================================
+# Streamed bulk import (NDJSON / CSV)
+# بدنه درخواست خط به خط خوانده می‌شود؛ کل فایل در حافظه نمی‌ماند
+# =====================================
+
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/jsonl", "application/ndjson")
+CSV_CONTENT_TYPES = ("text/csv", "application/csv")
+
+# شماره‌ها در ستون contact_numbers با ; جدا می‌شوند
+CSV_NUMBER_SEPARATOR = ";"
+
+
+def _decode_line(line: bytes) -> Union[str, ValueError]:
+    try:
+        return line.decode("utf-8-sig").rstrip("\r")
+    except UnicodeDecodeError as e:
+        return ValueError(f"Invalid UTF-8: {e.reason} at byte {e.start}")
+
+
+async def iter_lines(stream: AsyncIterator[bytes]) -> AsyncIterator[Union[str, ValueError]]:
+    """
+    خط با بایت‌های نامعتبر UTF-8 به صورت ValueError (خطای همان ردیف، نه کل درخواست)
+    """
+    buffer = b""
+
+    async for chunk in stream:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield _decode_line(line)
+
+    if buffer:
+        yield _decode_line(buffer)
+
+
+async def iter_ndjson_rows(stream: AsyncIterator[bytes]) -> AsyncIterator[object]:
+    """
+    هر خط یک JSON؛ خط خراب به صورت ValueError به جای همان ردیف برمی‌گردد
+    """
+    async for line in iter_lines(stream):
+        if isinstance(line, ValueError):
+            yield line
+            continue
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            yield ValueError(f"Invalid JSON: {e}")
+
+
+def csv_row_to_quick_entry(row: dict) -> dict:
+    """
+    ستون‌های CSV → فیلدهای PartnerQuickEntry (رشته خالی = None)
+    """
+    data = {k.strip(): (v.strip() or None) for k, v in row.items() if k and v is not None}
+
+    numbers = data.pop("contact_numbers", None)
+    if numbers:
+        data["contact_numbers"] = [
+            {"number": n.strip()}
+            for n in numbers.split(CSV_NUMBER_SEPARATOR)
+            if n.strip()
+        ]
+
+    latitude = data.pop("latitude", None)
+    longitude = data.pop("longitude", None)
+    if latitude is not None or longitude is not None:
+        data["location"] = {"latitude": latitude, "longitude": longitude}
+
+    return {k: v for k, v in data.items() if v is not None}
+
+
+async def iter_csv_rows(stream: AsyncIterator[bytes]) -> AsyncIterator[Union[dict, ValueError]]:
+    """
+    خط اول header است؛ هر رکورد باید در یک خط باشد
+    """
+    header: Optional[list] = None
+
+    async for line in iter_lines(stream):
+        if isinstance(line, ValueError):
+            yield line
+            continue
+        if not line.strip():
+            continue
+
+        values = next(csv.reader([line]))
+        if header is None:
+            header = values
+            continue
+
+        yield csv_row_to_quick_entry(dict(zip(header, values)))
+
+
+def format_row_error(exc: Exception) -> str:
+    """
+    پیام کوتاه و یک‌خطی برای خطای یک ردیف
+    """
+    if isinstance(exc, ValidationError):
+        return "; ".join(
+            f"{'.'.join(str(p) for p in err['loc']) or 'row'}: {err['msg']}"
+            for err in exc.errors()
+        )
+    return str(exc)
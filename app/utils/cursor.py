@@ -0,0 +1,32 @@
+import base64
+import json
+from datetime import datetime, timedelta
+from typing import Tuple
+
+from bson import ObjectId
+
+
+# =====================================
+# Keyset cursor: (meta.created_at, _id)
+# رشته opaque برای کلاینت (base64 از JSON)
+# =====================================
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def encode_cursor(created_at: datetime, oid: ObjectId) -> str:
+    created_ms = (created_at.replace(tzinfo=None) - _EPOCH) // timedelta(milliseconds=1)
+    raw = json.dumps([created_ms, str(oid)], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, ObjectId]:
+    """
+    ValueError برای cursor نامعتبر
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_ms, oid = json.loads(base64.urlsafe_b64decode(padded))
+        return _EPOCH + timedelta(milliseconds=int(created_ms)), ObjectId(oid)
+    except Exception as exc:
+        raise ValueError("Invalid cursor") from exc
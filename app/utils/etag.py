@@ -0,0 +1,55 @@
+import hashlib
+from datetime import datetime, timedelta
+from typing import Optional
+
+from app.utils.cursor import _EPOCH
+
+
+# =====================================
+# Weak ETag (RFC 9110)
+# - جزئیات: id + meta.updated_at
+# - لیست: نسخه کالکشن (آخرین meta.updated_at) + query string
+# =====================================
+
+
+def weak_etag(*parts) -> str:
+    raw = "|".join(str(part) for part in parts).encode()
+    return f'W/"{hashlib.sha1(raw).hexdigest()[:20]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    مقایسه weak: پیشوند W/ در هر دو طرف نادیده گرفته می‌شود
+    """
+    if not if_none_match:
+        return False
+
+    if if_none_match.strip() == "*":
+        return True
+
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
+
+
+def partner_etag(partner) -> str:
+    """
+    partner می‌تواند Partner یا dict (TRUSTED_READS / کش redis) باشد
+    """
+    if isinstance(partner, dict):
+        partner_id = partner.get("id")
+        updated_at = (partner.get("meta") or {}).get("updated_at")
+    else:
+        partner_id = partner.id
+        updated_at = partner.meta.updated_at
+
+    # کش redis تاریخ را به صورت رشته ISO برمی‌گرداند
+    if isinstance(updated_at, str):
+        updated_at = datetime.fromisoformat(updated_at)
+
+    if isinstance(updated_at, datetime):
+        updated_at = (updated_at.replace(tzinfo=None) - _EPOCH) // timedelta(milliseconds=1)
+
+    return weak_etag(partner_id, updated_at)
@@ -0,0 +1,100 @@
+import csv
+import io
+from datetime import datetime
+from enum import Enum
+from typing import AsyncIterator, List, Optional
+
+import orjson
+
+from app.repositories.projections import PARTNER_LEAF_PATHS
+from app.utils.response import orjson_default
+
+
+# =====================================
+# Streaming export (NDJSON / CSV)
+# خروجی در تکه‌های ~64KB فرستاده می‌شود؛ حافظه مستقل از تعداد ردیف‌هاست
+# =====================================
+
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+# مقادیر لیستی (شماره‌ها، تگ‌ها، ...) در یک سلول CSV با ; جدا می‌شوند
+CSV_LIST_SEPARATOR = ";"
+
+
+def csv_columns(projection: Optional[dict]) -> List[str]:
+    """
+    ستون‌های CSV: برگ‌های مدل Partner (فقط زیر فیلدهای انتخاب‌شده)
+    """
+    if projection is None:
+        return ["id", *PARTNER_LEAF_PATHS]
+
+    return ["id", *[
+        path for path in PARTNER_LEAF_PATHS
+        if any(path == sel or path.startswith(f"{sel}.") for sel in projection)
+    ]]
+
+
+def _csv_value(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return str(value.value)
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+def extract_path(doc: dict, path: str) -> str:
+    """
+    مقدار یک مسیر nested؛ از روی لیست‌ها هم عبور می‌کند (contact_numbers.number)
+    """
+    values = [doc]
+
+    for part in path.split("."):
+        next_values = []
+        for value in values:
+            value = value.get(part) if isinstance(value, dict) else None
+            if isinstance(value, list):
+                next_values.extend(value)
+            elif value is not None:
+                next_values.append(value)
+        values = next_values
+
+    return CSV_LIST_SEPARATOR.join(_csv_value(v) for v in values)
+
+
+async def ndjson_chunks(docs: AsyncIterator[dict]) -> AsyncIterator[bytes]:
+    buffer = bytearray()
+
+    async for doc in docs:
+        buffer += orjson.dumps(doc, default=orjson_default)
+        buffer += b"\n"
+
+        if len(buffer) >= EXPORT_CHUNK_BYTES:
+            yield bytes(buffer)
+            buffer.clear()
+
+    if buffer:
+        yield bytes(buffer)
+
+
+async def csv_chunks(docs: AsyncIterator[dict], columns: List[str]) -> AsyncIterator[bytes]:
+    text = io.StringIO()
+    writer = csv.writer(text)
+
+    # BOM برای باز شدن درست فارسی در Excel
+    text.write("﻿")
+    writer.writerow(columns)
+
+    async for doc in docs:
+        writer.writerow([extract_path(doc, column) for column in columns])
+
+        if text.tell() >= EXPORT_CHUNK_BYTES:
+            yield text.getvalue().encode()
+            text.seek(0)
+            text.truncate()
+
+    if text.tell():
+        yield text.getvalue().encode()
@@ -0,0 +1,40 @@
+import math
+from typing import Optional
+
+
+# =====================================
+# Geo helpers
+# identity.location (latitude / longitude) → GeoJSON Point برای ایندکس 2dsphere
+# =====================================
+
+EARTH_RADIUS_M = 6_371_008.8
+
+
+def geo_point(location: Optional[dict]) -> Optional[dict]:
+    """
+    None اگر مختصات ناقص یا خارج از محدوده باشد
+    (GeoJSON نامعتبر روی ایندکس 2dsphere کل insert را خراب می‌کند)
+    """
+    if not location:
+        return None
+
+    lat = location.get("latitude")
+    lng = location.get("longitude")
+
+    if lat is None or lng is None:
+        return None
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        return None
+
+    # ترتیب GeoJSON: [longitude, latitude]
+    return {"type": "Point", "coordinates": [lng, lat]}
+
+
+def haversine_m(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lng2 - lng1)
+
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
@@ -1,6 +1,8 @@
 from bson import ObjectId
 from fastapi import HTTPException
 
+from app.utils.cursor import decode_cursor
+
 
 def object_id_or_400(id_str: str) -> ObjectId:
     try:
@@ -14,3 +16,10 @@ def bp_from_mongo(doc):
     doc["id"] = str(doc["_id"])
     del doc["_id"]
     return doc
+
+
+def cursor_or_400(cursor: str):
+    try:
+        return decode_cursor(cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
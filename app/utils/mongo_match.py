@@ -0,0 +1,113 @@
+import re
+from datetime import datetime, timezone
+from enum import Enum
+from typing import Any, List
+
+
+# =====================================
+# ارزیابی درون‌پردازه‌ای کوئری Mongo روی یک داکیومنت
+# فقط زیرمجموعه‌ای که _build_list_query تولید می‌کند:
+#   equality، $in، $all، $gt / $gte / $lt / $lte، $ne، $regex، $and، $or
+# مثل Mongo: فیلد آرایه‌ای با هر عضو خود مقایسه می‌شود
+# (برای فیلتر کردن feed زنده با همان فیلترهای list_partners)
+# =====================================
+
+_MISSING = object()
+
+
+def _values(doc: Any, path: str) -> List[Any]:
+    """
+    همه مقادیر یک مسیر با نقطه؛ آرایه‌های میانی باز می‌شوند
+    """
+    current = [doc]
+    for part in path.split("."):
+        found = []
+        for value in current:
+            if isinstance(value, list):
+                value = [v.get(part, _MISSING) for v in value if isinstance(v, dict)]
+                found.extend(v for v in value if v is not _MISSING)
+            elif isinstance(value, dict) and part in value:
+                found.append(value[part])
+        current = found
+    return current
+
+
+def _plain(value):
+    if isinstance(value, Enum):
+        return value.value
+    # Mongo تاریخ را naive (UTC) برمی‌گرداند؛ ورودی API ممکن است timezone داشته باشد
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _candidates(values: List[Any]) -> List[Any]:
+    # خود آرایه و هر عضو آن
+    out = []
+    for value in values:
+        out.append(_plain(value))
+        if isinstance(value, list):
+            out.extend(_plain(v) for v in value)
+    return out
+
+
+def _compare(op: str, candidate, bound) -> bool:
+    try:
+        if op == "$gt":
+            return candidate > bound
+        if op == "$gte":
+            return candidate >= bound
+        if op == "$lt":
+            return candidate < bound
+        return candidate <= bound
+    except TypeError:
+        # نوع متفاوت (مثلاً None با عدد) در Mongo هم منطبق نمی‌شود
+        return False
+
+
+def _field_matches(values: List[Any], condition) -> bool:
+    candidates = _candidates(values)
+
+    if not (isinstance(condition, dict) and condition and all(k.startswith("$") for k in condition)):
+        condition = _plain(condition)
+        if condition is None:
+            return not values or None in candidates
+        return condition in candidates
+
+    for op, arg in condition.items():
+        if op == "$in":
+            wanted = [_plain(a) for a in arg]
+            if not any(c in wanted for c in candidates) and not (None in wanted and not values):
+                return False
+        elif op == "$all":
+            if not all(_plain(a) in candidates for a in arg):
+                return False
+        elif op == "$ne":
+            if _plain(arg) in candidates:
+                return False
+        elif op in ("$gt", "$gte", "$lt", "$lte"):
+            bound = _plain(arg)
+            if not any(_compare(op, c, bound) for c in candidates):
+                return False
+        elif op == "$regex":
+            pattern = re.compile(arg)
+            if not any(isinstance(c, str) and pattern.search(c) for c in candidates):
+                return False
+        else:
+            raise ValueError(f"Unsupported operator: {op}")
+
+    return True
+
+
+def matches(query: dict, doc: dict) -> bool:
+    for key, condition in query.items():
+        if key == "$and":
+            if not all(matches(sub, doc) for sub in condition):
+                return False
+        elif key == "$or":
+            if not any(matches(sub, doc) for sub in condition):
+                return False
+        elif not _field_matches(_values(doc, key), condition):
+            return False
+
+    return True
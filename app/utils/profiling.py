@@ -0,0 +1,152 @@
+import cProfile
+import os
+import re
+import time
+import logging
+from collections import deque
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+
+# =====================================
+# Sampling profiler (هر N درخواست یک profile)
+# - پیش‌فرض خاموش؛ در زمان اجرا با PUT /metrics/profiling روشن / خاموش می‌شود
+# - cprofile: فایل .prof (با snakeviz / pstats خوانده می‌شود)
+#   فقط thread event loop را می‌بیند (route های sync روی threadpool دیده نمی‌شوند)
+#   و در حین نمونه، کار درخواست‌های همزمان دیگر هم در profile می‌آید
+# - pyinstrument (اگر نصب باشد): فایل .html، async-aware
+# - هر لحظه حداکثر یک نمونه فعال است
+# =====================================
+
+ProfileMode = Literal["cprofile", "pyinstrument"]
+
+PROFILE_EVERY_N = int(os.getenv("PROFILE_EVERY_N", "0"))
+PROFILE_MODE: ProfileMode = os.getenv("PROFILE_MODE", "cprofile")
+PROFILE_DIR = os.getenv("PROFILE_DIR", "/tmp/crm-profiles")
+PROFILE_PATH_PREFIX = os.getenv("PROFILE_PATH_PREFIX", "/partners")
+
+# تعداد dump های اخیر که در GET /metrics/profiling نشان داده می‌شوند
+PROFILE_RECENT = 50
+
+
+class ProfilingSettings(BaseModel):
+    """
+    every_n=0 یعنی خاموش
+    """
+
+    every_n: int = Field(0, ge=0)
+    mode: ProfileMode = "cprofile"
+    path_prefix: str = "/partners"
+
+
+@dataclass
+class ProfileSession:
+    mode: ProfileMode
+    profiler: Any
+    started_at: float
+
+
+def _slug(value: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "_", value).strip("_") or "root"
+
+
+class RequestProfiler:
+    def __init__(self, settings: ProfilingSettings, output_dir: str = PROFILE_DIR):
+        self.settings = settings
+        self.output_dir = output_dir
+        self.recent: deque = deque(maxlen=PROFILE_RECENT)
+
+        self._lock = Lock()
+        self._seen = 0
+        self._active = False
+
+    def configure(self, settings: ProfilingSettings):
+        """
+        ValueError اگر pyinstrument خواسته شود و نصب نباشد
+        """
+        if settings.mode == "pyinstrument":
+            try:
+                import pyinstrument  # noqa: F401
+            except ImportError:
+                raise ValueError("pyinstrument is not installed")
+
+        with self._lock:
+            self.settings = settings
+            self._seen = 0
+
+        logging.info(f"Request profiling: {settings.model_dump()}")
+
+    def start(self, path: str) -> Optional[ProfileSession]:
+        settings = self.settings
+        if not settings.every_n or not path.startswith(settings.path_prefix):
+            return None
+
+        with self._lock:
+            self._seen += 1
+            if self._active or self._seen % settings.every_n:
+                return None
+            self._active = True
+
+        try:
+            if settings.mode == "pyinstrument":
+                from pyinstrument import Profiler
+
+                profiler = Profiler(async_mode="enabled")
+                profiler.start()
+            else:
+                profiler = cProfile.Profile()
+                profiler.enable()
+        except Exception:
+            # مثلاً profiler دیگری روی همین thread فعال است
+            logging.exception("Failed to start request profiler")
+            self._active = False
+            return None
+
+        return ProfileSession(settings.mode, profiler, time.time())
+
+    def stop(self, session: ProfileSession, method: str, route: str, elapsed: float):
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            stamp = time.strftime("%Y%m%dT%H%M%S", time.localtime(session.started_at))
+            name = f"{stamp}-{method}-{_slug(route)}-{elapsed * 1000:.0f}ms"
+
+            if session.mode == "pyinstrument":
+                session.profiler.stop()
+                path = os.path.join(self.output_dir, f"{name}.html")
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(session.profiler.output_html())
+            else:
+                session.profiler.disable()
+                path = os.path.join(self.output_dir, f"{name}.prof")
+                session.profiler.dump_stats(path)
+
+            self.recent.append({
+                "file": path,
+                "method": method,
+                "route": route,
+                "duration_ms": round(elapsed * 1000, 2),
+            })
+        except Exception:
+            logging.exception("Failed to write request profile")
+        finally:
+            self._active = False
+
+    def stats(self) -> dict:
+        return {
+            **self.settings.model_dump(),
+            "output_dir": self.output_dir,
+            "active": self._active,
+            "recent": list(self.recent),
+        }
+
+
+_request_profiler = RequestProfiler(
+    ProfilingSettings(every_n=PROFILE_EVERY_N, mode=PROFILE_MODE, path_prefix=PROFILE_PATH_PREFIX)
+)
+
+
+def get_request_profiler() -> RequestProfiler:
+    return _request_profiler
@@ -1,18 +1,73 @@
-def api_success(data, message="OK", code="200", pagination=None):
+import orjson
+from bson import ObjectId
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from app.utils.timing import phase
+
+
+def orjson_default(obj):
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    Response پیش‌فرض اپ: مدل‌های Pydantic، datetime و enum را
+    مستقیم با orjson و در یک مرحله serialize می‌کند
+    """
+
+    def render(self, content) -> bytes:
+        with phase("encode"):
+            return orjson.dumps(
+                content,
+                default=orjson_default,
+                option=orjson.OPT_NON_STR_KEYS,
+            )
+
+
+def api_success(data, message="OK", code="200", pagination=None, extra_meta=None):
+    meta = {
+        "message": message,
+        "status": "success",
+        "code": code,
+        "pagination": pagination
+    }
+
+    # اطلاعات جانبی پاسخ (مثلاً duplicates در quick-entry)
+    if extra_meta:
+        meta.update(extra_meta)
+
     return {
         "data": data,
-        "meta": {
-            "message": message,
-            "status": "success",
-            "code": code,
-            "pagination": pagination
-        }
+        "meta": meta
     }
 
 
-def api_error(message="Error", code="400"):
+def api_success_response(
+    data,
+    message="OK",
+    code="200",
+    pagination=None,
+    headers=None,
+    extra_meta=None
+):
+    """
+    مثل api_success اما مستقیم Response برمی‌گرداند
+    تا FastAPI دوباره jsonable_encoder اجرا نکند
+    """
+    return ORJSONResponse(
+        api_success(data, message, code, pagination, extra_meta),
+        headers=headers,
+    )
+
+
+def api_error(message="Error", code="400", data=None):
     return {
-        "data": None,
+        "data": data,
         "meta": {
             "message": message,
             "status": "error",
@@ -21,14 +76,30 @@ def api_error(message="Error", code="400"):
     }
 
 
-def build_pagination(page: int, limit: int, total: int):
-    total_pages = (total + limit - 1) // limit
+def build_pagination(
+    page: int,
+    limit: int,
+    total: int | None,
+    has_next: bool | None = None,
+    next_cursor: str | None = None,
+    cursor: str | None = None,
+):
+    """
+    - حالت page/limit (قدیمی)
+    - حالت cursor: page معنی ندارد؛ صفحه بعد با next_cursor
+    - total=None (with_total=none): has_next از خواندن limit+1 آیتم
+    """
+    total_pages = None if total is None else (total + limit - 1) // limit
+
+    if has_next is None:
+        has_next = total_pages is not None and page < total_pages
 
     return {
-        "page": page,
+        "page": None if cursor else page,
         "limit": limit,
         "total": total,
         "total_pages": total_pages,
-        "has_next": page < total_pages,
-        "has_previous": page > 1
+        "has_next": has_next,
+        "has_previous": bool(cursor) or page > 1,
+        "next_cursor": next_cursor,
     }
@@ -0,0 +1,71 @@
+import re
+from typing import List, Optional
+
+
+# =====================================
+# Persian / Arabic text normalization
+# هم موقع نوشتن (فیلد search) و هم موقع جستجو دقیقاً یک تابع اجرا می‌شود
+# =====================================
+
+_CHAR_MAP = str.maketrans({
+    # عربی → فارسی
+    "ي": "ی",
+    "ى": "ی",
+    "ئ": "ی",
+    "ك": "ک",
+    "ة": "ه",
+    "ۀ": "ه",
+    "أ": "ا",
+    "إ": "ا",
+    "ٱ": "ا",
+    "آ": "ا",
+    "ؤ": "و",
+    # ارقام فارسی و عربی → لاتین
+    **{chr(0x06F0 + i): str(i) for i in range(10)},
+    **{chr(0x0660 + i): str(i) for i in range(10)},
+    # نیم‌فاصله → فاصله
+    "\u200c": " ",
+})
+
+# اعراب، تنوین و کشیده (ـ)
+_DIACRITICS = re.compile(r"[\u064B-\u065F\u0670\u0640]")
+
+_TOKEN_SPLIT = re.compile(r"[\W_]+")
+
+_NON_DIGITS = re.compile(r"\D+")
+
+# کوتاه‌ترین بخش انتهایی شماره که قابل جستجو است (مثلاً ۴ رقم آخر)
+PHONE_MIN_SUFFIX = 4
+
+
+def normalize_text(value: Optional[str]) -> str:
+    if not value:
+        return ""
+
+    value = _DIACRITICS.sub("", value.translate(_CHAR_MAP))
+    return " ".join(value.casefold().split())
+
+
+def tokenize(value: Optional[str]) -> List[str]:
+    return [token for token in _TOKEN_SPLIT.split(normalize_text(value)) if token]
+
+
+def normalize_phone(value: Optional[str]) -> str:
+    """
+    فقط ارقام؛ پیش‌شماره کشور (+98 / 0098 / 98) به 0 تبدیل می‌شود
+    """
+    digits = _NON_DIGITS.sub("", normalize_text(value))
+
+    if digits.startswith("0098"):
+        digits = "0" + digits[4:]
+    elif digits.startswith("98") and len(digits) == 12:
+        digits = "0" + digits[2:]
+
+    return digits
+
+
+def phone_suffixes(phone: str) -> List[str]:
+    """
+    همه بخش‌های انتهایی شماره: جستجوی prefix روی آن‌ها = جستجوی بخشی از شماره
+    """
+    return [phone[i:] for i in range(len(phone) - PHONE_MIN_SUFFIX + 1)] or [phone]
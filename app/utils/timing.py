@@ -0,0 +1,135 @@
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Dict, Optional, TypeVar
+
+from app.utils.metrics import get_metrics_registry
+from app.utils.profiling import get_request_profiler
+
+
+# =====================================
+# Request timing (per-phase)
+# phase ها (mongo_find / mongo_count / build / encode / ...) در یک dict
+# داخل ContextVar جمع می‌شوند؛ route های sync روی threadpool همان dict را
+# (با context کپی‌شده) می‌بینند
+# خروجی: هدر Server-Timing + histogram روی GET /metrics
+# =====================================
+
+SERVER_TIMING_HEADER = os.getenv("SERVER_TIMING_HEADER", "true").lower() in ("1", "true", "yes")
+
+_phases: ContextVar[Optional[Dict[str, float]]] = ContextVar("request_phases", default=None)
+
+_registry = get_metrics_registry()
+
+REQUEST_DURATION = _registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency (until the response body is sent)",
+    ("method", "route", "status"),
+)
+REQUEST_PHASE_DURATION = _registry.histogram(
+    "http_request_phase_seconds",
+    "Time spent per request phase (Mongo find / count, model build, JSON encode)",
+    ("route", "phase"),
+)
+
+T = TypeVar("T")
+
+
+def record_phase(name: str, seconds: float):
+    """
+    خارج از request (tool ها / benchmark ها) کاری نمی‌کند
+    یک phase چند بار در یک request جمع می‌شود
+    """
+    phases = _phases.get()
+    if phases is not None:
+        phases[name] = phases.get(name, 0.0) + seconds
+
+
+@contextmanager
+def phase(name: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_phase(name, time.perf_counter() - started)
+
+
+async def timed(name: str, awaitable: Awaitable[T]) -> T:
+    """
+    برای awaitable هایی که موازی (asyncio.gather) اجرا می‌شوند
+    """
+    started = time.perf_counter()
+    try:
+        return await awaitable
+    finally:
+        record_phase(name, time.perf_counter() - started)
+
+
+def current_phases() -> Dict[str, float]:
+    return dict(_phases.get() or {})
+
+
+def server_timing(phases: Dict[str, float], total: float) -> str:
+    parts = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in phases.items()]
+    parts.append(f"app;dur={total * 1000:.2f}")
+    return ", ".join(parts)
+
+
+def _route_label(scope: dict) -> str:
+    # الگوی route (نه path واقعی) تا تعداد label ها محدود بماند
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class TimingMiddleware:
+    """
+    ASGI middleware خالص (بدون BaseHTTPMiddleware تا streaming و
+    contextvars دست نخورند)
+    - Server-Timing در http.response.start (phase های بعد از آن، مثل
+      بدنه streaming export، فقط در metrics می‌آیند)
+    - نمونه‌برداری profiler (app.utils.profiling) اگر فعال باشد
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        phases: Dict[str, float] = {}
+        token = _phases.set(phases)
+        started = time.perf_counter()
+        status = 500
+
+        profiler = get_request_profiler()
+        session = profiler.start(scope["path"])
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if SERVER_TIMING_HEADER:
+                    header = server_timing(phases, time.perf_counter() - started)
+                    message["headers"] = [
+                        *message.get("headers", []),
+                        (b"server-timing", header.encode("latin-1")),
+                    ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            elapsed = time.perf_counter() - started
+            route = _route_label(scope)
+
+            if session is not None:
+                profiler.stop(session, scope["method"], route, elapsed)
+
+            REQUEST_DURATION.observe(elapsed, method=scope["method"], route=route, status=status)
+            for name, seconds in phases.items():
+                REQUEST_PHASE_DURATION.observe(seconds, route=route, phase=name)
+
+            _phases.reset(token)
@@ -0,0 +1,98 @@
+import os
+import time
+import logging
+from datetime import datetime
+from typing import Dict
+
+from fastapi import FastAPI
+
+from app.database.mongo import warm_async_pool
+from app.models.partner import Partner
+from app.repositories.derived import derived_fields
+from app.utils.metrics import get_metrics_registry
+from app.utils.response import ORJSONResponse, api_success
+
+
+# =====================================
+# Per-worker warmup (در lifespan، پیش از پذیرفتن اولین درخواست)
+# هزینه‌هایی که در غیر این صورت روی اولین درخواست هر worker می‌افتند:
+# - mongo: باز کردن connection های pool (TCP + handshake + auth)
+# - models: اولین validate / dump مدل Partner و derived fields (regex ها)
+# - encode: اولین orjson render پاسخ
+# - openapi: ساخت schema (اولین /docs یا /openapi.json)
+# زمان هر مرحله روی GET /metrics: app_startup_phase_seconds
+# =====================================
+
+APP_WARMUP = os.getenv("APP_WARMUP", "true").lower() in ("1", "true", "yes")
+
+_registry = get_metrics_registry()
+
+STARTUP_PHASE_SECONDS = _registry.gauge(
+    "app_startup_phase_seconds",
+    "Worker startup time per phase (index build, pool / model warmup)",
+    ("phase",),
+)
+
+
+def record_startup_phase(name: str, started: float) -> float:
+    seconds = time.perf_counter() - started
+    STARTUP_PHASE_SECONDS.set(seconds, phase=name)
+    return seconds
+
+
+def _sample_doc() -> dict:
+    """
+    داکیومنت نمونه با همه بخش‌ها پر (همه زیرمدل‌ها یک بار validate شوند)
+    """
+    now = datetime.utcnow()
+    return {
+        "_id": "000000000000000000000000",
+        "identity": {
+            "brand_name": "مبل نمونه",
+            "manager_full_name": "warmup",
+            "contact_numbers": [{"label": "mobile", "number": "09120000000"}],
+            "social_links": [{"platform": "instagram", "url": "https://instagram.com/warmup"}],
+            "province": "تهران",
+            "city": "تهران",
+            "location": {"latitude": 35.7, "longitude": 51.4},
+        },
+        "relationship": {"payment_types": []},
+        "financial_estimation": {"transaction_count_estimated": 1},
+        "analysis": {"tags": ["warmup"]},
+        "acquisition": {},
+        "meta": {"created_at": now, "updated_at": now},
+    }
+
+
+def warm_models():
+    doc = _sample_doc()
+    derived_fields(doc)
+
+    partner_id = doc.pop("_id")
+    partner = Partner(id=partner_id, **doc)
+    partner.model_dump(exclude={"id"})
+
+    ORJSONResponse(api_success([partner, {"id": partner_id, **doc}]))
+
+
+async def warm_up(app: FastAPI) -> Dict[str, float]:
+    """
+    خروجی: مرحله → ثانیه
+    """
+    timings = {}
+
+    started = time.perf_counter()
+    connections = await warm_async_pool()
+    timings["warm_mongo"] = record_startup_phase("warm_mongo", started)
+
+    started = time.perf_counter()
+    warm_models()
+    timings["warm_models"] = record_startup_phase("warm_models", started)
+
+    started = time.perf_counter()
+    app.openapi()
+    timings["warm_openapi"] = record_startup_phase("warm_openapi", started)
+
+    summary = ", ".join(f"{k}={v * 1000:.1f}ms" for k, v in timings.items())
+    logging.info(f"Worker warmed up ({connections} mongo connections): {summary}")
+    return timings
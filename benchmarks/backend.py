@@ -0,0 +1,89 @@
+import asyncio
+import time
+from typing import Tuple
+
+from pymongo import MongoClient
+from motor.motor_asyncio import AsyncIOMotorClient
+
+import app.database.mongo as mongo
+from app.database.mongo import MONGO_URI, mongo_client_options
+
+
+# =====================================
+# Benchmark backends
+# - mongod محلی (MONGO_URI)
+# - یا mongomock به عنوان جایگزین (بدون I/O واقعی)
+# =====================================
+
+BENCH_DB_NAME = "crm_bench"
+
+
+def open_collections(use_mongomock: bool, name: str = "partners") -> Tuple:
+    """
+    (sync_collection, async_collection) روی یک دیتای مشترک
+    """
+    if use_mongomock:
+        import mongomock
+        from mongomock_motor import AsyncMongoMockClient
+
+        sync_client = mongomock.MongoClient()
+        async_client = AsyncMongoMockClient(mock_mongo_client=sync_client)
+    else:
+        sync_client = MongoClient(MONGO_URI)
+        async_client = AsyncIOMotorClient(MONGO_URI)
+
+    return sync_client[BENCH_DB_NAME][name], async_client[BENCH_DB_NAME][name]
+
+
+def install_app_backend(use_mongomock: bool):
+    """
+    singleton های app.database.mongo را به دیتابیس crm_bench وصل می‌کند
+    تا خود app (app.main) روی داده benchmark اجرا شود؛ داخل event loop صدا زده شود
+    خروجی: کالکشن sync partners (برای seed)
+    """
+    if use_mongomock:
+        import mongomock
+        from mongomock_motor import AsyncMongoMockClient
+
+        sync_client = mongomock.MongoClient()
+        async_client = AsyncMongoMockClient(mock_mongo_client=sync_client)
+    else:
+        sync_client = MongoClient(MONGO_URI, **mongo_client_options())
+        async_client = AsyncIOMotorClient(MONGO_URI, **mongo_client_options())
+
+    mongo._client = sync_client
+    mongo._db = sync_client[BENCH_DB_NAME]
+    mongo._async_client = async_client
+    mongo._async_db = async_client[BENCH_DB_NAME]
+
+    return mongo.get_partners_collection()
+
+
+# -------------------------------------------------
+# Simulated network latency (mongomock only)
+# -------------------------------------------------
+class SlowCollection:
+    def __init__(self, collection, latency: float):
+        self._collection = collection
+        self._latency = latency
+
+    def __getattr__(self, name):
+        return getattr(self._collection, name)
+
+    def find_one(self, *args, **kwargs):
+        time.sleep(self._latency)
+        return self._collection.find_one(*args, **kwargs)
+
+    def count_documents(self, *args, **kwargs):
+        time.sleep(self._latency)
+        return self._collection.count_documents(*args, **kwargs)
+
+
+class SlowAsyncCollection(SlowCollection):
+    async def find_one(self, *args, **kwargs):
+        await asyncio.sleep(self._latency)
+        return await self._collection.find_one(*args, **kwargs)
+
+    async def count_documents(self, *args, **kwargs):
+        await asyncio.sleep(self._latency)
+        return await self._collection.count_documents(*args, **kwargs)
@@ -0,0 +1,419 @@
+"""
+Load test: خود app (app.main) با کلاینت‌های همزمان، به تفکیک endpoint و ترکیب فیلتر
+
+- seed: داده مصنوعی از enum های Partner (benchmarks.data) در دیتابیس crm_bench
+  (mongod محلی با MONGO_URI یا --mongomock) + rollup ها، سپس lifespan اپ
+  (ایندکس‌ها، suggest index)
+- هر سناریو جدا اجرا می‌شود: warmup، سپس --requests درخواست با --concurrency کلاینت
+- خروجی JSON: rps و p50 / p95 / p99 هر سناریو + commit فعلی؛ برای مقایسه بین commit ها
+
+اجرا:
+    python -m benchmarks.bench_api run --docs 20000 --output bench-head.json
+    python -m benchmarks.bench_api run --mongomock --docs 2000 --requests 200
+    python -m benchmarks.bench_api run --only list: --only get:
+    python -m benchmarks.bench_api compare bench-base.json bench-head.json --threshold 10
+
+compare با exit code 1 تمام می‌شود اگر p95 / p99 سناریویی بیش از threshold درصد
+کندتر یا rps آن بیش از threshold درصد کمتر شده باشد.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, List, Optional, Tuple
+
+import httpx
+
+from app.main import app
+from app.models.partner import (
+    AcquisitionSource,
+    BusinessType,
+    CustomerFinancialLevel,
+    FunnelStage,
+    PartnershipStatus,
+    PotentialLevel,
+)
+from app.tools.rebuild_rollups import compute_rollups, replace_rollups
+from benchmarks.backend import install_app_backend
+from benchmarks.data import BRAND_WORDS, PROVINCE_CENTERS, PROVINCES, TAGS, seed_collection
+from benchmarks.stats import summarize_ms
+
+
+# =====================================
+# Scenarios
+# هر سناریو: (rng, ids) → (method, path, json body)
+# =====================================
+
+Request = Tuple[str, str, Optional[dict]]
+
+
+@dataclass
+class Scenario:
+    name: str
+    endpoint: str
+    build: Callable[[random.Random, List[str]], Request]
+    writes: bool = False
+    needs_geo: bool = False
+
+
+def _pick(rng: random.Random, enum) -> str:
+    return rng.choice(list(enum)).value
+
+
+def _list(query: Callable[[random.Random], str]) -> Callable:
+    return lambda rng, ids: ("GET", f"/partners?{query(rng)}", None)
+
+
+SCENARIOS: List[Scenario] = [
+    # ---- list_partners ----
+    Scenario("list:default", "GET /partners", _list(lambda rng: "limit=20")),
+    Scenario("list:no_total", "GET /partners", _list(lambda rng: "limit=20&with_total=none")),
+    Scenario(
+        "list:deep_page",
+        "GET /partners",
+        _list(lambda rng: f"limit=20&page={rng.randint(50, 100)}"),
+    ),
+    Scenario("list:card", "GET /partners", _list(lambda rng: "limit=50&fields=card")),
+    Scenario(
+        "list:funnel_stage",
+        "GET /partners",
+        _list(lambda rng: f"funnel_stage={_pick(rng, FunnelStage)}"),
+    ),
+    Scenario(
+        "list:province+business_type",
+        "GET /partners",
+        _list(lambda rng: (
+            f"province={rng.choice(list(PROVINCES))}"
+            f"&business_type={_pick(rng, BusinessType)}"
+        )),
+    ),
+    Scenario(
+        "list:multi_value",
+        "GET /partners",
+        _list(lambda rng: (
+            f"funnel_stage={_pick(rng, FunnelStage)},{_pick(rng, FunnelStage)}"
+            f"&financial_level={_pick(rng, CustomerFinancialLevel)}"
+            f"&tag={','.join(rng.sample(TAGS, 2))}"
+        )),
+    ),
+    Scenario(
+        "list:range+created",
+        "GET /partners",
+        _list(lambda rng: (
+            f"range=transaction_count_estimated:{rng.randint(0, 100)}.."
+            f"&created_from=2024-0{rng.randint(1, 6)}-01"
+        )),
+    ),
+    Scenario(
+        "list:q",
+        "GET /partners",
+        _list(lambda rng: f"q={rng.choice(BRAND_WORDS)[:3].lower()}"),
+    ),
+
+    # ---- سایر خواندن‌ها ----
+    Scenario(
+        "get:by_id",
+        "GET /partners/{id}",
+        lambda rng, ids: ("GET", f"/partners/{rng.choice(ids)}", None),
+    ),
+    Scenario(
+        "suggest",
+        "GET /partners/suggest",
+        lambda rng, ids: ("GET", f"/partners/suggest?prefix={rng.choice(BRAND_WORDS)[:2]}", None),
+    ),
+    Scenario(
+        "stats:rollup",
+        "GET /partners/stats",
+        lambda rng, ids: ("GET", f"/partners/stats?province={rng.choice(list(PROVINCES))}", None),
+    ),
+    Scenario(
+        "stats:live",
+        "GET /partners/stats",
+        lambda rng, ids: ("GET", f"/partners/stats?potential_level={_pick(rng, PotentialLevel)}", None),
+    ),
+    Scenario(
+        "nearby",
+        "GET /partners/nearby",
+        lambda rng, ids: (
+            "GET",
+            "/partners/nearby?lat={:.4f}&lng={:.4f}&radius=5000".format(
+                *rng.choice(list(PROVINCE_CENTERS.values()))
+            ),
+            None,
+        ),
+        needs_geo=True,
+    ),
+
+    # ---- write ها (بعد از خواندن‌ها، چون داده را تغییر می‌دهند) ----
+    Scenario(
+        "quick_entry",
+        "POST /partners/quick-entry",
+        lambda rng, ids: (
+            "POST",
+            "/partners/quick-entry",
+            {
+                "brand_name": f"{rng.choice(BRAND_WORDS)} Bench {rng.randint(0, 10**9)}",
+                "business_type": _pick(rng, BusinessType),
+                "contact_numbers": [
+                    {"label": "mobile", "number": f"0935{rng.randint(0, 9_999_999):07d}"}
+                ],
+                "province": rng.choice(list(PROVINCES)),
+            },
+        ),
+        writes=True,
+    ),
+    Scenario(
+        "patch:analysis",
+        "PATCH /partners/{id}/analysis",
+        lambda rng, ids: (
+            "PATCH",
+            f"/partners/{rng.choice(ids)}/analysis",
+            {"funnel_stage": _pick(rng, FunnelStage)},
+        ),
+        writes=True,
+    ),
+    Scenario(
+        "patch:relationship",
+        "PATCH /partners/{id}/relationship",
+        lambda rng, ids: (
+            "PATCH",
+            f"/partners/{rng.choice(ids)}/relationship",
+            {"partnership_status": _pick(rng, PartnershipStatus)},
+        ),
+        writes=True,
+    ),
+    Scenario(
+        "patch:acquisition",
+        "PATCH /partners/{id}/acquisition",
+        lambda rng, ids: (
+            "PATCH",
+            f"/partners/{rng.choice(ids)}/acquisition",
+            {"source": _pick(rng, AcquisitionSource)},
+        ),
+        writes=True,
+    ),
+]
+
+
+# -------------------------------------------------
+# Driver
+# -------------------------------------------------
+def _failed(response: httpx.Response) -> bool:
+    # api_error با HTTP 200 و status=error در meta برمی‌گردد
+    if response.status_code >= 400:
+        return True
+    if response.headers.get("content-type", "").startswith("application/json"):
+        meta = response.json().get("meta") or {}
+        return meta.get("status") == "error"
+    return False
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    ids: List[str],
+    requests: int,
+    concurrency: int,
+    warmup: int,
+    seed: int,
+) -> dict:
+    rng = random.Random(f"{seed}:{scenario.name}")
+    planned = [scenario.build(rng, ids) for _ in range(warmup + requests)]
+
+    async def send(method: str, path: str, body: Optional[dict]) -> bool:
+        try:
+            response = await client.request(method, path, json=body)
+        except Exception:
+            return True
+        return _failed(response)
+
+    for request in planned[:warmup]:
+        await send(*request)
+
+    queue = iter(planned[warmup:])
+    latencies: List[float] = []
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        for request in queue:
+            started = time.perf_counter()
+            failed = await send(*request)
+            latencies.append(time.perf_counter() - started)
+            errors += failed
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "endpoint": scenario.endpoint,
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        **summarize_ms(latencies),
+    }
+
+
+def _git_commit() -> dict:
+    def git(*args) -> str:
+        return subprocess.run(
+            ["git", *args], capture_output=True, text=True, check=True
+        ).stdout.strip()
+
+    try:
+        return {"commit": git("rev-parse", "HEAD"), "dirty": bool(git("status", "--porcelain"))}
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": None, "dirty": None}
+
+
+async def run(args) -> dict:
+    collection = install_app_backend(args.mongomock)
+
+    seed_started = time.perf_counter()
+    ids = seed_collection(collection, args.docs, args.seed)
+    replace_rollups(collection, compute_rollups(collection))
+    seed_seconds = time.perf_counter() - seed_started
+
+    scenarios = [
+        s for s in SCENARIOS
+        if (not args.only or any(s.name.startswith(prefix) for prefix in args.only))
+        and (args.writes or not s.writes)
+    ]
+
+    results = {}
+    skipped = {}
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for scenario in scenarios:
+                if scenario.needs_geo and args.mongomock:
+                    skipped[scenario.name] = "$geoNear is not implemented in mongomock"
+                    continue
+
+                results[scenario.name] = await run_scenario(
+                    client, scenario, ids, args.requests, args.concurrency, args.warmup, args.seed
+                )
+                print(f"{scenario.name}: {results[scenario.name]}", file=sys.stderr)
+
+    return {
+        "meta": {
+            **_git_commit(),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "backend": "mongomock" if args.mongomock else "mongod",
+            "seed_seconds": round(seed_seconds, 2),
+            "params": {
+                key: value for key, value in vars(args).items()
+                if key not in ("command", "func", "output")
+            },
+        },
+        "scenarios": results,
+        "skipped": skipped,
+    }
+
+
+# -------------------------------------------------
+# Compare
+# -------------------------------------------------
+COMPARED_LATENCIES = ("p50_ms", "p95_ms", "p99_ms")
+# فقط p95 / p99 و rps معیار regression هستند؛ p50 گزارش می‌شود
+REGRESSION_LATENCIES = ("p95_ms", "p99_ms")
+
+
+def _change(base: float, head: float) -> Optional[float]:
+    if not base:
+        return None
+    return round((head - base) / base * 100, 1)
+
+
+def compare_reports(base: dict, head: dict, threshold: float) -> dict:
+    """
+    تغییر درصدی هر سناریوی مشترک؛ latency مثبت = کندتر، rps منفی = کمتر
+    """
+    scenarios = {}
+    regressions = []
+
+    for name in sorted(set(base["scenarios"]) & set(head["scenarios"])):
+        old = base["scenarios"][name]
+        new = head["scenarios"][name]
+
+        row = {
+            key: {"base": old.get(key), "head": new.get(key), "change_pct": _change(old.get(key), new.get(key))}
+            for key in (*COMPARED_LATENCIES, "rps")
+        }
+        row["errors"] = {"base": old.get("errors", 0), "head": new.get("errors", 0)}
+        scenarios[name] = row
+
+        slower = [
+            key for key in REGRESSION_LATENCIES
+            if (row[key]["change_pct"] or 0) > threshold
+        ]
+        if (row["rps"]["change_pct"] or 0) < -threshold:
+            slower.append("rps")
+        if row["errors"]["head"] > row["errors"]["base"]:
+            slower.append("errors")
+        if slower:
+            regressions.append({"scenario": name, "metrics": slower})
+
+    return {
+        "base": base["meta"].get("commit"),
+        "head": head["meta"].get("commit"),
+        "threshold_pct": threshold,
+        "scenarios": scenarios,
+        "only_in_base": sorted(set(base["scenarios"]) - set(head["scenarios"])),
+        "only_in_head": sorted(set(head["scenarios"]) - set(base["scenarios"])),
+        "regressions": regressions,
+    }
+
+
+def _load(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run")
+    run_parser.add_argument("--mongomock", action="store_true")
+    run_parser.add_argument("--docs", type=int, default=20_000)
+    run_parser.add_argument("--seed", type=int, default=42)
+    run_parser.add_argument("--requests", type=int, default=1000, help="per scenario")
+    run_parser.add_argument("--concurrency", type=int, default=50)
+    run_parser.add_argument("--warmup", type=int, default=20)
+    run_parser.add_argument("--only", action="append", help="scenario name prefix (repeatable)")
+    run_parser.add_argument("--no-writes", dest="writes", action="store_false")
+    run_parser.add_argument("--output", help="write the JSON report to this file")
+
+    compare_parser = commands.add_parser("compare")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("head")
+    compare_parser.add_argument("--threshold", type=float, default=10.0, help="percent")
+
+    args = parser.parse_args()
+
+    if args.command == "compare":
+        result = compare_reports(_load(args.base), _load(args.head), args.threshold)
+        print(json.dumps(result, indent=2))
+        sys.exit(1 if result["regressions"] else 0)
+
+    report = asyncio.run(run(args))
+    output = json.dumps(report, indent=2)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
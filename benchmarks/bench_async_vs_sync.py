@@ -0,0 +1,119 @@
+"""
+Benchmark: throughput درخواست‌های همزمان
+- مسیر sync: route معمولی (def) + PartnerRepository روی threadpool
+- مسیر async: route async + AsyncPartnerRepository روی Motor
+
+اجرا:
+    python -m benchmarks.bench_async_vs_sync
+    python -m benchmarks.bench_async_vs_sync --mongomock --latency-ms 5
+
+با mongomock هیچ I/O واقعی وجود ندارد؛ --latency-ms یک round trip شبکه
+را شبیه‌سازی می‌کند (sync با time.sleep، async با asyncio.sleep).
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from app.repositories.partner_repository import (
+    PartnerRepository,
+    AsyncPartnerRepository,
+)
+from app.repositories.partner_cache import PartnerCache
+from app.utils.response import api_success
+from benchmarks.backend import (
+    open_collections,
+    SlowCollection,
+    SlowAsyncCollection,
+)
+from benchmarks.data import seed_collection
+
+
+# -------------------------------------------------
+# Bench app
+# -------------------------------------------------
+def build_app(sync_collection, async_collection) -> FastAPI:
+    app = FastAPI()
+    sync_repo = PartnerRepository(sync_collection)
+    # بدون کش get_by_id تا فقط مسیر دیتابیس مقایسه شود
+    async_repo = AsyncPartnerRepository(async_collection, cache=PartnerCache())
+
+    @app.get("/sync/partners/{partner_id}")
+    def sync_get(partner_id: str):
+        return api_success(sync_repo.get_by_id(partner_id))
+
+    @app.get("/sync/partners")
+    def sync_list():
+        return api_success(sync_repo.list({"meta.is_deleted": False}, 1, 20).items)
+
+    @app.get("/async/partners/{partner_id}")
+    async def async_get(partner_id: str):
+        return api_success(await async_repo.get_by_id(partner_id))
+
+    @app.get("/async/partners")
+    async def async_list():
+        result = await async_repo.list({"meta.is_deleted": False}, 1, 20)
+        return api_success(result.items)
+
+    return app
+
+
+async def drive(app: FastAPI, paths: list, concurrency: int) -> float:
+    """
+    اجرای همه path ها با حداکثر concurrency درخواست همزمان؛ خروجی: req/s
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one(path):
+            async with semaphore:
+                response = await client.get(path)
+                response.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(path) for path in paths))
+        elapsed = time.perf_counter() - started
+
+    return len(paths) / elapsed
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--mongomock", action="store_true")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--docs", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    args = parser.parse_args()
+
+    sync_collection, async_collection = open_collections(args.mongomock)
+    ids = seed_collection(sync_collection, args.docs)
+
+    if args.latency_ms:
+        latency = args.latency_ms / 1000
+        sync_collection = SlowCollection(sync_collection, latency)
+        async_collection = SlowAsyncCollection(async_collection, latency)
+
+    app = build_app(sync_collection, async_collection)
+    rng = random.Random(0)
+
+    results = {}
+    for mode in ("sync", "async"):
+        get_paths = [f"/{mode}/partners/{rng.choice(ids)}" for _ in range(args.requests)]
+        list_paths = [f"/{mode}/partners"] * (args.requests // 10)
+
+        results[mode] = {
+            "get_rps": round(await drive(app, get_paths, args.concurrency), 1),
+            "list_rps": round(await drive(app, list_paths, args.concurrency), 1),
+        }
+
+    print(json.dumps({"params": vars(args), "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,112 @@
+"""
+Benchmark: GET /partners/nearby ($geoNear روی ایندکس 2dsphere)
+در برابر اسکن ساده haversine
+
+- naive_scan:      خواندن همه مختصات از Mongo + haversine در پایتون (هر درخواست)
+- naive_in_memory: فقط هزینه CPU همان haversine روی داده از قبل خوانده‌شده
+- geo_near:        PartnerRepository.nearby (نیاز به mongod؛ mongomock پشتیبانی نمی‌کند)
+
+اجرا:
+    python -m benchmarks.bench_geo_nearby --docs 50000 --radius 5000
+    python -m benchmarks.bench_geo_nearby --mongomock --docs 5000
+"""
+import argparse
+import json
+import random
+import time
+
+from app.database.indexes import partner_index_models
+from app.repositories.partner_repository import PartnerRepository
+from app.utils.geo import haversine_m
+from benchmarks.backend import open_collections
+from benchmarks.data import PROVINCE_CENTERS, seed_collection
+from benchmarks.stats import summarize_ms
+
+
+def load_points(collection) -> list:
+    cursor = collection.find(
+        {"meta.is_deleted": False, "identity.location": {"$ne": None}},
+        {"identity.location": 1},
+    )
+    return [
+        (doc["_id"], doc["identity"]["location"]["latitude"], doc["identity"]["location"]["longitude"])
+        for doc in cursor
+    ]
+
+
+def haversine_nearest(points: list, lat: float, lng: float, radius_m: float, limit: int) -> list:
+    hits = []
+    for oid, p_lat, p_lng in points:
+        distance = haversine_m(lat, lng, p_lat, p_lng)
+        if distance <= radius_m:
+            hits.append((distance, oid))
+
+    hits.sort()
+    return [str(oid) for _, oid in hits[:limit]]
+
+
+def measure(fn, targets: list) -> dict:
+    latencies = []
+    for lat, lng in targets:
+        started = time.perf_counter()
+        fn(lat, lng)
+        latencies.append(time.perf_counter() - started)
+    return summarize_ms(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--mongomock", action="store_true")
+    parser.add_argument("--docs", type=int, default=50_000)
+    parser.add_argument("--calls", type=int, default=100)
+    parser.add_argument("--radius", type=float, default=5000)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    sync_collection, _ = open_collections(args.mongomock)
+    seed_collection(sync_collection, args.docs)
+
+    rng = random.Random(7)
+    targets = []
+    for _ in range(args.calls):
+        lat, lng = rng.choice(list(PROVINCE_CENTERS.values()))
+        targets.append((lat + rng.uniform(-0.1, 0.1), lng + rng.uniform(-0.1, 0.1)))
+
+    points = load_points(sync_collection)
+
+    results = {
+        "naive_scan": measure(
+            lambda lat, lng: haversine_nearest(
+                load_points(sync_collection), lat, lng, args.radius, args.limit
+            ),
+            targets,
+        ),
+        "naive_in_memory": measure(
+            lambda lat, lng: haversine_nearest(points, lat, lng, args.radius, args.limit),
+            targets,
+        ),
+    }
+
+    if args.mongomock:
+        results["geo_near"] = {"skipped": "$geoNear is not implemented in mongomock"}
+    else:
+        sync_collection.create_indexes(partner_index_models())
+        repo = PartnerRepository(sync_collection)
+        nearby = lambda lat, lng: repo.nearby(
+            {"meta.is_deleted": False}, lat, lng, args.radius, args.limit, {"_id": 1}
+        )
+
+        results["geo_near"] = measure(nearby, targets)
+
+        # همان نتایج (به ترتیب فاصله) با اسکن ساده
+        lat, lng = targets[0]
+        results["same_results"] = (
+            [row["id"] for row in nearby(lat, lng)]
+            == haversine_nearest(points, lat, lng, args.radius, args.limit)
+        )
+
+    print(json.dumps({"params": vars(args), "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
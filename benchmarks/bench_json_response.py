@@ -0,0 +1,63 @@
+"""
+Benchmark: responses/sec برای یک صفحه 100 تایی از Partner
+- stdlib: jsonable_encoder + JSONResponse (رفتار قبلی FastAPI برای dict)
+- orjson: api_success_response (ORJSONResponse، یک مرحله)
+
+برای هر کدام هم سطرهای Partner و هم سطرهای dict (PARTNER_TRUSTED_READS) اندازه‌گیری می‌شود
+
+اجرا:
+    python -m benchmarks.bench_json_response --items 100 --repeat 500
+"""
+import argparse
+import json
+import time
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.models.partner import Partner
+from app.utils.response import api_success, api_success_response, build_pagination
+from benchmarks.data import make_partner_docs
+
+
+def responses_per_sec(render, rows, repeat: int) -> float:
+    pagination = build_pagination(1, len(rows), 10_000)
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        render(rows, pagination)
+    elapsed = time.perf_counter() - started
+
+    return repeat / elapsed
+
+
+def render_stdlib(rows, pagination):
+    return JSONResponse(jsonable_encoder(api_success(rows, pagination=pagination))).body
+
+
+def render_orjson(rows, pagination):
+    return api_success_response(rows, pagination=pagination).body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=500)
+    args = parser.parse_args()
+
+    docs = make_partner_docs(args.items)
+    models = [Partner(id=str(i), **doc) for i, doc in enumerate(docs)]
+    dicts = [{"id": str(i), **doc} for i, doc in enumerate(docs)]
+
+    results = {}
+    for label, rows in (("models", models), ("dicts", dicts)):
+        results[label] = {
+            "stdlib_rps": round(responses_per_sec(render_stdlib, rows, args.repeat), 1),
+            "orjson_rps": round(responses_per_sec(render_orjson, rows, args.repeat), 1),
+        }
+
+    print(json.dumps({"params": vars(args), "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
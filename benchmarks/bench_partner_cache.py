@@ -0,0 +1,77 @@
+"""
+Benchmark: latency (p50 / p99) برای AsyncPartnerRepository.get_by_id
+با و بدون کش read-through
+
+- none:   بدون کش (هر درخواست یک find_one + ساخت Partner)
+- memory: MemoryPartnerCache (LRU + TTL)
+- redis:  RedisPartnerCache روی fakeredis (اگر نصب باشد) با --fake-redis
+
+شناسه‌ها از یک مجموعه داغ کوچک انتخاب می‌شوند (چند کاربر یک پروفایل را باز می‌کنند)
+
+اجرا:
+    python -m benchmarks.bench_partner_cache --mongomock --latency-ms 2
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from app.repositories.partner_cache import (
+    PartnerCache,
+    MemoryPartnerCache,
+    RedisPartnerCache,
+)
+from app.repositories.partner_repository import AsyncPartnerRepository
+from benchmarks.backend import open_collections, SlowAsyncCollection
+from benchmarks.data import seed_collection
+from benchmarks.stats import summarize_ms
+
+
+async def measure(repo: AsyncPartnerRepository, ids: list, calls: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    latencies = []
+
+    for _ in range(calls):
+        partner_id = rng.choice(ids)
+
+        started = time.perf_counter()
+        await repo.get_by_id(partner_id)
+        latencies.append(time.perf_counter() - started)
+
+    return summarize_ms(latencies)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--mongomock", action="store_true")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--docs", type=int, default=2000)
+    parser.add_argument("--hot", type=int, default=200)
+    parser.add_argument("--calls", type=int, default=5000)
+    parser.add_argument("--fake-redis", action="store_true")
+    args = parser.parse_args()
+
+    sync_collection, async_collection = open_collections(args.mongomock)
+    ids = seed_collection(sync_collection, args.docs)[: args.hot]
+
+    if args.latency_ms:
+        async_collection = SlowAsyncCollection(async_collection, args.latency_ms / 1000)
+
+    caches = {"none": PartnerCache(), "memory": MemoryPartnerCache()}
+    if args.fake_redis:
+        import fakeredis
+
+        caches["redis"] = RedisPartnerCache(fakeredis.FakeAsyncRedis())
+
+    results = {}
+    for name, cache in caches.items():
+        repo = AsyncPartnerRepository(async_collection, cache=cache)
+        results[name] = await measure(repo, ids, args.calls, seed=1)
+        results[name]["cache"] = cache.stats()
+
+    print(json.dumps({"params": vars(args), "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,56 @@
+"""
+Micro-benchmark: rows/sec مسیر خواندن برای یک صفحه 1000 تایی
+- validated: Partner(**doc) روی هر سطر (پیش‌فرض)
+- trusted:   PARTNER_TRUSTED_READS؛ داکیومنت بدون اعتبارسنجی دوباره
+
+هر مسیر دو بار اندازه‌گیری می‌شود: فقط ساخت سطرها، و ساخت + jsonable_encoder
+
+اجرا:
+    python -m benchmarks.bench_read_path --rows 1000 --repeat 20
+"""
+import argparse
+import json
+import time
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+
+import app.repositories.partner_repository as partner_repository
+from benchmarks.data import make_partner_docs
+
+
+def rows_per_sec(docs, trusted: bool, encode: bool, repeat: int) -> float:
+    partner_repository.TRUSTED_READS = trusted
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        rows = [partner_repository._doc_to_partner(dict(doc)) for doc in docs]
+        if encode:
+            jsonable_encoder(rows)
+    elapsed = time.perf_counter() - started
+
+    return len(docs) * repeat / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    docs = make_partner_docs(args.rows)
+    for doc in docs:
+        doc["_id"] = ObjectId()
+
+    results = {}
+    for mode, trusted in (("validated", False), ("trusted", True)):
+        results[mode] = {
+            "build_rows_per_sec": round(rows_per_sec(docs, trusted, False, args.repeat)),
+            "build_and_encode_rows_per_sec": round(rows_per_sec(docs, trusted, True, args.repeat)),
+        }
+
+    print(json.dumps({"params": vars(args), "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
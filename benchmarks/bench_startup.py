@@ -0,0 +1,212 @@
+"""
+Startup benchmark: زمان boot یک worker و latency اولین درخواست
+
+هر پیکربندی در پردازه تازه اجرا می‌شود (مثل یک worker تازه spawn شده؛
+cache های import، pydantic و openapi مشترک نیستند):
+- per_worker_indexes: رفتار قبلی؛ هر worker در lifespan ایندکس‌ها را ensure می‌کند
+- indexes_once:       ایندکس‌ها یک بار پیش از fork (app.serve)؛ بدون warmup
+- indexes_once_warm:  همان + warmup هر worker (pool، مدل‌ها، openapi)
+
+برای هر اجرا: زمان import app.main، زمان lifespan startup (به تفکیک مرحله)،
+اولین درخواست هر endpoint و p50 درخواست‌های بعدی همان endpoint.
+دیتابیس از قبل ایندکس دارد (restart / scale-out معمول، نه اولین deploy).
+
+اجرا:
+    python -m benchmarks.bench_startup run --docs 20000 --output startup.json
+    python -m benchmarks.bench_startup run --mongomock --docs 2000 --repeat 5
+    python -m benchmarks.bench_startup run --only indexes_once_warm
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Dict, List
+
+
+CONFIGS: Dict[str, Dict[str, str]] = {
+    "per_worker_indexes": {"MONGO_ENSURE_INDEXES_ON_STARTUP": "true", "APP_WARMUP": "false"},
+    "indexes_once": {"MONGO_ENSURE_INDEXES_ON_STARTUP": "false", "APP_WARMUP": "false"},
+    "indexes_once_warm": {"MONGO_ENSURE_INDEXES_ON_STARTUP": "false", "APP_WARMUP": "true"},
+}
+
+# endpoint → path (اولین درخواست و بعدی‌ها)
+ENDPOINTS = {
+    "GET /partners": lambda ids, i: "/partners?limit=20",
+    "GET /partners/{id}": lambda ids, i: f"/partners/{ids[i % len(ids)]}",
+    "GET /openapi.json": lambda ids, i: "/openapi.json",
+}
+
+
+# -------------------------------------------------
+# Child (یک worker)
+# -------------------------------------------------
+async def _measure_worker(args) -> dict:
+    started = time.perf_counter()
+    from app.main import app
+    import_ms = (time.perf_counter() - started) * 1000
+
+    import httpx
+
+    from app.tools.manage_indexes import sync_indexes
+    from app.utils.warmup import STARTUP_PHASE_SECONDS
+    from benchmarks.backend import install_app_backend
+    from benchmarks.data import seed_collection
+
+    collection = install_app_backend(args.mongomock)
+    if args.mongomock:
+        # داده mongomock درون همین پردازه است
+        seed_collection(collection, args.docs, args.seed)
+        sync_indexes()
+    ids = [str(doc["_id"]) for doc in collection.find({}, {"_id": 1}).limit(args.requests + 1)]
+
+    result = {"import_ms": round(import_ms, 2), "endpoints": {}}
+
+    started = time.perf_counter()
+    async with app.router.lifespan_context(app):
+        result["lifespan_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        result["phases_ms"] = {
+            phase: round(STARTUP_PHASE_SECONDS.value(phase=phase) * 1000, 2)
+            for phase in ("ensure_indexes", "suggest_index", "warm_mongo", "warm_models", "warm_openapi")
+            if STARTUP_PHASE_SECONDS.value(phase=phase)
+        }
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for name, path in ENDPOINTS.items():
+                latencies = []
+                for i in range(args.requests + 1):
+                    request_started = time.perf_counter()
+                    response = await client.get(path(ids, i))
+                    latencies.append(time.perf_counter() - request_started)
+                    response.raise_for_status()
+
+                result["endpoints"][name] = {
+                    "first_ms": round(latencies[0] * 1000, 2),
+                    "steady_p50_ms": round(statistics.median(latencies[1:]) * 1000, 2),
+                }
+
+    return result
+
+
+# -------------------------------------------------
+# Parent
+# -------------------------------------------------
+def _spawn_worker(config: str, args) -> dict:
+    env = {**os.environ, **CONFIGS[config]}
+    command = [
+        sys.executable, "-m", "benchmarks.bench_startup", "worker",
+        "--docs", str(args.docs),
+        "--seed", str(args.seed),
+        "--requests", str(args.requests),
+    ]
+    if args.mongomock:
+        command.append("--mongomock")
+
+    completed = subprocess.run(command, env=env, capture_output=True, text=True, check=True)
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def _median_report(runs: List[dict]) -> dict:
+    """
+    میانه هر عدد بین تکرارها (ساختار اولین اجرا)
+    """
+    def merge(values: List):
+        if isinstance(values[0], dict):
+            return {key: merge([v[key] for v in values if key in v]) for key in values[0]}
+        return round(statistics.median(values), 2)
+
+    return merge(runs)
+
+
+def _prepare_mongod(args) -> dict:
+    """
+    mongod: یک بار seed و ساخت ایندکس‌ها (همان مرحله app.serve)، با زمان آن
+    """
+    from app.tools.manage_indexes import sync_indexes
+    from benchmarks.backend import install_app_backend
+    from benchmarks.data import seed_collection
+
+    collection = install_app_backend(False)
+    collection.delete_many({})
+    seed_collection(collection, args.docs, args.seed)
+
+    started = time.perf_counter()
+    sync_indexes()
+    first_ms = (time.perf_counter() - started) * 1000
+
+    # اجرای بعدی (deploy دوباره روی ایندکس‌های موجود)
+    started = time.perf_counter()
+    sync_indexes()
+    again_ms = (time.perf_counter() - started) * 1000
+
+    return {"initial_build_ms": round(first_ms, 2), "existing_ms": round(again_ms, 2)}
+
+
+def run(args) -> dict:
+    from benchmarks.bench_api import _git_commit
+
+    configs = [name for name in CONFIGS if not args.only or name in args.only]
+    manage_indexes = None if args.mongomock else _prepare_mongod(args)
+
+    results = {}
+    for config in configs:
+        runs = [_spawn_worker(config, args) for _ in range(args.repeat)]
+        results[config] = _median_report(runs)
+        print(f"{config}: {results[config]}", file=sys.stderr)
+
+    return {
+        "meta": {
+            **_git_commit(),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "backend": "mongomock" if args.mongomock else "mongod",
+            "params": {
+                key: value for key, value in vars(args).items()
+                if key not in ("command", "output")
+            },
+        },
+        "manage_indexes": manage_indexes,
+        "configs": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    for name in ("run", "worker"):
+        command = commands.add_parser(name)
+        command.add_argument("--mongomock", action="store_true")
+        command.add_argument("--docs", type=int, default=20_000)
+        command.add_argument("--seed", type=int, default=42)
+        command.add_argument("--requests", type=int, default=50, help="per endpoint, after the first")
+
+    run_parser = commands.choices["run"]
+    run_parser.add_argument("--repeat", type=int, default=3, help="fresh processes per config")
+    run_parser.add_argument("--only", action="append", choices=list(CONFIGS))
+    run_parser.add_argument("--output", help="write the JSON report to this file")
+
+    args = parser.parse_args()
+
+    if args.command == "worker":
+        # فقط خروجی JSON روی stdout (برای پردازه والد)
+        print(json.dumps(asyncio.run(_measure_worker(args))))
+        return
+
+    report = run(args)
+    output = json.dumps(report, indent=2)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
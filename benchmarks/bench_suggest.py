@@ -0,0 +1,67 @@
+"""
+Benchmark: ایندکس suggest (GET /partners/suggest) روی N نام برند مصنوعی
+- زمان ساخت ایندکس (lifespan)
+- latency هر lookup برای prefix های ۱ تا ۴ حرفی
+- latency به‌روزرسانی تکی (upsert / remove) روی write ها
+
+اجرا:
+    python -m benchmarks.bench_suggest --partners 200000
+"""
+import argparse
+import json
+import random
+import time
+
+from app.repositories.suggest_index import SuggestIndex
+from benchmarks.data import BRAND_WORDS
+from benchmarks.stats import summarize_ms
+
+
+def make_rows(count: int, rng: random.Random):
+    return [
+        (f"{i:024x}", f"{rng.choice(BRAND_WORDS)} {rng.choice(BRAND_WORDS)} {i}")
+        for i in range(count)
+    ]
+
+
+def timed(fn, calls: int) -> dict:
+    latencies = []
+    for i in range(calls):
+        started = time.perf_counter()
+        fn(i)
+        latencies.append(time.perf_counter() - started)
+    return summarize_ms(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--partners", type=int, default=200_000)
+    parser.add_argument("--calls", type=int, default=5000)
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    rows = make_rows(args.partners, rng)
+
+    index = SuggestIndex()
+    index.build(rows)
+
+    prefixes = [
+        word[:length].lower()
+        for word in BRAND_WORDS
+        for length in range(1, 5)
+    ]
+
+    results = {
+        "build_ms": index.build_ms,
+        "index": index.stats(),
+        "suggest": timed(lambda i: index.suggest(prefixes[i % len(prefixes)], args.limit), args.calls),
+        "upsert": timed(lambda i: index.upsert(f"new{i}", f"{rng.choice(BRAND_WORDS)} new {i}"), args.calls),
+        "remove": timed(lambda i: index.remove(f"new{i}"), args.calls),
+    }
+
+    print(json.dumps({"params": vars(args), "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
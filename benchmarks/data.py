@@ -0,0 +1,120 @@
+import random
+from datetime import datetime, timedelta
+from typing import List
+
+from app.models.partner import (
+    Partner,
+    Identity,
+    ContactNumber,
+    GeoLocation,
+    Relationship,
+    FinancialEstimation,
+    Analysis,
+    Acquisition,
+    Meta,
+    BusinessType,
+    FunnelStage,
+    PotentialLevel,
+    PurchaseReadiness,
+    CustomerFinancialLevel,
+    AcquisitionSource,
+    PartnershipStatus,
+    PaymentType,
+)
+from app.repositories.partner_repository import partner_insert_doc
+
+
+# =====================================
+# Synthetic dataset (from Partner enums)
+# =====================================
+
+PROVINCES = {
+    "Tehran": ["Tehran", "Shahriar", "Eslamshahr"],
+    "Isfahan": ["Isfahan", "Kashan"],
+    "Fars": ["Shiraz", "Marvdasht"],
+    "Khorasan Razavi": ["Mashhad", "Neyshabur"],
+    "Qom": ["Qom"],
+}
+
+# مرکز تقریبی هر استان؛ مختصات مصنوعی با پراکندگی ±0.2 درجه
+PROVINCE_CENTERS = {
+    "Tehran": (35.69, 51.39),
+    "Isfahan": (32.65, 51.67),
+    "Fars": (29.59, 52.58),
+    "Khorasan Razavi": (36.30, 59.60),
+    "Qom": (34.64, 50.88),
+}
+
+BRAND_WORDS = [
+    "Arad", "Mobl", "Sina", "Home", "Chob", "Royal", "Negin",
+    "Parsa", "Decor", "Kaveh", "Persia", "Luxe", "Sofa", "Tak",
+]
+
+TAGS = ["vip", "online", "wholesale", "exhibition", "new", "instagram"]
+
+
+def make_partner(rng: random.Random, i: int) -> Partner:
+    """
+    یک Partner مصنوعی با مقادیر تصادفی از enum های مدل
+    """
+    province = rng.choice(list(PROVINCES))
+    center_lat, center_lng = PROVINCE_CENTERS[province]
+    created_at = datetime(2024, 1, 1) + timedelta(minutes=rng.randint(0, 900_000))
+
+    return Partner(
+        identity=Identity(
+            brand_name=f"{rng.choice(BRAND_WORDS)} {rng.choice(BRAND_WORDS)} {i}",
+            manager_full_name=f"Manager {i}",
+            business_type=rng.choice(list(BusinessType)),
+            contact_numbers=[
+                ContactNumber(label="mobile", number=f"0912{rng.randint(0, 9_999_999):07d}")
+            ],
+            province=province,
+            city=rng.choice(PROVINCES[province]),
+            location=GeoLocation(
+                latitude=round(center_lat + rng.uniform(-0.2, 0.2), 6),
+                longitude=round(center_lng + rng.uniform(-0.2, 0.2), 6),
+            ),
+        ),
+        relationship=Relationship(
+            partnership_status=rng.choice(list(PartnershipStatus)),
+            payment_types=rng.sample(list(PaymentType), k=rng.randint(0, 2)),
+            notes="synthetic partner " * rng.randint(0, 5),
+        ),
+        financial_estimation=FinancialEstimation(
+            total_transaction_amount_estimated=float(rng.randint(0, 5_000_000_000)),
+            transaction_count_estimated=rng.randint(0, 200),
+        ),
+        analysis=Analysis(
+            funnel_stage=rng.choice(list(FunnelStage)),
+            potential_level=rng.choice(list(PotentialLevel)),
+            financial_level=rng.choice(list(CustomerFinancialLevel)),
+            purchase_readiness=rng.choice(list(PurchaseReadiness)),
+            tags=rng.sample(TAGS, k=rng.randint(0, 3)),
+        ),
+        acquisition=Acquisition(source=rng.choice(list(AcquisitionSource))),
+        meta=Meta(created_at=created_at, updated_at=created_at, created_by="benchmark"),
+    )
+
+
+def make_partner_docs(count: int, seed: int = 42) -> List[dict]:
+    """
+    داکیومنت‌های آماده insert (مثل PartnerRepository.create، همراه derived fields)
+    از زمان اضافه شدن derived fields (search / dedup / geo) داکیومنت‌ها بزرگ‌ترند؛
+    نتایج benchmark های قبل از آن با نتایج فعلی قابل مقایسه نیستند
+    """
+    rng = random.Random(seed)
+    return [
+        partner_insert_doc(make_partner(rng, i))
+        for i in range(count)
+    ]
+
+
+def seed_collection(collection, count: int, seed: int = 42) -> List[str]:
+    """
+    پاک کردن و پر کردن کالکشن (sync) با داده مصنوعی
+    """
+    collection.delete_many({})
+    docs = make_partner_docs(count, seed)
+    result = collection.insert_many(docs)
+    return [str(oid) for oid in result.inserted_ids]
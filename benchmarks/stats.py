@@ -0,0 +1,31 @@
+import math
+from typing import Iterable, List
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """
+    nearest-rank percentile روی لیست مرتب‌شده
+    """
+    if not sorted_values:
+        return 0.0
+
+    rank = max(math.ceil(q / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def summarize_ms(latencies: Iterable[float]) -> dict:
+    """
+    latency ها بر حسب ثانیه → خلاصه بر حسب میلی‌ثانیه
+    """
+    values = sorted(latencies)
+    if not values:
+        return {"count": 0}
+
+    return {
+        "count": len(values),
+        "mean_ms": round(sum(values) / len(values) * 1000, 3),
+        "p50_ms": round(percentile(values, 50) * 1000, 3),
+        "p95_ms": round(percentile(values, 95) * 1000, 3),
+        "p99_ms": round(percentile(values, 99) * 1000, 3),
+        "max_ms": round(values[-1] * 1000, 3),
+    }
@@ -0,0 +1,52 @@
+import os
+
+import pytest
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+
+from app.database.indexes import partner_index_models
+from app.database.mongo import MONGO_URI, MONGO_DB_NAME
+from app.tools.explain_list_queries import explain_all
+from benchmarks.data import seed_collection
+
+
+# =====================================
+# هیچ شکل کوئری list_partners نباید COLLSCAN یا SORT در حافظه داشته باشد
+# نیاز به mongod واقعی (mongomock explain ندارد)؛ در غیر این صورت skip
+# دیتابیس جدا: {MONGO_DB_NAME}_test_plans، در پایان حذف می‌شود
+# =====================================
+
+PLAN_TEST_DOCS = int(os.getenv("PLAN_TEST_DOCS", "500"))
+
+
+@pytest.fixture(scope="module")
+def collection():
+    client = MongoClient(MONGO_URI, serverSelectionTimeoutMS=2000)
+    try:
+        client.admin.command("ping")
+    except PyMongoError as e:
+        client.close()
+        pytest.skip(f"mongod not available at {MONGO_URI}: {e}")
+
+    db_name = f"{MONGO_DB_NAME}_test_plans"
+    client.drop_database(db_name)
+    collection = client[db_name].partners
+    collection.create_indexes(partner_index_models())
+    seed_collection(collection, PLAN_TEST_DOCS)
+
+    yield collection
+
+    client.drop_database(db_name)
+    client.close()
+
+
+def test_list_queries_use_indexes(collection):
+    results = explain_all(collection)
+    assert results
+
+    bad = [
+        f"{r['mode']} {'+'.join(r['filters']) or '(none)'}: {','.join(r['problems'])} ({' > '.join(r['stages'])})"
+        for r in results
+        if r["problems"]
+    ]
+    assert not bad, "list query plans with COLLSCAN / in-memory SORT:\n" + "\n".join(bad)
@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta, timezone
+
+import mongomock
+import pytest
+
+from app.models.partner import FunnelStage
+from app.utils.mongo_match import matches
+
+
+# =====================================
+# matches() باید همان نتیجه find واقعی Mongo را بدهد؛
+# هر حالت هم با matches و هم با mongomock (مرجع) سنجیده می‌شود
+# =====================================
+
+NOW = datetime(2024, 1, 15, 12, 0)
+
+DOCS = [
+    {"_id": 1, "analysis": {"funnel_stage": "lead", "tags": ["vip", "online"]}, "meta": {"created_at": NOW}},
+    {"_id": 2, "analysis": {"funnel_stage": "customer", "tags": ["online"]}, "meta": {"created_at": NOW - timedelta(days=10)}},
+    {"_id": 3, "analysis": {"funnel_stage": None, "tags": []}, "meta": {"created_at": NOW + timedelta(days=10)}},
+    {"_id": 4, "analysis": {}, "identity": {"contact_numbers": [{"number": "0912"}, {"number": "0935"}]}},
+    {"_id": 5, "financial_estimation": {"transaction_count_estimated": 7}, "identity": {"brand_name": "Mobl Arad"}},
+]
+
+
+@pytest.fixture(scope="module")
+def collection():
+    collection = mongomock.MongoClient().db.docs
+    collection.insert_many([dict(doc) for doc in DOCS])
+    return collection
+
+
+def matched_ids(query: dict) -> set:
+    return {doc["_id"] for doc in DOCS if matches(query, doc)}
+
+
+@pytest.mark.parametrize("query", [
+    # equality / enum
+    {"analysis.funnel_stage": "lead"},
+    {"analysis.funnel_stage": FunnelStage.lead.value},
+    # None: مقدار null یا فیلد غایب
+    {"analysis.funnel_stage": None},
+    # $in (همراه None) و $ne
+    {"analysis.funnel_stage": {"$in": ["lead", "customer"]}},
+    {"analysis.funnel_stage": {"$in": ["lead", None]}},
+    {"analysis.funnel_stage": {"$ne": "lead"}},
+    # آرایه: تساوی با هر عضو، $in، $all
+    {"analysis.tags": "online"},
+    {"analysis.tags": {"$in": ["vip", "wholesale"]}},
+    {"analysis.tags": {"$all": ["vip", "online"]}},
+    {"analysis.tags": {"$all": ["vip", "wholesale"]}},
+    {"analysis.tags": {"$ne": "vip"}},
+    # مسیر داخل آرایه‌ای از داکیومنت‌ها
+    {"identity.contact_numbers.number": "0935"},
+    # بازه
+    {"meta.created_at": {"$gte": NOW - timedelta(days=1), "$lt": NOW + timedelta(days=1)}},
+    {"meta.created_at": {"$gt": NOW}},
+    {"meta.created_at": {"$lte": NOW}},
+    {"financial_estimation.transaction_count_estimated": {"$gte": 5, "$lte": 10}},
+    {"financial_estimation.transaction_count_estimated": {"$gt": 7}},
+    # regex
+    {"identity.brand_name": {"$regex": "^Mobl"}},
+    # $and / $or
+    {"$or": [{"analysis.funnel_stage": "lead"}, {"financial_estimation.transaction_count_estimated": {"$gte": 1}}]},
+    {"$and": [{"analysis.tags": "online"}, {"analysis.funnel_stage": {"$ne": "lead"}}]},
+])
+def test_matches_agrees_with_mongo(collection, query):
+    expected = {doc["_id"] for doc in collection.find(query)}
+    assert matched_ids(query) == expected
+
+
+def test_range_with_aware_datetime():
+    # ورودی API با timezone، داکیومنت Mongo naive (UTC)
+    bound = (NOW - timedelta(hours=1)).replace(tzinfo=timezone.utc)
+    assert matched_ids({"meta.created_at": {"$gte": bound}}) == {1, 3}
+
+
+def test_range_ignores_other_types():
+    assert not matches({"analysis.funnel_stage": {"$gt": 3}}, DOCS[0])
+
+
+def test_unsupported_operator():
+    with pytest.raises(ValueError):
+        matches({"analysis.tags": {"$size": 2}}, DOCS[0])